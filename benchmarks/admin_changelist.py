@@ -0,0 +1,118 @@
+# benchmarks/admin_changelist.py
+# Booking changelist latency at a million bookings. Requests the admin list
+# as a superuser unfiltered, deep in the pages, filtered and drilled into
+# the date hierarchy, and times what Django's stock ModelAdmin would run on
+# top for comparison: two exact COUNT(*)s and the DISTINCT-years date
+# hierarchy. Rendering the rows of a page costs the same at any table
+# size; db_ms is the part that grows with it. Fails when any changelist
+# request spends more than --max-db-ms in SQL.
+#
+#   python -m benchmarks.admin_changelist [--bookings 1000000]
+import argparse
+import sys
+from datetime import date, time, timedelta
+
+from benchmarks.harness import benchmark_database, measure, report
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bookings.models import Booking, TimeSlot
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def seed(bookings, slot_count=12, batch_size=10_000):
+    # Bookings over two years, spread across users, slots and services
+    User.objects.bulk_create(User(username=f"customer{i}") for i in range(500))
+    users = list(User.objects.order_by("pk"))
+    TimeSlot.objects.bulk_create(
+        TimeSlot(start_time=time(7 + i, 0), end_time=time(8 + i, 0), slot=f"SLOT-{i}")
+        for i in range(slot_count)
+    )
+    slots = list(TimeSlot.objects.order_by("start_time"))
+    services = [choice for choice, _ in Booking.SERVICE_CHOICES]
+    first = date.today() - timedelta(days=365)
+
+    def booking(i):
+        slot = slots[i % len(slots)]
+        return Booking(
+            user=users[i % len(users)],
+            customer_name=f"Customer {i}",
+            email="c@example.com",
+            phone="0851234567",
+            car_model="Golf",
+            service_type=services[i % len(services)],
+            preferred_date=first + timedelta(days=i % 730),
+            preferred_time_slot=slot,
+            preferred_start_time=slot.start_time,
+        )
+
+    for start in range(0, bookings, batch_size):
+        Booking.objects.bulk_create(
+            booking(i) for i in range(start, min(start + batch_size, bookings))
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-db-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    with benchmark_database(), override_settings(PASSWORD_HASHERS=FAST_HASHERS):
+        seed(args.bookings)
+        admin = User.objects.create_superuser(username="admin", password="x")
+        client = Client()
+        client.force_login(admin)
+        url = reverse("admin:bookings_booking_changelist")
+        today = date.today()
+        requests = {
+            "changelist": {},
+            "changelist page 100": {"p": 100},
+            "service filter": {"service_type__exact": "Ceramic Coating"},
+            "next 7 days": {"when": "week"},
+            "hierarchy: year": {"preferred_date__year": today.year},
+            "hierarchy: month": {
+                "preferred_date__year": today.year,
+                "preferred_date__month": today.month,
+            },
+        }
+
+        def get(params):
+            response = client.get(url, params)
+            assert response.status_code == 200, response.status_code
+
+        results = {}
+        for label, params in requests.items():
+            results[label] = measure(lambda: get(params), repeat=args.repeat, warmup=2)
+            with CaptureQueriesContext(connection) as queries:
+                get(params)
+            results[label]["db_ms"] = sum(float(q["time"]) for q in queries) * 1000
+        stock = {
+            "stock: exact COUNT(*) x2": measure(
+                lambda: (Booking.objects.count(), Booking.objects.all().count()),
+                repeat=3,
+                warmup=1,
+            ),
+            "stock: date hierarchy years": measure(
+                lambda: list(Booking.objects.dates("preferred_date", "year")),
+                repeat=3,
+                warmup=1,
+            ),
+        }
+    report(f"Booking changelist, {args.bookings} bookings", dict(results, **stock))
+
+    slow = {label: r["db_ms"] for label, r in results.items() if r["db_ms"] > args.max_db_ms}
+    for label, took in slow.items():
+        print(f"{label}: {took:.1f} ms in SQL, budget {args.max_db_ms:.0f} ms.")
+    if slow:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/analytics.py
+# Staff analytics over a year of bookings: rollups.report() against the
+# same figures computed by scanning the bookings table, plus a full rebuild
+# and the consistency check. Fails when a yearly report takes longer than
+# --max-ms or the rollups disagree with the recompute.
+#
+#   python -m benchmarks.analytics [--bookings 100000] [--slots 12]
+import argparse
+import sys
+from datetime import date, time, timedelta
+
+from benchmarks.harness import benchmark_database, measure, report
+
+from django.contrib.auth.models import User
+from django.db.models import Count
+
+from bookings import rollups
+from bookings.models import Booking, TimeSlot
+
+
+def seed_year(bookings, slot_count, batch_size=5000):
+    user = User.objects.create(username="analytics")
+    TimeSlot.objects.bulk_create(
+        TimeSlot(
+            start_time=time(7 + i, 0),
+            end_time=time(8 + i, 0),
+            slot=f"SLOT-{i}",
+            capacity=1000,
+        )
+        for i in range(slot_count)
+    )
+    slots = list(TimeSlot.objects.order_by("start_time"))
+    services = [choice for choice, _ in Booking.SERVICE_CHOICES]
+    first = date.today() - timedelta(days=364)
+
+    def booking(i):
+        slot = slots[i % len(slots)]
+        return Booking(
+            user=user,
+            customer_name=f"Customer {i}",
+            email="c@example.com",
+            phone="0851234567",
+            car_model="Golf",
+            service_type=services[i % len(services)],
+            preferred_date=first + timedelta(days=i % 365),
+            preferred_time_slot=slot,
+            preferred_start_time=slot.start_time,
+        )
+
+    for start in range(0, bookings, batch_size):
+        Booking.objects.bulk_create(
+            booking(i) for i in range(start, min(start + batch_size, bookings))
+        )
+    return first
+
+
+def scan_report(start, end):
+    # What staff did before: group the bookings table itself
+    rows = Booking.objects.filter(preferred_date__gte=start, preferred_date__lte=end)
+    return [
+        list(rows.values(field).annotate(n=Count("pk")).order_by(field))
+        for field in ("preferred_date", "service_type", "preferred_time_slot")
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--slots", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        start = seed_year(args.bookings, args.slots)
+        end = date.today()
+        rows = rollups.rebuild()
+
+        results = {
+            "rollups.report (a year)": measure(
+                lambda: rollups.report(start, end), repeat=args.repeat, warmup=2
+            ),
+            "report by scanning bookings": measure(
+                lambda: scan_report(start, end), repeat=args.repeat, warmup=2
+            ),
+            "rebuild_rollups": measure(rollups.rebuild, repeat=3, warmup=0),
+            "rebuild_rollups --check": measure(rollups.check, repeat=3, warmup=0),
+        }
+        differences = rollups.check()
+    report(f"{args.bookings} bookings over 365 days, {rows} rollup rows", results)
+
+    if differences:
+        print(f"{len(differences)} rollup rows differ from a full recompute.")
+        sys.exit(1)
+    took = results["rollups.report (a year)"]["mean_ms"]
+    if took > args.max_ms:
+        print(f"Yearly report took {took:.1f} ms, budget {args.max_ms:.0f} ms.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
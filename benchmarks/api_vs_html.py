@@ -0,0 +1,60 @@
+# benchmarks/api_vs_html.py
+# Bytes and latency of one booking page as server-rendered HTML
+# (booking_list) versus the JSON API, including a conditional GET that
+# revalidates with If-None-Match and gets a 304.
+#
+#   python -m benchmarks.api_vs_html [--bookings 20000] [--page-size 25]
+import argparse
+
+from benchmarks.harness import benchmark_database, measure, report
+
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from bookings.testing import seed_route_fixtures
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def body(response):
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with benchmark_database(), override_settings(
+        PASSWORD_HASHERS=FAST_HASHERS, BOOKINGS_PAGE_SIZE=args.page_size
+    ):
+        fixtures = seed_route_fixtures(users=200, bookings=args.bookings, slots=36)
+        client = Client()
+        client.force_login(fixtures.staff)
+
+        html = reverse("booking_list")
+        api = reverse("api_bookings")
+        etag = client.get(api)["ETag"]
+        cases = {
+            "HTML booking_list": lambda: client.get(html),
+            "API, all fields": lambda: client.get(api),
+            "API, 4 fields": lambda: client.get(
+                api, {"fields": "id,preferred_date,start_time,service_type"}
+            ),
+            "API, 304 revalidation": lambda: client.get(api, HTTP_IF_NONE_MATCH=etag),
+        }
+
+        results = {}
+        for label, request in cases.items():
+            size = len(body(request()))
+            results[label] = measure(lambda: body(request()), repeat=args.repeat)
+            results[label]["bytes"] = size
+        report(f"staff, page of {args.page_size}, {args.bookings} bookings", results)
+
+
+if __name__ == "__main__":
+    main()
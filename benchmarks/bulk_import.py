@@ -0,0 +1,79 @@
+# benchmarks/bulk_import.py
+# Bulk import throughput (target: 10k rows/s into SQLite) and streaming
+# export throughput and peak memory.
+#
+#   python -m benchmarks.bulk_import [--rows 100000] [--batch-size 1000]
+import argparse
+import io
+import time as clock
+import tracemalloc
+from datetime import date, time, timedelta
+
+from benchmarks.harness import benchmark_database
+
+from django.contrib.auth.models import User
+
+from bookings import bulk
+from bookings.models import Booking, TimeSlot
+
+SLOTS = 36
+
+
+def build_csv(rows):
+    lines = [",".join(bulk.FIELDS)]
+    for i in range(rows):
+        day = date.today() + timedelta(days=1 + i % 180)
+        lines.append(
+            f"Fleet {i},fleet{i}@example.com,0851234567,Transit,Full Detailing,"
+            f"{day.isoformat()},SLOT-{i % SLOTS},"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        user = User.objects.create_user(username="fleet", password="x")
+        TimeSlot.objects.bulk_create(
+            TimeSlot(
+                start_time=time(7 + i % 12, 0),
+                end_time=time(8 + i % 12, 0),
+                slot=f"SLOT-{i}",
+                capacity=1000,
+            )
+            for i in range(SLOTS)
+        )
+        text = build_csv(args.rows)
+
+        started = clock.perf_counter()
+        result = bulk.import_bookings(
+            bulk.read_rows(io.StringIO(text), "csv"), user, args.batch_size
+        )
+        elapsed = clock.perf_counter() - started
+        print(
+            f"import: {result.created} created, {result.rejected} rejected in "
+            f"{elapsed:.2f}s = {args.rows / elapsed:,.0f} rows/s"
+        )
+
+        for fmt in bulk.FORMATS:
+            started = clock.perf_counter()
+            size = sum(len(chunk) for chunk in bulk.export_rows(Booking.objects.all(), fmt))
+            elapsed = clock.perf_counter() - started
+            # Second pass under tracemalloc (slower) for the memory high-water mark
+            tracemalloc.start()
+            for _ in bulk.export_rows(Booking.objects.all(), fmt):
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"export {fmt}: {size / 1e6:.1f} MB in {elapsed:.2f}s = "
+                f"{result.created / elapsed:,.0f} rows/s, peak {peak / 1e6:.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/db_write_path.py
+# Booking write throughput on SQLite under concurrent workers, comparing the
+# old defaults (rollback journal, synchronous=FULL, new connection per
+# request) with the tuned profile from cardetailing/db.py (WAL,
+# synchronous=NORMAL, busy_timeout, persistent connections). Reader threads
+# run the booking list query at the same time to show readers vs writers.
+#
+#   python -m benchmarks.db_write_path [--writers 8] [--bookings 150]
+import argparse
+import threading
+import time as clock
+from datetime import date, time, timedelta
+
+from benchmarks.harness import benchmark_database, report, summarize
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection, connections
+
+from bookings import services
+from bookings.forms import BookingForm
+from bookings.models import Booking, TimeSlot
+
+PROFILES = {
+    "default (journal, FULL, per-request conn)": {
+        "pragmas": {"journal_mode": "DELETE", "synchronous": "FULL"},
+        "conn_max_age": 0,
+    },
+    "tuned (WAL, NORMAL, persistent conn)": {
+        "pragmas": dict(settings.SQLITE_PRAGMAS),
+        "conn_max_age": 60,
+    },
+}
+
+
+def request(func):
+    # What Django does around every request: close expired connections
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+def run_profile(profile, writers, per_writer, readers, slot, user):
+    settings.SQLITE_PRAGMAS = profile["pragmas"]
+    connections.databases["default"]["CONN_MAX_AGE"] = profile["conn_max_age"]
+    connection.close()
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA journal_mode = {profile['pragmas']['journal_mode']}")
+
+    write_ms, read_ms = [], []
+    stop = threading.Event()
+    day = date.today() + timedelta(days=30)
+
+    def write():
+        for i in range(per_writer):
+            data = {
+                "customer_name": "Load Test",
+                "email": "load@example.com",
+                "phone": "0851234567",
+                "car_model": "Golf",
+                "service_type": "Full Detailing",
+                "preferred_date": (day + timedelta(days=i % 20)).isoformat(),
+                "preferred_time_slot": slot.pk,
+            }
+            started = clock.perf_counter()
+
+            def create():
+                form = BookingForm(data)
+                form.is_valid()
+                services.create_booking(form, user)
+
+            request(create)
+            write_ms.append((clock.perf_counter() - started) * 1000)
+        connection.close()
+
+    def read():
+        while not stop.is_set():
+            started = clock.perf_counter()
+            request(lambda: list(
+                Booking.objects.select_related("preferred_time_slot")
+                .order_by("-preferred_date", "-id")[:25]
+            ))
+            read_ms.append((clock.perf_counter() - started) * 1000)
+        connection.close()
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    reader_threads = [threading.Thread(target=read) for _ in range(readers)]
+    started = clock.perf_counter()
+    for thread in threads + reader_threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = clock.perf_counter() - started
+    stop.set()
+    for thread in reader_threads:
+        thread.join()
+
+    write_stats = summarize(write_ms, bookings_per_s=len(write_ms) / elapsed)
+    read_stats = summarize(read_ms, reads_per_s=len(read_ms) / elapsed)
+    return write_stats, read_stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--bookings", type=int, default=150, help="per writer")
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        user = User.objects.create_user(username="loadtest", password="x")
+        slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="LOAD", capacity=10000
+        )
+        writes, reads = {}, {}
+        for name, profile in PROFILES.items():
+            writes[name], reads[name] = run_profile(
+                profile, args.writers, args.bookings, args.readers, slot, user
+            )
+        report(f"create_booking path, {args.writers} concurrent writers", writes)
+        report(f"booking list reads, {args.readers} concurrent readers", reads)
+
+
+if __name__ == "__main__":
+    main()
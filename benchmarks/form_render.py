@@ -0,0 +1,69 @@
+# benchmarks/form_render.py
+# Booking form render cost with the cached TimeSlot choices vs a plain
+# ModelChoiceField (one TimeSlot query + strftime per slot on every render).
+#
+#   python -m benchmarks.form_render
+from datetime import time
+
+from benchmarks.harness import benchmark_database, measure, report
+
+import warnings
+
+from django import forms
+from django.template.loader import render_to_string
+
+from bookings import slot_cache
+from bookings.forms import BookingForm
+from bookings.models import TimeSlot
+
+SLOTS = 36
+
+# Rendering outside a request has no CSRF token; that is expected here
+warnings.filterwarnings("ignore", message=".*csrf_token.*")
+
+
+class UncachedBookingForm(BookingForm):
+    preferred_time_slot = forms.ModelChoiceField(queryset=TimeSlot.objects.all())
+
+
+def render_field(form_class):
+    return str(form_class()["preferred_time_slot"])
+
+
+def render_page(form_class):
+    return render_to_string(
+        "bookings/booking_form.html",
+        {"form": form_class(), "title": "Create Booking", "post_url": "/"},
+    )
+
+
+def main():
+    with benchmark_database():
+        TimeSlot.objects.bulk_create(
+            TimeSlot(
+                start_time=time(7 + i // 4, (i % 4) * 15),
+                end_time=time(8 + i // 4, (i % 4) * 15),
+                slot=f"SLOT-{i}",
+            )
+            for i in range(SLOTS)
+        )
+        slot_cache.invalidate()
+
+        for title, render in (
+            ("time slot <select> only", render_field),
+            ("full booking_form.html", render_page),
+        ):
+            results = {
+                "ModelChoiceField": measure(lambda: render(UncachedBookingForm)),
+                "cached choices (warm)": measure(lambda: render(BookingForm)),
+            }
+            report(f"{title}, {SLOTS} time slots", results)
+            saved = (
+                results["ModelChoiceField"]["mean_ms"]
+                - results["cached choices (warm)"]["mean_ms"]
+            )
+            print(f"  saved per render: {saved:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/harness.py
+# Shared setup for the scripts in this folder. Each benchmark runs against a
+# throwaway test database (same as `manage.py test`), so it never touches
+# db.sqlite3 and needs nothing beyond the project requirements.
+#
+#   python -m benchmarks.<name>
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cardetailing.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from bookings.testing import no_throttling  # noqa: E402
+
+
+@contextmanager
+def benchmark_database():
+    # Create and migrate a scratch database, drop it afterwards. DEBUG is off
+    # as in production (cached template loader, no query log overhead).
+    # Throttling is off: every client posts from the same address.
+    setup_test_environment(debug=False)
+    no_throttling.enable()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        no_throttling.disable()
+        teardown_test_environment()
+
+
+def measure(func, repeat=200, warmup=5):
+    # Run ``func`` repeatedly; returns timing stats (ms) and queries per call
+    for _ in range(warmup):
+        func()
+    samples = []
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples, queries=len(queries) / repeat)
+
+
+def percentile(sorted_samples, fraction):
+    index = min(int(len(sorted_samples) * fraction), len(sorted_samples) - 1)
+    return sorted_samples[index]
+
+
+def summarize(samples, **extra):
+    ordered = sorted(samples)
+    stats = {
+        "runs": len(ordered),
+        "mean_ms": statistics.mean(ordered),
+        "p50_ms": percentile(ordered, 0.50),
+        "p95_ms": percentile(ordered, 0.95),
+        "p99_ms": percentile(ordered, 0.99),
+    }
+    stats.update(extra)
+    return stats
+
+
+def report(title, results):
+    # results: {label: stats}; prints one aligned row per label
+    print(f"\n{title}")
+    width = max(len(label) for label in results)
+    for label, stats in results.items():
+        cells = "  ".join(
+            f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in stats.items()
+        )
+        print(f"  {label.ljust(width)}  {cells}")
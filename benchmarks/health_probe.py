@@ -0,0 +1,42 @@
+# benchmarks/health_probe.py
+# Cost of one load balancer probe through the full WSGI handler: /health/ via
+# the whole middleware stack (before) vs HealthCheckMiddleware (after), plus
+# /ready/ with and without its cached result.
+#
+#   python -m benchmarks.health_probe
+from benchmarks.harness import benchmark_database, measure, report
+
+from django.conf import settings
+from django.test import Client, override_settings
+
+from bookings import readiness
+
+FULL_STACK = [m for m in settings.MIDDLEWARE if not m.endswith("HealthCheckMiddleware")]
+
+
+def main():
+    with benchmark_database():
+        results = {}
+        with override_settings(MIDDLEWARE=FULL_STACK):
+            client = Client()
+            results["/health/ full middleware stack"] = measure(
+                lambda: client.get("/health/"), repeat=2000
+            )
+        client = Client()
+        results["/health/ short-circuit"] = measure(
+            lambda: client.get("/health/"), repeat=2000
+        )
+
+        def uncached_ready():
+            readiness.reset()
+            client.get("/ready/")
+
+        results["/ready/ every probe checks"] = measure(uncached_ready, repeat=200)
+        results["/ready/ cached result"] = measure(
+            lambda: client.get("/ready/"), repeat=2000
+        )
+        report("Per-probe cost", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# benchmarks/loadgen.py
+# Load test for the gunicorn profiles in cardetailing/server.py. For each
+# profile, starts gunicorn with gunicorn.conf.py against a seeded scratch
+# database and has --concurrency keep-alive clients cycle over the hot read
+# routes (booking list as customer and staff, the API, the availability
+# grid and the booking form). Reports requests per second, latency and the
+# memory of each worker (PSS counts pages shared with the master once, so
+# it shows what preload_app saves; RSS does not).
+#
+# Needs gunicorn and Linux /proc.
+#
+#   python -m benchmarks.loadgen [--profiles gthread sync] [--duration 20]
+#                                [--concurrency 16] [--bookings 20000]
+import argparse
+import http.client
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.harness import benchmark_database, report, summarize
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from bookings.testing import seed_route_fixtures
+from cardetailing.server import PROFILES
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def session_cookie(user):
+    # A real session row in the scratch database, usable by the server
+    client = Client()
+    client.force_login(user)
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def targets(fixtures):
+    # (path, cookie) pairs the clients cycle through
+    customer, staff = session_cookie(fixtures.customer), session_cookie(fixtures.staff)
+    api = reverse("api_bookings")
+    return [
+        (reverse("booking_list"), customer),
+        (reverse("booking_list"), staff),
+        (api, customer),
+        (f"{api}?page_size=50", staff),
+        (reverse("availability"), customer),
+        (reverse("create_booking"), customer),
+    ]
+
+
+def start_server(profile, port, args):
+    env = dict(
+        os.environ,
+        GUNICORN_PROFILE=profile,
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        DJANGO_DB_NAME=str(connection.settings_dict["NAME"]),
+        DJANGO_DEBUG="False",
+    )
+    if args.workers:
+        env["GUNICORN_WORKERS"] = str(args.workers)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"gunicorn exited with {server.returncode} ({profile})")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit(f"gunicorn did not start ({profile})")
+
+
+def run_clients(port, requests, concurrency, duration):
+    # Each client keeps one connection open and walks the request list from
+    # its own offset; returns (latencies in ms, errors, elapsed seconds)
+    host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+    latencies, errors, lock = [], [0], threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        mine, failed = [], 0
+        for path, cookie in itertools.islice(itertools.cycle(requests), offset, None):
+            if time.monotonic() >= stop_at:
+                break
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Host": host, "Cookie": cookie})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            mine.append((time.perf_counter() - started) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [
+        threading.Thread(target=client, args=(i,)) for i in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0], time.monotonic() - started
+
+
+def worker_memory(master_pid):
+    # {pid: (rss_kb, pss_kb)} for the master's children
+    memory = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                ppid = int(stat.read().rsplit(")", 1)[1].split()[1])
+            if ppid != master_pid:
+                continue
+            fields = {}
+            with open(f"/proc/{entry}/smaps_rollup") as rollup:
+                for line in rollup:
+                    key, _, value = line.partition(":")
+                    if key in ("Rss", "Pss"):
+                        fields[key] = int(value.split()[0])
+            memory[int(entry)] = (fields.get("Rss", 0), fields.get("Pss", 0))
+        except (OSError, ValueError, IndexError):
+            continue
+    return memory
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=0, help="override the profile's count")
+    parser.add_argument("--bookings", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        fixtures = seed_route_fixtures(users=200, bookings=args.bookings, slots=36)
+        requests = targets(fixtures)
+        # The server processes open the database file themselves
+        connection.close()
+
+        results = {}
+        for profile in args.profiles:
+            port = free_port()
+            server = start_server(profile, port, args)
+            try:
+                run_clients(port, requests, args.concurrency, args.warmup)
+                latencies, errors, elapsed = run_clients(
+                    port, requests, args.concurrency, args.duration
+                )
+                memory = worker_memory(server.pid)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            if not latencies:
+                raise SystemExit(f"no successful requests ({profile})")
+            results[profile] = summarize(
+                latencies,
+                rps=len(latencies) / elapsed,
+                errors=errors,
+                workers=len(memory),
+                rss_mb_per_worker=sum(r for r, _ in memory.values()) / 1024 / max(len(memory), 1),
+                pss_mb_per_worker=sum(p for _, p in memory.values()) / 1024 / max(len(memory), 1),
+            )
+        report(
+            f"{args.concurrency} keep-alive clients, {os.cpu_count()} CPUs", results
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/metrics_overhead.py
+# Cost of PerformanceMetricsMiddleware: isolated per-request overhead (empty
+# view, and a view running 3 queries like booking_list) measured with timeit,
+# since the page-level difference is below run-to-run noise.
+#
+#   python -m benchmarks.metrics_overhead
+import timeit
+
+from benchmarks.harness import benchmark_database, report
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from bookings.middleware import PerformanceMetricsMiddleware
+
+RUNS = 20000
+
+
+def three_queries(_request):
+    with connection.cursor() as cursor:
+        for _ in range(3):
+            cursor.execute("SELECT 1")
+    return HttpResponse("ok")
+
+
+def empty(_request):
+    return HttpResponse("ok")
+
+
+def per_call_us(func, request):
+    return timeit.timeit(lambda: func(request), number=RUNS) / RUNS * 1e6
+
+
+def main():
+    with benchmark_database():
+        request = RequestFactory().get("/")
+        results = {}
+        for label, view in (("empty view", empty), ("view with 3 queries", three_queries)):
+            bare = per_call_us(view, request)
+            wrapped = per_call_us(PerformanceMetricsMiddleware(view), request)
+            results[label] = {
+                "view_us": bare,
+                "with_metrics_us": wrapped,
+                "overhead_us": wrapped - bare,
+            }
+        report(f"PerformanceMetricsMiddleware overhead ({RUNS} runs)", results)
+
+
+if __name__ == "__main__":
+    main()
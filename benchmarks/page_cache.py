@@ -0,0 +1,75 @@
+# benchmarks/page_cache.py
+# booking_list with the page and row caches cold, with only the row
+# fragments warm (what follows a booking write), and fully warm. Reports
+# the whole request and the list body render on its own, and fails when
+# the warm body render is not --min-speedup times faster than a cold one.
+#
+#   python -m benchmarks.page_cache [--bookings 20000] [--page-size 25]
+import argparse
+import sys
+
+from benchmarks.harness import benchmark_database, measure, report
+
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+
+from bookings import page_cache, views
+from bookings.cache import tiered
+from bookings.testing import seed_route_fixtures
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def cold():
+    page_cache.invalidate_all()
+    # Local copies too, as on a worker that has not seen these keys
+    tiered.local.clear()
+
+
+def pages_only():
+    tiered.invalidate(page_cache.PAGES_NAMESPACE)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--min-speedup", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with benchmark_database(), override_settings(
+        PASSWORD_HASHERS=FAST_HASHERS, BOOKINGS_PAGE_SIZE=args.page_size
+    ):
+        fixtures = seed_route_fixtures(users=200, bookings=args.bookings, slots=36)
+        client = Client()
+        client.force_login(fixtures.staff)
+        url = reverse("booking_list")
+        request = RequestFactory().get(url)
+        request.user = fixtures.staff
+
+        def body():
+            return str(views._booking_listing(request))
+
+        def get():
+            return client.get(url).content
+
+        results = {}
+        for label, reset in (("cold", cold), ("rows warm", pages_only), ("warm", None)):
+            results[f"request, {label}"] = measure(
+                lambda: (reset and reset(), get()), repeat=args.repeat
+            )
+            results[f"body render, {label}"] = measure(
+                lambda: (reset and reset(), body()), repeat=args.repeat
+            )
+        report(f"staff booking_list, page of {args.page_size}", results)
+
+        speedup = results["body render, cold"]["mean_ms"] / results["body render, warm"]["mean_ms"]
+        print(f"\nWarm body render is {speedup:.1f}x faster than cold.")
+        if speedup < args.min_speedup:
+            print(f"Expected at least {args.min_speedup:.1f}x.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/regression.py
+# Query-budget and latency regression suite for every route in
+# cardetailing/urls.py (plus the admin index and booking changelist).
+# Seeds production-like volumes into a scratch SQLite database, requests
+# each route repeatedly as the right user and compares against
+# benchmarks/baseline.json:
+#
+#   - any route over its QUERY_BUDGETS entry fails
+#   - any route whose p95 exceeds baseline * (1 + threshold) + slack fails
+#
+#   python -m benchmarks.regression                     # check
+#   python -m benchmarks.regression --update-baseline   # record new baseline
+#   python -m benchmarks.regression --bookings 5000     # quick local run
+import argparse
+import json
+import sys
+import time as clock
+from pathlib import Path
+
+from benchmarks.harness import benchmark_database, report, summarize
+
+from django.test import override_settings
+
+from bookings.testing import (
+    QUERY_BUDGETS,
+    ROUTE_REQUESTS,
+    RouteExerciser,
+    seed_route_fixtures,
+)
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def run_routes(exerciser, repeat, warmup):
+    results, failures = {}, []
+    for label, spec in ROUTE_REQUESTS.items():
+        for _ in range(warmup):
+            exerciser.call(label)
+        samples, max_queries = [], 0
+        for _ in range(repeat):
+            status, queries, elapsed = exerciser.call(label)
+            if status >= 400:
+                failures.append(f"{label}: HTTP {status}")
+                break
+            samples.append(elapsed * 1000)
+            max_queries = max(max_queries, queries)
+        budget = QUERY_BUDGETS[spec.url_name]
+        if max_queries > budget:
+            failures.append(f"{label}: {max_queries} queries (budget {budget})")
+        results[label] = summarize(samples or [0.0], queries=max_queries, budget=budget)
+    return results, failures
+
+
+def compare(results, baseline, threshold, slack_ms):
+    failures = []
+    for label, stats in results.items():
+        previous = baseline.get("routes", {}).get(label)
+        if previous is None:
+            continue
+        limit = previous["p95_ms"] * (1 + threshold) + slack_ms
+        if stats["p95_ms"] > limit:
+            failures.append(
+                f"{label}: p95 {stats['p95_ms']:.2f}ms > {limit:.2f}ms "
+                f"(baseline {previous['p95_ms']:.2f}ms)"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--slots", type=int, default=36)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p95 growth")
+    parser.add_argument("--slack-ms", type=float, default=2.0, help="absolute p95 allowance")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    with benchmark_database(), override_settings(PASSWORD_HASHERS=FAST_HASHERS):
+        started = clock.perf_counter()
+        # delete_booking_confirm consumes one disposable booking per call
+        fixtures = seed_route_fixtures(
+            users=args.users,
+            bookings=args.bookings,
+            slots=args.slots,
+            disposable=args.repeat + args.warmup,
+        )
+        print(
+            f"Seeded {args.users} users, {args.bookings} bookings, {args.slots} slots "
+            f"in {clock.perf_counter() - started:.1f}s"
+        )
+        results, failures = run_routes(RouteExerciser(fixtures), args.repeat, args.warmup)
+
+    report(f"routes, {args.bookings} bookings", results)
+
+    if args.update_baseline:
+        baseline = {
+            "dataset": {"users": args.users, "bookings": args.bookings, "slots": args.slots},
+            "routes": {
+                label: {key: round(stats[key], 3) for key in ("p50_ms", "p95_ms", "p99_ms")}
+                | {"queries": stats["queries"]}
+                for label, stats in results.items()
+            },
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+    elif args.baseline.exists():
+        failures += compare(
+            results, json.loads(args.baseline.read_text()), args.threshold, args.slack_ms
+        )
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline")
+
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# benchmarks/replicas.py
+# How much of a mixed workload leaves the primary once a read replica is
+# configured. A second SQLite file (copied from the seeded primary, as
+# `manage.py sync_replica` does) stands in for the replica. Customers and
+# staff cycle over the read routes while one request in --write-every is a
+# separate --writers customer creating a booking; writers are pinned to the
+# primary for REPLICA_PIN_SECONDS and so is everything they read. Reports
+# queries per request on each database with the router off (no
+# DATABASE_REPLICAS) and on. Cache fills always read the primary, so the
+# booking list and availability grid only offload their uncached parts.
+#
+#   python -m benchmarks.replicas [--requests 2000] [--write-every 10]
+import argparse
+import itertools
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import benchmark_database, report, summarize
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bookings import routing
+from bookings.cache import tiered
+from bookings.testing import seed_route_fixtures
+from cardetailing.db import copy_sqlite
+
+REPLICA = "replica_1"
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def logged_in(user):
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def read_requests(customers, staff):
+    # (client, path) pairs: the pages and API calls people browse
+    api = reverse("api_bookings")
+    reads = []
+    for client in customers:
+        reads += [
+            (client, reverse("booking_list")),
+            (client, api),
+            (client, reverse("create_booking")),
+            (client, reverse("availability")),
+        ]
+    reads += [(staff, reverse("booking_list")), (staff, f"{api}?page_size=50")]
+    return reads
+
+
+def run(reads, writers, fixtures, requests, write_every):
+    # Returns (latencies in ms, primary queries, replica queries). A writer
+    # creates a booking and then views its list, as after the redirect.
+    tiered.local.clear()
+    caches["default"].clear()
+    counter = itertools.count(1)
+    writers = itertools.cycle(writers)
+    cycle = itertools.cycle(reads)
+    latencies = []
+    with CaptureQueriesContext(connections["default"]) as primary, CaptureQueriesContext(
+        connections[REPLICA]
+    ) as replica:
+        for number in range(1, requests + 1):
+            started = time.perf_counter()
+            if number % write_every == 0:
+                writer = next(writers)
+                writer.post(
+                    reverse("create_booking_submit"), fixtures.booking_data(next(counter))
+                )
+                response = writer.get(reverse("booking_list"))
+            else:
+                client, path = next(cycle)
+                response = client.get(path)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, len(primary), len(replica)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--write-every", type=int, default=10)
+    parser.add_argument("--customers", type=int, default=20)
+    parser.add_argument("--writers", type=int, default=3)
+    parser.add_argument("--bookings", type=int, default=5000)
+    args = parser.parse_args()
+
+    replica_dir = tempfile.mkdtemp()
+    with benchmark_database(), override_settings(PASSWORD_HASHERS=FAST_HASHERS):
+        fixtures = seed_route_fixtures(users=50, bookings=args.bookings, slots=12)
+        replica_settings = dict(connections.settings["default"])
+        replica_settings.update(NAME=str(Path(replica_dir) / "replica.sqlite3"), TEST={})
+        connections.settings[REPLICA] = replica_settings
+        copy_sqlite(connections["default"].settings_dict["NAME"], replica_settings["NAME"])
+        try:
+            users = User.objects.filter(is_staff=False).order_by("pk")
+            clients = [logged_in(user) for user in users[: args.customers + args.writers]]
+            customers, writers = clients[: args.customers], clients[args.customers :]
+            staff = logged_in(fixtures.staff)
+            reads = read_requests(customers, staff)
+
+            results = {}
+            modes = (
+                # Not reported: first logins of each session, sequences, ...
+                ("warm-up", []),
+                ("primary only", []),
+                ("with replica", [REPLICA]),
+            )
+            for label, replicas in modes:
+                with override_settings(DATABASE_REPLICAS=replicas):
+                    # Clients build their middleware on first use
+                    for client in clients + [staff]:
+                        client.handler._middleware_chain = None
+                        client.cookies.pop(routing.PIN_COOKIE, None)
+                    latencies, primary, replica = run(
+                        reads, writers, fixtures, args.requests, args.write_every
+                    )
+                results[label] = summarize(
+                    latencies,
+                    primary_queries=primary / args.requests,
+                    replica_queries=replica / args.requests,
+                    primary_share=primary / max(primary + replica, 1),
+                )
+        finally:
+            connections[REPLICA].close()
+            del connections[REPLICA]
+            del connections.settings[REPLICA]
+            shutil.rmtree(replica_dir, ignore_errors=True)
+        del results["warm-up"]
+        report(
+            f"{args.requests} requests, one write in {args.write_every}, "
+            f"{args.customers} customers, {args.writers} writers",
+            results,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/scheduling.py
+# Bay scheduler solve time for a busy day: --bookings bookings spread over
+# the time slots, on --bays bays. Reports the solver alone (large days use
+# the single-pass heuristic, small ones the multi-order search), plan_day()
+# including the database read, and the slot suggestions shown when a slot
+# is full. Fails when a solve takes longer than --max-ms.
+#
+#   python -m benchmarks.scheduling [--bookings 500] [--bays 20]
+import argparse
+import random
+import sys
+from datetime import date, time, timedelta
+
+from benchmarks.harness import benchmark_database, measure, report
+
+from django.contrib.auth.models import User
+
+from bookings import scheduling
+from bookings.models import Bay, Booking, TimeSlot
+from bookings.scheduling import BayHours, Job, schedule
+
+
+def random_jobs(count, seed=1):
+    rng = random.Random(seed)
+    durations = list(Booking.SERVICE_MINUTES.values())
+    jobs = []
+    for i in range(count):
+        start = rng.randrange(7, 18) * 60
+        jobs.append(Job(i, rng.choice(durations), start, start + 60))
+    return jobs
+
+
+def seed_day(day, bookings, bays):
+    user = User.objects.create(username="scheduler")
+    Bay.objects.bulk_create(Bay(name=f"Bay {i:02}") for i in range(bays))
+    TimeSlot.objects.bulk_create(
+        TimeSlot(start_time=time(h, 0), end_time=time(h + 1, 0), slot=f"H{h}", capacity=1000)
+        for h in range(7, 18)
+    )
+    slots = list(TimeSlot.objects.order_by("start_time"))
+    services = [choice for choice, _ in Booking.SERVICE_CHOICES]
+    Booking.objects.bulk_create(
+        Booking(
+            user=user,
+            customer_name=f"Customer {i}",
+            email="c@example.com",
+            phone="0851234567",
+            car_model="Golf",
+            service_type=services[i % len(services)],
+            preferred_date=day,
+            preferred_time_slot=slots[i % len(slots)],
+            preferred_start_time=slots[i % len(slots)].start_time,
+        )
+        for i in range(bookings)
+    )
+    return slots
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=500)
+    parser.add_argument("--bays", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    bays = [BayHours(i, 8 * 60, 18 * 60) for i in range(args.bays)]
+    jobs = random_jobs(args.bookings)
+    small = jobs[: scheduling.SEARCH_LIMIT]
+    results = {
+        f"solve {len(jobs)} bookings (single pass)": measure(
+            lambda: schedule(jobs, bays), repeat=args.repeat, warmup=1
+        ),
+        f"solve {len(small)} bookings (search)": measure(
+            lambda: schedule(small, bays), repeat=args.repeat, warmup=1
+        ),
+    }
+    plan = schedule(jobs, bays)
+    searched = schedule(jobs, bays, search_limit=len(jobs))
+
+    with benchmark_database():
+        day = date.today() + timedelta(days=7)
+        slots = seed_day(day, args.bookings, args.bays)
+        results["plan_day (with database read)"] = measure(
+            lambda: scheduling.plan_day(day), repeat=args.repeat, warmup=1
+        )
+        results["suggest_slots (+-7 days)"] = measure(
+            lambda: scheduling.suggest_slots("Full Detailing", day, slots[3]),
+            repeat=args.repeat,
+            warmup=1,
+        )
+    report(f"{args.bookings} bookings on {args.bays} bays", results)
+    print(
+        f"\nSingle pass: {len(plan.assignments)} placed, {len(plan.unscheduled)} left over, "
+        f"{plan.utilization:.0%} of bay time booked"
+    )
+    print(
+        f"Full search: {len(searched.assignments)} placed, "
+        f"{len(searched.unscheduled)} left over, {searched.utilization:.0%} of bay time booked"
+    )
+
+    slowest = max(stats["mean_ms"] for stats in results.values())
+    if slowest > args.max_ms:
+        print(f"Slowest step took {slowest:.1f} ms, budget {args.max_ms:.0f} ms.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/security_headers.py
+# Per-response overhead of SecurityHeadersMiddleware: the previous version
+# (CSP string rebuilt and eight setdefault calls on every response) against
+# the precompiled policies.
+#
+#   python -m benchmarks.security_headers
+import timeit
+
+from benchmarks.harness import report, summarize  # noqa: F401 (sets up Django)
+
+from django.http import HttpResponse, JsonResponse
+from django.test import RequestFactory
+from django.urls import ResolverMatch
+
+from bookings.middleware import SecurityHeadersMiddleware
+
+RUNS = 20000
+
+
+class LegacySecurityHeadersMiddleware:
+    # Copy of the middleware before policies were precompiled
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        response.setdefault("X-Frame-Options", "DENY")
+        response.setdefault("Referrer-Policy", "same-origin")
+        response.setdefault("X-Content-Type-Options", "nosniff")
+        response.setdefault("Cross-Origin-Opener-Policy", "same-origin")
+        response.setdefault("Cross-Origin-Embedder-Policy", "require-corp")
+        response.setdefault("Cross-Origin-Resource-Policy", "same-origin")
+        response.setdefault("Permissions-Policy", "geolocation=(), microphone=(), camera=()")
+        csp = (
+            "default-src 'self'; "
+            "script-src 'self'; "
+            "style-src 'self' https://cdn.jsdelivr.net; "
+            "img-src 'self' https://images.unsplash.com data:; "
+            "font-src 'self' data:; "
+            "frame-ancestors 'none'; "
+            "base-uri 'self'; "
+            "form-action 'self';"
+        )
+        response.setdefault("Content-Security-Policy", csp)
+        return response
+
+
+def overhead_us(middleware_class, make_response, url_name=None):
+    request = RequestFactory().get("/")
+    if url_name:
+        request.resolver_match = ResolverMatch(lambda r: None, (), {}, url_name=url_name)
+    bare = timeit.timeit(make_response, number=RUNS)
+    wrapped = middleware_class(lambda _request: make_response())
+    total = timeit.timeit(lambda: wrapped(request), number=RUNS)
+    return (total - bare) / RUNS * 1e6
+
+
+def main():
+    cases = {
+        "HTML page": (lambda: HttpResponse("<p>ok</p>"), None),
+        "JSON response": (lambda: JsonResponse({"ok": True}), None),
+        "/health/ probe": (lambda: JsonResponse({"status": "ok"}), "health"),
+    }
+    results = {}
+    for label, (make_response, url_name) in cases.items():
+        results[label] = {
+            "legacy_us": overhead_us(LegacySecurityHeadersMiddleware, make_response, url_name),
+            "precompiled_us": overhead_us(SecurityHeadersMiddleware, make_response, url_name),
+        }
+    report(f"Security header middleware overhead per response ({RUNS} runs)", results)
+
+
+if __name__ == "__main__":
+    main()
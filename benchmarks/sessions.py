@@ -0,0 +1,56 @@
+# benchmarks/sessions.py
+# Session cost per authenticated request for each DJANGO_SESSION_BACKEND:
+# the whole booking_list request, and loading the session on its own (what
+# SessionMiddleware and the auth middleware do before the view runs).
+#
+#   python -m benchmarks.sessions [--bookings 5000] [--repeat 500]
+import argparse
+from importlib import import_module
+
+from benchmarks.harness import benchmark_database, measure, report
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from bookings import session_backend
+from bookings.testing import seed_route_fixtures
+
+ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached": "bookings.session_backend",
+    "cookie": "django.contrib.sessions.backends.signed_cookies",
+}
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    with benchmark_database(), override_settings(PASSWORD_HASHERS=FAST_HASHERS):
+        fixtures = seed_route_fixtures(users=50, bookings=args.bookings, slots=12)
+        url = reverse("booking_list")
+        results = {}
+        for label, engine in ENGINES.items():
+            with override_settings(SESSION_ENGINE=engine):
+                session_backend.local.clear()
+                client = Client()
+                client.force_login(fixtures.customer)
+                key = client.cookies[settings.SESSION_COOKIE_NAME].value
+                store_class = import_module(engine).SessionStore
+
+                results[f"{label}: booking_list"] = measure(
+                    lambda: client.get(url), repeat=args.repeat
+                )
+                results[f"{label}: session load"] = measure(
+                    lambda: store_class(key)[SESSION_KEY], repeat=args.repeat * 4
+                )
+        report("Session cost per authenticated request", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/throttling.py
+# Cost of ThrottleMiddleware with the shipped THROTTLE_RATES and the
+# configured cache: per-request overhead for requests it ignores, counts and
+# refuses, then a signup burst from one address with throttling off and on
+# (real password hasher), which is what the throttle is there to cut.
+# Fails when any per-request overhead averages over --max-us.
+#
+#   python -m benchmarks.throttling [--burst 30] [--max-us 1000]
+import argparse
+import itertools
+import sys
+import time
+import timeit
+
+from benchmarks.harness import benchmark_database, report
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import caches
+from django.test import Client, RequestFactory, override_settings
+from django.urls import resolve, reverse
+
+from bookings.middleware import ThrottleMiddleware
+from cardetailing import settings as project_settings
+
+RUNS = 20000
+
+
+def requests(method, url_name, user, addresses):
+    # An endless supply of requests from ``addresses`` in turn, resolved as
+    # the handler would before process_view. Bodies are parsed up front:
+    # the view parses them anyway, the throttle only reads the result.
+    factory = RequestFactory()
+    path = reverse(url_name)
+    match = resolve(path)
+    built = []
+    for address in addresses:
+        request = getattr(factory, method)(path, {"username": "jane"}, REMOTE_ADDR=address)
+        request.resolver_match = match
+        request.user = user
+        request.POST
+        built.append(request)
+    return itertools.cycle(built)
+
+
+def overhead_us(middleware, supply):
+    def call():
+        request = next(supply)
+        middleware.process_view(request, None, (), {})
+
+    return timeit.timeit(call, number=RUNS) / RUNS * 1e6
+
+
+def burst(client, size):
+    # Seconds and status codes for ``size`` signups from one client
+    started = time.perf_counter()
+    statuses = [
+        client.post(
+            reverse("signup_submit"),
+            {"username": f"bot{n}", "password1": "Xy7!secret-pw", "password2": "Xy7!secret-pw"},
+        ).status_code
+        for n in range(size)
+    ]
+    return time.perf_counter() - started, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--burst", type=int, default=30)
+    parser.add_argument("--max-us", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    rates = project_settings.THROTTLE_RATES
+    if not rates:
+        sys.exit("THROTTLE_RATES is empty (DJANGO_THROTTLE=off?)")
+    with override_settings(THROTTLE_RATES=rates):
+        middleware = ThrottleMiddleware(lambda request: None)
+    caches[settings.THROTTLE_CACHE].clear()
+
+    customer = User(pk=1, username="jane")
+    many = [f"10.{n // 65536}.{n // 256 % 256}.{n % 256}" for n in range(RUNS + 100)]
+    cases = {
+        "GET (ignored)": requests("get", "login", AnonymousUser(), ["10.9.9.9"]),
+        "POST, unthrottled route": requests("post", "booking_import", customer, ["10.9.9.9"]),
+        "signup POST, counted (ip)": requests("post", "signup_submit", AnonymousUser(), many),
+        "signup POST, refused": requests("post", "signup_submit", AnonymousUser(), ["10.8.8.8"]),
+        "login POST, counted (ip + user)": requests("post", "login", AnonymousUser(), many),
+        "booking POST, counted (ip + user)": requests(
+            "post", "create_booking_submit", User(pk=2, username="bob"), many
+        ),
+    }
+    results = {
+        label: {"overhead_us": overhead_us(middleware, supply)}
+        for label, supply in cases.items()
+    }
+    backend = settings.CACHES[settings.THROTTLE_CACHE]["BACKEND"]
+    report(f"ThrottleMiddleware per request ({RUNS} runs, {backend})", results)
+
+    with benchmark_database():
+        timings = {}
+        for label, throttle in (("throttling off", {}), ("throttling on", rates)):
+            caches[settings.THROTTLE_CACHE].clear()
+            User.objects.filter(username__startswith="bot").delete()
+            with override_settings(THROTTLE_RATES=throttle):
+                seconds, statuses = burst(Client(REMOTE_ADDR="192.0.2.1"), args.burst)
+            timings[label] = {
+                "seconds": seconds,
+                "created": statuses.count(302),
+                "refused": statuses.count(429),
+            }
+    report(f"Signup burst of {args.burst} from one address", timings)
+
+    slow = {
+        label: r["overhead_us"]
+        for label, r in results.items()
+        if r["overhead_us"] > args.max_us
+    }
+    for label, took in slow.items():
+        print(f"{label}: {took:.0f} us per request, budget {args.max_us:.0f} us.")
+    if slow:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
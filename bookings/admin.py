@@ -1,5 +1,171 @@
-from django.contrib import admin
-from .models import Booking, TimeSlot
+from datetime import timedelta
+from functools import partial
 
-admin.site.register(Booking)
-admin.site.register(TimeSlot)
+from django import forms
+from django.contrib import admin, messages
+from django.utils import timezone
+from django.utils.text import slugify
+from django.utils.translation import ngettext
+
+from . import services
+from .capacity import SlotFullError
+from .models import Bay, Booking, OutboxMessage, SlotCapacity, TimeSlot
+from .pagination import BOOKING_ORDERING, EstimatedCountPaginator
+
+admin.site.register(SlotCapacity)
+
+
+class UpcomingFilter(admin.SimpleListFilter):
+    # Ranges on preferred_date, served by booking_date_start_idx
+    title = "when"
+    parameter_name = "when"
+
+    def lookups(self, request, model_admin):
+        return (
+            ("today", "Today"),
+            ("week", "Next 7 days"),
+            ("month", "Next 30 days"),
+            ("past", "Past"),
+        )
+
+    def queryset(self, request, queryset):
+        today = timezone.localdate()
+        if self.value() == "today":
+            return queryset.filter(preferred_date=today)
+        if self.value() == "week":
+            return queryset.filter(
+                preferred_date__gte=today, preferred_date__lt=today + timedelta(days=7)
+            )
+        if self.value() == "month":
+            return queryset.filter(
+                preferred_date__gte=today, preferred_date__lt=today + timedelta(days=30)
+            )
+        if self.value() == "past":
+            return queryset.filter(preferred_date__lt=today)
+        return queryset
+
+
+class BookingAdminForm(forms.ModelForm):
+    # Saves through services once the fields are valid, so seats are taken
+    # and given back as for customers and a full slot comes back as a field
+    # error. The admin validates inside its transaction, which a later
+    # failure rolls back; bookings have no inlines to fail after this.
+    class Meta:
+        model = Booking
+        fields = "__all__"
+
+    def full_clean(self):
+        super().full_clean()
+        if not self.is_valid():
+            return
+        try:
+            if self.instance._state.adding:
+                services.create_booking(self, self.instance.user)
+            else:
+                services.update_booking(self)
+        except SlotFullError as exc:
+            self.add_error(
+                "preferred_time_slot",
+                f"{exc.time_slot} is fully booked on {exc.day}. Pick another slot or date.",
+            )
+
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    # Built for a bookings table in the millions: every page is one indexed
+    # query (ordering = booking_date_start_idx, related rows joined), counts
+    # are capped or estimated (EstimatedCountPaginator) and the date
+    # hierarchy reads only the first and last date (see the change_list.html
+    # override). Bulk actions are a single UPDATE / DELETE through services.
+    # Adds and edits go through services too (BookingAdminForm).
+    list_display = (
+        "customer_name",
+        "service_type",
+        "preferred_date",
+        "preferred_time_slot",
+        "user",
+        "bay",
+        "created_at",
+    )
+    list_select_related = ("user", "preferred_time_slot", "bay")
+    list_filter = (UpcomingFilter, "service_type", "preferred_time_slot")
+    date_hierarchy = "preferred_date"
+    ordering = BOOKING_ORDERING
+    # Other columns would sort the whole table
+    sortable_by = ("preferred_date", "created_at")
+    paginator = EstimatedCountPaginator
+    # Rendering a row costs more than reading it
+    list_per_page = 50
+    show_full_result_count = False
+    # A <select> of every user would load the users table
+    raw_id_fields = ("user",)
+    actions = ["clear_bay"]
+    form = BookingAdminForm
+
+    def save_model(self, request, obj, form, change):
+        # Already saved by BookingAdminForm.full_clean()
+        pass
+
+    def delete_model(self, request, obj):
+        services.delete_booking(obj)
+
+    def delete_queryset(self, request, queryset):
+        services.delete_bookings(queryset)
+
+    @admin.action(description="Clear bay assignment", permissions=["change"])
+    def clear_bay(self, request, queryset):
+        # Bay and start time are not shown in cached pages
+        cleared = queryset.exclude(bay=None).update(bay=None, scheduled_start=None)
+        self.message_user(
+            request,
+            ngettext("Cleared %d bay assignment.", "Cleared %d bay assignments.", cleared)
+            % cleared,
+            messages.SUCCESS,
+        )
+
+    def get_actions(self, request):
+        # One "Change service to ..." action per service
+        actions = super().get_actions(request)
+        if self.has_change_permission(request):
+            for service_type, label in Booking.SERVICE_CHOICES:
+                name = f"set_service_{slugify(service_type).replace('-', '_')}"
+                actions[name] = (
+                    partial(change_service, service_type=service_type),
+                    name,
+                    f"Change service to {label}",
+                )
+        return actions
+
+
+def change_service(modeladmin, request, queryset, service_type):
+    changed = services.change_service(queryset, service_type)
+    modeladmin.message_user(
+        request,
+        ngettext(
+            "Changed %(count)d booking to %(service)s.",
+            "Changed %(count)d bookings to %(service)s.",
+            changed,
+        )
+        % {"count": changed, "service": service_type},
+        messages.SUCCESS,
+    )
+
+
+@admin.register(TimeSlot)
+class TimeSlotAdmin(admin.ModelAdmin):
+    list_display = ("slot", "start_time", "end_time", "capacity")
+    # timeslot_start_idx
+    ordering = ("start_time", "pk")
+
+
+@admin.register(Bay)
+class BayAdmin(admin.ModelAdmin):
+    list_display = ("name", "opens_at", "closes_at", "active")
+    list_filter = ("active",)
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    # Failed deliveries can be retried by setting them back to pending
+    list_display = ("kind", "status", "attempts", "available_at", "sent_at")
+    list_filter = ("status", "kind")
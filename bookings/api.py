@@ -0,0 +1,197 @@
+# bookings/api.py
+# Read-only JSON API over bookings and time slots (used by the mobile app).
+#
+#   GET /api/bookings/?fields=id,preferred_date&start=2030-01-01&end=2030-01-31
+#                     &service_type=Full+Detailing&user=12&cursor=...&page_size=50
+#   GET /api/timeslots/
+#
+# Rows are read with values_list() and encoded straight from the tuples, no
+# model instances. Responses carry a weak ETag built from the page's ids and
+# newest updated_at, so revalidating an unchanged page returns 304 before
+# anything is serialized. There is no Last-Modified: deleting a booking
+# changes the page but not the newest updated_at on it.
+import hashlib
+import json
+from datetime import date
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_GET
+
+from .models import Booking, TimeSlot
+from .pagination import paginate_bookings
+
+# ?fields= name -> values_list() lookup
+BOOKING_FIELDS = {
+    "id": "id",
+    "user": "user_id",
+    "customer_name": "customer_name",
+    "email": "email",
+    "phone": "phone",
+    "car_model": "car_model",
+    "service_type": "service_type",
+    "preferred_date": "preferred_date",
+    "time_slot": "preferred_time_slot_id",
+    "start_time": "preferred_start_time",
+    "end_time": "preferred_time_slot__end_time",
+    "notes": "notes",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+# Always fetched: the keyset cursor (date, start time, id) and change marker
+KEY_LOOKUPS = ("preferred_date", "preferred_start_time", "id", "updated_at")
+
+TIMESLOT_FIELDS = ("id", "slot", "start_time", "end_time", "capacity")
+
+MAX_PAGE_SIZE = 200
+# Rows encoded per streamed chunk
+CHUNK_ROWS = 50
+
+_encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+
+class ApiError(Exception):
+    pass
+
+
+def _error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+def _weak_etag(*parts):
+    digest = hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _conditional(request, etag):
+    # 304 for a matching If-None-Match, else None
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        _validators(response, etag)
+    return response
+
+
+def _validators(response, etag):
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+# ---------- bookings ----------
+
+
+def _requested_fields(request):
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(BOOKING_FIELDS)
+    names = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BOOKING_FIELDS]
+    if unknown or not names:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}." if unknown else "No fields.")
+    return names
+
+
+def _filtered_bookings(request):
+    bookings = Booking.objects.visible_to(request.user)
+
+    params = request.GET
+    try:
+        if params.get("start"):
+            bookings = bookings.filter(preferred_date__gte=date.fromisoformat(params["start"]))
+        if params.get("end"):
+            bookings = bookings.filter(preferred_date__lte=date.fromisoformat(params["end"]))
+    except ValueError:
+        raise ApiError("Dates must be YYYY-MM-DD.")
+
+    if params.get("service_type"):
+        if params["service_type"] not in dict(Booking.SERVICE_CHOICES):
+            raise ApiError("Unknown service_type.")
+        bookings = bookings.filter(service_type=params["service_type"])
+
+    if params.get("user"):
+        try:
+            bookings = bookings.filter(user_id=int(params["user"]))
+        except ValueError:
+            raise ApiError("user must be a user id.")
+    return bookings
+
+
+def _lookups(names):
+    # values_list() lookups for ``names``, the cursor key columns first
+    return list(KEY_LOOKUPS) + [
+        BOOKING_FIELDS[name] for name in names if BOOKING_FIELDS[name] not in KEY_LOOKUPS
+    ]
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get("page_size") or settings.BOOKINGS_PAGE_SIZE)
+    except ValueError:
+        raise ApiError("page_size must be a number.")
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def _stream_page(rows, names, positions, next_cursor):
+    # {"results": [...], "next_cursor": ...} in a few chunks
+    yield '{"results":['
+    for start in range(0, len(rows), CHUNK_ROWS):
+        chunk = ",".join(
+            _encoder.encode(dict(zip(names, [row[i] for i in positions])))
+            for row in rows[start : start + CHUNK_ROWS]
+        )
+        yield ("," if start else "") + chunk
+    yield '],"next_cursor":' + json.dumps(next_cursor) + "}"
+
+
+@require_GET
+def bookings(request):
+    if not request.user.is_authenticated:
+        return _error("Authentication required.", status=401)
+    try:
+        names = _requested_fields(request)
+        queryset = _filtered_bookings(request)
+        page_size = _page_size(request)
+    except ApiError as exc:
+        return _error(str(exc))
+
+    lookups = _lookups(names)
+    positions = [lookups.index(BOOKING_FIELDS[name]) for name in names]
+    page = paginate_bookings(
+        queryset.values_list(*lookups),
+        request.GET.get("cursor"),
+        page_size,
+        key=lambda row: row[:3],
+    )
+    rows = page.items
+
+    newest = max((row[3] for row in rows), default=None)
+    etag = _weak_etag(newest, [row[2] for row in rows], page.next_cursor)
+    not_modified = _conditional(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = StreamingHttpResponse(
+        _stream_page(rows, names, positions, page.next_cursor),
+        content_type="application/json",
+    )
+    return _validators(response, etag)
+
+
+# ---------- time slots ----------
+
+
+@require_GET
+def timeslots(request):
+    rows = list(TimeSlot.objects.order_by("start_time", "id").values_list(*TIMESLOT_FIELDS))
+    etag = _weak_etag(rows)
+    not_modified = _conditional(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = JsonResponse(
+        {"results": [dict(zip(TIMESLOT_FIELDS, row)) for row in rows]}
+    )
+    return _validators(response, etag)
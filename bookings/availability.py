@@ -0,0 +1,62 @@
+# bookings/availability.py
+from datetime import timedelta
+
+from .cache import tiered
+from .models import SlotCapacity, TimeSlot
+
+# Longest range the availability endpoint will answer in one request
+MAX_RANGE_DAYS = 90
+NAMESPACE = "availability"
+
+
+def cached_free_capacity(start, end):
+    # free_capacity() through the tiered cache; any seat change invalidates
+    return tiered.get_or_set(
+        NAMESPACE, f"{start}:{end}", lambda: free_capacity(start, end), timeout=60
+    )
+
+
+def invalidate():
+    tiered.invalidate_on_commit(NAMESPACE)
+
+
+def free_capacity(start, end):
+    # Free seats per (day, slot) between start and end inclusive.
+    # Read straight from the SlotCapacity counters that bookings keep up to
+    # date, so cost depends on the number of slots and days, not bookings.
+    slots = list(
+        TimeSlot.objects.order_by("start_time").values_list(
+            "pk", "slot", "start_time", "end_time", "capacity"
+        )
+    )
+    taken = {
+        (day, slot_id): max(cap - reserved, 0)
+        for slot_id, day, cap, reserved in SlotCapacity.objects.filter(
+            date__gte=start, date__lte=end
+        ).values_list("time_slot_id", "date", "capacity", "reserved")
+    }
+
+    days = {}
+    day = start
+    while day <= end:
+        days[day.isoformat()] = {
+            str(pk): taken.get((day, pk), capacity)
+            for pk, _slot, _start, _end, capacity in slots
+        }
+        day += timedelta(days=1)
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "slots": [
+            {
+                "id": pk,
+                "slot": slot,
+                "start_time": start_time.strftime("%H:%M"),
+                "end_time": end_time.strftime("%H:%M"),
+                "capacity": capacity,
+            }
+            for pk, slot, start_time, end_time, capacity in slots
+        ],
+        "days": days,
+    }
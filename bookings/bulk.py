@@ -0,0 +1,218 @@
+# bookings/bulk.py
+# Streaming CSV / NDJSON import and export of bookings for fleet customers.
+#
+# Import reads rows one at a time, validates each with the BookingForm rules
+# (model field checks plus bookings/validators.py), and inserts valid rows in
+# batches through services.bulk_create_bookings, one transaction per batch.
+# Bad rows, and rows for a slot that is already full, are reported with
+# their line number and never abort the batch.
+#
+# Export walks the table with iterator() and yields one encoded row at a
+# time, so memory stays flat however many bookings there are.
+import csv
+import io
+import json
+
+from django.core.exceptions import ValidationError
+
+from . import services
+from .models import Booking, TimeSlot
+from .validators import validate_not_in_past, validate_phone
+
+FORMATS = ("csv", "ndjson")
+
+# Columns read on import; preferred_time_slot holds the TimeSlot.slot code
+FIELDS = (
+    "customer_name",
+    "email",
+    "phone",
+    "car_model",
+    "service_type",
+    "preferred_date",
+    "preferred_time_slot",
+    "notes",
+)
+
+# Columns written on export (a superset of FIELDS, so exports re-import)
+EXPORT_FIELDS = ("id", "user") + FIELDS + ("created_at",)
+EXPORT_LOOKUPS = (
+    "id",
+    "user__username",
+    "customer_name",
+    "email",
+    "phone",
+    "car_model",
+    "service_type",
+    "preferred_date",
+    "preferred_time_slot__slot",
+    "notes",
+    "created_at",
+)
+
+# Extra checks BookingForm runs in clean_<field>()
+EXTRA_VALIDATORS = {
+    "preferred_date": validate_not_in_past,
+    "phone": validate_phone,
+}
+
+SLOT_FULL_MESSAGE = "This time slot is fully booked on that date."
+
+
+class RowError:
+    def __init__(self, line, errors):
+        self.line = line
+        self.errors = errors
+
+    def as_dict(self):
+        return {"line": self.line, "errors": self.errors}
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+
+# ---------- reading ----------
+
+
+def read_rows(stream, fmt):
+    # Yield (line number, dict) from a text stream
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "ndjson":
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                row = exc
+            yield line_num, row
+    else:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}.")
+
+
+class RowValidator:
+    # Cleans raw rows into dicts of Booking field values using the model
+    # fields' own validation (max_length, email, choices, date parsing) plus
+    # the BookingForm extras. Time slots are resolved from one query up front.
+    def __init__(self):
+        self.fields = [Booking._meta.get_field(name) for name in FIELDS]
+        self.slots = {slot.slot: slot for slot in TimeSlot.objects.all()}
+
+    def clean(self, row):
+        # Returns (values, None) or (None, {field: [messages]})
+        if not isinstance(row, dict):
+            return None, {"__all__": [f"Invalid row: {row}"]}
+
+        values, errors = {}, {}
+        for field in self.fields:
+            raw = row.get(field.name)
+            raw = "" if raw is None else str(raw).strip()
+            try:
+                if field.name == "preferred_time_slot":
+                    values[field.name] = self._slot(raw)
+                    continue
+                value = field.clean(raw, None)
+                extra = EXTRA_VALIDATORS.get(field.name)
+                if extra is not None:
+                    extra(value)
+                values[field.name] = value
+            except ValidationError as exc:
+                errors[field.name] = exc.messages
+
+        if errors:
+            return None, errors
+        return values, None
+
+    def _slot(self, code):
+        if not code:
+            raise ValidationError("This field cannot be blank.")
+        try:
+            return self.slots[code]
+        except KeyError:
+            raise ValidationError(f"Unknown time slot {code!r}.") from None
+
+
+def import_bookings(rows, user, batch_size=1000):
+    # rows: iterable of (line number, dict) as produced by read_rows()
+    validator = RowValidator()
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        created, full = services.bulk_create_bookings(user, [v for _, v in batch])
+        result.created += len(created)
+        full = {id(values) for values in full}
+        result.errors.extend(
+            RowError(line, {"preferred_time_slot": [SLOT_FULL_MESSAGE]})
+            for line, values in batch
+            if id(values) in full
+        )
+        batch.clear()
+
+    for line, row in rows:
+        values, errors = validator.clean(row)
+        if errors:
+            result.errors.append(RowError(line, errors))
+            continue
+        batch.append((line, values))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return result
+
+
+# ---------- writing ----------
+
+
+class _Echo:
+    # csv.writer target that hands back each encoded line
+    def write(self, value):
+        return value
+
+
+def export_queryset(queryset):
+    # Plain tuples in EXPORT_FIELDS order
+    return queryset.order_by("pk").values_list(*EXPORT_LOOKUPS)
+
+
+def _export_values(queryset):
+    # export_queryset() fetched in chunks
+    return export_queryset(queryset).iterator(chunk_size=2000)
+
+
+def export_rows(queryset, fmt):
+    # Yield the export as text chunks (header first for CSV)
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for values in _export_values(queryset):
+            yield writer.writerow(values)
+    elif fmt == "ndjson":
+        for values in _export_values(queryset):
+            yield json.dumps(dict(zip(EXPORT_FIELDS, values)), default=str) + "\n"
+    else:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}.")
+
+
+def text_stream(binary):
+    # Wrap an uploaded file / stdin buffer for read_rows()
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+def guess_format(filename, default="csv"):
+    for fmt in FORMATS:
+        if filename.lower().endswith(f".{fmt}") or (
+            fmt == "ndjson" and filename.lower().endswith(".jsonl")
+        ):
+            return fmt
+    return default
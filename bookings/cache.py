@@ -0,0 +1,255 @@
+# bookings/cache.py
+# Two-level cache: a small in-process LRU in front of the shared Django cache
+# configured in settings.CACHES (file, database or memcached).
+#
+# Values live in namespaces. Every namespace has a version number stored in
+# the shared cache and the version is part of every key, so invalidating a
+# namespace is a single increment that all workers see on their next read.
+# Recomputes are single-flight: one thread per process and one process per
+# key does the work while the others wait for its result. Across processes
+# this relies on an atomic cache.add(), which locmem, memcached and the
+# database backend (bookings.cache_backend, also on SQLite) provide; the file
+# backend checks and then writes, so two processes may now and then both
+# compute the same value.
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .routing import use_primary
+
+_MISSING = object()
+
+
+def _fresh_version():
+    # Random base for a namespace version that is missing from the shared
+    # cache: it cannot collide with keys written under any earlier version
+    return uuid.uuid4().int % 10**9 + 2
+
+
+class LocalLRU:
+    # Thread-safe LRU with a per-entry time to live
+    def __init__(self, maxsize=512, ttl=30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    def __init__(
+        self,
+        alias="default",
+        local_size=512,
+        local_ttl=30.0,
+        lock_timeout=10,
+        wait_timeout=5.0,
+        poll_interval=0.01,
+    ):
+        self.alias = alias
+        self.local = LocalLRU(local_size, local_ttl)
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    # ----- versions -----
+
+    def _version_key(self, namespace):
+        return f"tier:{namespace}:version"
+
+    def version(self, namespace):
+        key = self._version_key(namespace)
+        version = self.shared.get(key)
+        if version is None:
+            # Missing or evicted. Starting again at 1 would bring back values
+            # written under an earlier version; another worker may add first.
+            fresh = _fresh_version()
+            self.shared.add(key, fresh, timeout=None)
+            version = self.shared.get(key, fresh)
+        return version
+
+    def invalidate(self, namespace):
+        # Drop every value in ``namespace`` for all workers
+        key = self._version_key(namespace)
+        try:
+            self.shared.incr(key)
+        except ValueError:
+            # Version missing or evicted
+            self.shared.set(key, _fresh_version(), timeout=None)
+
+    def invalidate_on_commit(self, namespace):
+        # Bump now for readers inside this transaction and again after commit,
+        # so a worker that refilled from pre-commit rows is not left stale
+        self.invalidate(namespace)
+        transaction.on_commit(lambda: self.invalidate(namespace))
+
+    # ----- reads -----
+
+    def get_or_set(self, namespace, key, compute, timeout=300):
+        # Return the cached value for ``key`` or call ``compute()`` once
+        full_key = f"tier:{namespace}:{self.version(namespace)}:{key}"
+
+        value = self.local.get(full_key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._flight(full_key):
+            # Another thread may have filled it while we waited
+            value = self.local.get(full_key, _MISSING)
+            if value is not _MISSING:
+                return value
+            value = self._shared_get_or_compute(full_key, compute, timeout)
+
+        self.local.set(full_key, value)
+        return value
+
+    def get_many_or_set(self, namespace, keys, compute_missing, timeout=300):
+        # Bulk get_or_set for many small values: one shared-cache round trip
+        # for every key the local tier lacks, then a single
+        # ``compute_missing(keys) -> {key: value}`` call for the rest. Not
+        # single-flight; meant for values that are cheap to build twice.
+        prefix = f"tier:{namespace}:{self.version(namespace)}:"
+        found, wanted = {}, []
+        for key in keys:
+            value = self.local.get(prefix + key, _MISSING)
+            if value is _MISSING:
+                wanted.append(key)
+            else:
+                found[key] = value
+        if not wanted:
+            return found
+
+        boxed = self.shared.get_many([prefix + key for key in wanted])
+        missing = []
+        for key in wanted:
+            box = boxed.get(prefix + key)
+            if box is None:
+                missing.append(key)
+            else:
+                found[key] = box[0]
+                self.local.set(prefix + key, box[0])
+        if missing:
+            with use_primary():
+                computed = compute_missing(missing)
+            self.shared.set_many(
+                {prefix + key: (value,) for key, value in computed.items()},
+                timeout=timeout,
+            )
+            for key, value in computed.items():
+                self.local.set(prefix + key, value)
+            found.update(computed)
+        return found
+
+    def delete(self, namespace, key):
+        # Drop one value. Other workers' local copies live until local_ttl,
+        # so only use this for keys that a changed value would not reuse.
+        full_key = f"tier:{namespace}:{self.version(namespace)}:{key}"
+        self.local.delete(full_key)
+        self.shared.delete(full_key)
+
+    def _shared_get_or_compute(self, full_key, compute, timeout):
+        shared = self.shared
+        boxed = shared.get(full_key)
+        if boxed is not None:
+            return boxed[0]
+
+        lock_key = f"{full_key}:lock"
+        locked = shared.add(lock_key, 1, timeout=self.lock_timeout)
+        if not locked:
+            # Another process is computing it; wait briefly for its result
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                boxed = shared.get(full_key)
+                if boxed is not None:
+                    return boxed[0]
+            # Holder died or is slow: compute anyway rather than fail
+        try:
+            if locked:
+                # The previous holder may have stored it between our miss
+                # and our add()
+                boxed = shared.get(full_key)
+                if boxed is not None:
+                    return boxed[0]
+            # Never from a replica: a lagging copy would be cached for everyone
+            with use_primary():
+                value = compute()
+            # Boxed so a cached None is distinguishable from a miss
+            shared.set(full_key, (value,), timeout=timeout)
+            return value
+        finally:
+            if locked:
+                shared.delete(lock_key)
+
+    def _flight(self, full_key):
+        with self._flights_lock:
+            lock = self._flights.get(full_key)
+            if lock is None:
+                lock = self._flights[full_key] = _Flight(self, full_key)
+            lock.waiters += 1
+        return lock
+
+
+class _Flight:
+    # Per-key mutex shared by the threads of one process
+    def __init__(self, tier, key):
+        self.tier = tier
+        self.key = key
+        self.lock = threading.Lock()
+        self.waiters = 0
+
+    def __enter__(self):
+        self.lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.lock.release()
+        with self.tier._flights_lock:
+            self.waiters -= 1
+            if not self.waiters:
+                self.tier._flights.pop(self.key, None)
+
+
+# Shared instance used by the bookings app
+tiered = TieredCache(**getattr(settings, "TIERED_CACHE_OPTIONS", {}))
@@ -0,0 +1,33 @@
+# bookings/cache_backend.py
+# CACHES backend "bookings.cache_backend.DatabaseCache" (DJANGO_CACHE_BACKEND=db):
+# Django's DatabaseCache, made safe for concurrent writers on SQLite.
+#
+# Django's add()/set() read the key and then write it in one transaction and
+# swallow any DatabaseError. On SQLite that transaction starts as a reader,
+# so when another worker writes in between, the write fails at once with
+# "database is locked" (busy_timeout does not help a stale snapshot): set()
+# stores nothing and add() reports a lock as taken that nobody holds. The
+# tiered cache's single-flight then waits out its wait_timeout and computes
+# again. Taking the write lock before the read makes every write wait its
+# turn instead of failing.
+from django.core.cache.backends import db
+from django.db import DatabaseError, connections, router, transaction
+
+
+class DatabaseCache(db.DatabaseCache):
+    def _base_set(self, mode, key, value, timeout=db.DEFAULT_TIMEOUT):
+        using = router.db_for_write(self.cache_model_class)
+        connection = connections[using]
+        if connection.vendor != "sqlite":
+            return super()._base_set(mode, key, value, timeout)
+        try:
+            with transaction.atomic(using=using):
+                with connection.cursor() as cursor:
+                    # A write that matches nothing still takes the write lock
+                    cursor.execute(
+                        "DELETE FROM %s WHERE 1 = 0" % connection.ops.quote_name(self._table)
+                    )
+                return super()._base_set(mode, key, value, timeout)
+        except DatabaseError:
+            # Still waited busy_timeout; fail like the base class does
+            return False
@@ -0,0 +1,123 @@
+# bookings/capacity.py
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from . import availability
+from .models import SlotCapacity
+
+
+class SlotFullError(Exception):
+    # Raised when a time slot has no free seat left on the requested day
+    def __init__(self, time_slot, day):
+        self.time_slot = time_slot
+        self.day = day
+        super().__init__(f"{time_slot} is fully booked on {day}")
+
+
+def _claim(time_slot_id, day, seats):
+    # Single conditional UPDATE: succeeds only while enough seats are left
+    return SlotCapacity.objects.filter(
+        time_slot_id=time_slot_id,
+        date=day,
+        reserved__lte=F("capacity") - seats,
+    ).update(reserved=F("reserved") + seats)
+
+
+def reserve(time_slot, day, seats=1):
+    # Take ``seats`` from the (slot, day) counter or raise SlotFullError.
+    # Callers run this inside the same transaction that saves the booking so
+    # a failed save gives the seat back.
+    with transaction.atomic():
+        if _claim(time_slot.pk, day, seats):
+            availability.invalidate()
+            return
+        # First booking for this slot on this day: create the counter row.
+        # get_or_create absorbs the race where two workers create it at once.
+        SlotCapacity.objects.get_or_create(
+            time_slot_id=time_slot.pk,
+            date=day,
+            defaults={"capacity": time_slot.capacity},
+        )
+        if not _claim(time_slot.pk, day, seats):
+            raise SlotFullError(time_slot, day)
+        availability.invalidate()
+
+
+def _free(time_slot_id, day):
+    counter = SlotCapacity.objects.only("capacity", "reserved").get(
+        time_slot_id=time_slot_id, date=day
+    )
+    return counter.free
+
+
+def _claim_sql():
+    # _claim() as one prepared statement. Compiling the ORM update costs far
+    # more than running it, which adds up over thousands of counters.
+    qn = connection.ops.quote_name
+    return (
+        f"UPDATE {qn(SlotCapacity._meta.db_table)} "
+        f"SET {qn('reserved')} = {qn('reserved')} + %s "
+        f"WHERE {qn('time_slot_id')} = %s AND {qn('date')} = %s "
+        f"AND {qn('reserved')} <= {qn('capacity')} - %s"
+    )
+
+
+def reserve_many(wanted):
+    # Bulk form of reserve() for imports. ``wanted`` maps (time_slot, day) to
+    # seats; takes as many as are free on each counter (never more) and
+    # returns {(time_slot, day): seats granted}. Run inside the transaction
+    # that inserts the bookings.
+    granted = {}
+    if not wanted:
+        return granted
+    with transaction.atomic():
+        free = {
+            (slot_id, day): capacity - reserved
+            for slot_id, day, capacity, reserved in SlotCapacity.objects.filter(
+                time_slot_id__in={time_slot.pk for time_slot, _ in wanted},
+                date__in={day for _, day in wanted},
+            ).values_list("time_slot_id", "date", "capacity", "reserved")
+        }
+        missing = [
+            SlotCapacity(time_slot=time_slot, date=day, capacity=time_slot.capacity)
+            for time_slot, day in wanted
+            if (time_slot.pk, day) not in free
+        ]
+        # ignore_conflicts: another worker may create the same counter
+        SlotCapacity.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+        for counter in missing:
+            free[(counter.time_slot_id, counter.date)] = counter.capacity
+
+        sql = _claim_sql()
+        with connection.cursor() as cursor:
+            for (time_slot, day), seats in wanted.items():
+                seats = min(seats, max(free[(time_slot.pk, day)], 0))
+                db_day = connection.ops.adapt_datefield_value(day)
+                # The free count above may be stale; re-read it if the claim misses
+                while seats:
+                    cursor.execute(sql, [seats, time_slot.pk, db_day, seats])
+                    if cursor.rowcount:
+                        break
+                    seats = min(seats, _free(time_slot.pk, day))
+                granted[(time_slot, day)] = seats
+        if any(granted.values()):
+            availability.invalidate()
+    return granted
+
+
+def release(time_slot_id, day, seats=1):
+    # Give seats back when a booking is moved or deleted
+    SlotCapacity.objects.filter(
+        time_slot_id=time_slot_id, date=day, reserved__gte=seats
+    ).update(reserved=F("reserved") - seats)
+    availability.invalidate()
+
+
+def sync_slot_capacity(time_slot):
+    # Push a changed TimeSlot.capacity onto today's and future counters
+    SlotCapacity.objects.filter(
+        time_slot=time_slot, date__gte=date.today()
+    ).update(capacity=time_slot.capacity)
+    availability.invalidate()
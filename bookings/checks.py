@@ -0,0 +1,33 @@
+# bookings/checks.py
+# System checks (`manage.py check`, run by runserver and migrate too).
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+LOCMEM = f"{LocMemCache.__module__}.{LocMemCache.__name__}"
+
+
+@register(Tags.caches)
+def caches_are_shared(app_configs, **kwargs):
+    # A per-process cache leaves every worker with its own invalidations
+    # (stale booking pages and slot choices on the others) and its own
+    # throttle counts (THROTTLE_RATES times the number of workers)
+    if settings.DEBUG:
+        return []
+    uses = {}
+    tier_alias = getattr(settings, "TIERED_CACHE_OPTIONS", {}).get("alias", "default")
+    uses.setdefault(tier_alias, []).append("the cache tier (pages, slot choices, sessions)")
+    if settings.THROTTLE_RATES:
+        uses.setdefault(settings.THROTTLE_CACHE, []).append("throttle counts")
+    return [
+        Warning(
+            f"Cache {alias!r} is process-local ({LOCMEM}).",
+            hint=(
+                f"Workers do not share {' or '.join(what)}. Set "
+                "DJANGO_CACHE_BACKEND to db, file or memcached."
+            ),
+            id="bookings.W001",
+        )
+        for alias, what in uses.items()
+        if settings.CACHES[alias]["BACKEND"] == LOCMEM
+    ]
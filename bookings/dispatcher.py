@@ -0,0 +1,171 @@
+# bookings/dispatcher.py
+# asyncio dispatcher for the outbox (bookings/outbox.py).
+#
+# Each round claims a batch of due messages with a lease (so several
+# dispatchers never send the same message), sends them over a few
+# concurrent lanes - one email backend connection per lane, run in worker
+# threads because Django's email backends are blocking - and records the
+# outcome. Failures are retried with jittered exponential backoff until
+# max_attempts, then left as FAILED for staff to inspect in the admin.
+#
+#   python manage.py run_outbox            # loop forever
+#   python manage.py run_outbox --once     # drain what is due and exit
+import asyncio
+import random
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from . import outbox
+from .models import OutboxMessage
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        batch_size=50,
+        concurrency=4,
+        max_attempts=8,
+        backoff=5.0,
+        backoff_max=3600.0,
+        lease=300.0,
+        backend=None,
+    ):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.lease = lease
+        # Dotted path of the email backend; None means settings.EMAIL_BACKEND
+        self.backend = backend
+
+    @classmethod
+    def from_settings(cls, **overrides):
+        options = dict(getattr(settings, "OUTBOX_DISPATCHER", {}))
+        options.update(overrides)
+        return cls(**options)
+
+    # ----- database (sync, run via sync_to_async) -----
+
+    def _claim(self):
+        now = timezone.now()
+        due = list(
+            OutboxMessage.objects.filter(
+                status=OutboxMessage.PENDING, available_at__lte=now
+            )
+            .order_by("available_at", "pk")
+            .values_list("pk", flat=True)[: self.batch_size]
+        )
+        if not due:
+            return []
+        # Conditional UPDATE: a message another dispatcher leased in the
+        # meantime no longer matches, so it is never claimed twice
+        token = uuid.uuid4().hex
+        OutboxMessage.objects.filter(
+            pk__in=due, status=OutboxMessage.PENDING, available_at__lte=now
+        ).update(lease=token, available_at=now + timedelta(seconds=self.lease))
+        return list(OutboxMessage.objects.filter(lease=token))
+
+    def _record(self, sent, failed):
+        now = timezone.now()
+        if sent:
+            OutboxMessage.objects.filter(pk__in=[m.pk for m in sent]).update(
+                status=OutboxMessage.SENT,
+                sent_at=now,
+                lease="",
+                attempts=F("attempts") + 1,
+                last_error="",
+            )
+        for message, error in failed:
+            attempts = message.attempts + 1
+            OutboxMessage.objects.filter(pk=message.pk).update(
+                status=(
+                    OutboxMessage.FAILED
+                    if attempts >= self.max_attempts
+                    else OutboxMessage.PENDING
+                ),
+                attempts=attempts,
+                available_at=now + timedelta(seconds=self.retry_delay(attempts)),
+                lease="",
+                last_error=error[:2000],
+            )
+
+    def retry_delay(self, attempts):
+        delay = min(self.backoff * 2 ** (attempts - 1), self.backoff_max)
+        return random.uniform(delay / 2, delay)
+
+    # ----- sending (blocking, run in worker threads) -----
+
+    def _send_lane(self, messages):
+        # One backend connection for the whole lane; per-message outcome
+        sent, failed = [], []
+        connection = get_connection(self.backend)
+        try:
+            connection.open()
+            for message in messages:
+                try:
+                    email = outbox.render(message)
+                    email.connection = connection
+                    email.send()
+                except Exception as exc:
+                    failed.append((message, f"{type(exc).__name__}: {exc}"))
+                else:
+                    sent.append(message)
+        except Exception as exc:
+            # Could not connect: every message not yet sent is retried
+            done = {m.pk for m in sent} | {m.pk for m, _ in failed}
+            failed += [
+                (m, f"{type(exc).__name__}: {exc}") for m in messages if m.pk not in done
+            ]
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        return sent, failed
+
+    # ----- asyncio -----
+
+    async def drain_once(self):
+        # Claim and deliver one batch; returns how many messages were handled
+        messages = await sync_to_async(self._claim)()
+        if not messages:
+            return 0
+
+        lanes = [messages[i :: self.concurrency] for i in range(self.concurrency)]
+        results = await asyncio.gather(
+            *(
+                sync_to_async(self._send_lane, thread_sensitive=False)(lane)
+                for lane in lanes
+                if lane
+            )
+        )
+        sent = [m for lane_sent, _ in results for m in lane_sent]
+        failed = [f for _, lane_failed in results for f in lane_failed]
+        await sync_to_async(self._record)(sent, failed)
+        return len(messages)
+
+    async def drain(self):
+        # Deliver everything that is due now
+        total = 0
+        while True:
+            handled = await self.drain_once()
+            total += handled
+            if handled < self.batch_size:
+                return total
+
+    async def run(self, poll_interval=2.0, stop=None):
+        # Loop until ``stop`` (an asyncio.Event) is set
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            await self.drain()
+            try:
+                await asyncio.wait_for(stop.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
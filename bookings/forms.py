@@ -1,12 +1,46 @@
 from django import forms
-from datetime import date
-from .models import Booking
+from .models import Booking, TimeSlot
+from .slot_cache import slot_choices
+from .validators import validate_not_in_past, validate_phone
+
+
+class CachedSlotChoiceIterator:
+    # Stand-in for ModelChoiceIterator that reads labels from slot_cache
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        yield from slot_choices()
+
+    def __len__(self):
+        return len(slot_choices()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(slot_choices())
+
+
+class CachedSlotChoiceField(forms.ModelChoiceField):
+    # Renders from the process-local slot cache; validation still checks the
+    # submitted pk against the database.
+    def _get_choices(self):
+        if hasattr(self, "_choices"):
+            return self._choices
+        return CachedSlotChoiceIterator(self)
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
 
 class BookingForm(forms.ModelForm):
     
     preferred_date = forms.DateField(
     widget=forms.DateInput(attrs={"type": "date"})
     )
+
+    preferred_time_slot = CachedSlotChoiceField(
+        queryset=TimeSlot.objects.all(), label="Preferred time slot"
+    )
     
     # Required fields for fillings the booking form
     class Meta:
@@ -24,15 +58,10 @@ class BookingForm(forms.ModelForm):
 
     def clean_preferred_date(self):
         chosen_date = self.cleaned_data["preferred_date"]
-        # Do not allow bookings in the past
-        if chosen_date < date.today():
-            raise forms.ValidationError("Preferred date cannot be in the past.")
+        validate_not_in_past(chosen_date)
         return chosen_date
 
     def clean_phone(self):
         phone = self.cleaned_data["phone"]
-        # Basic validation for phone number length
-        digits = [c for c in phone if c.isdigit()]
-        if len(digits) < 7:
-            raise forms.ValidationError("Phone number seems too short.")
+        validate_phone(phone)
         return phone
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings import query_plans
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot booking queries and fail if any of them scans a whole "
+        "table or sorts without an index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", default="default", help="Database alias to check."
+        )
+
+    def handle(self, *args, **options):
+        failed = 0
+        for query, lines, problems in query_plans.check(using=options["database"]):
+            if problems:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"FAIL {query.label}"))
+                for problem in problems:
+                    self.stdout.write(f"    {problem}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok   {query.label}"))
+            if problems or options["verbosity"] >= 2:
+                for line in lines:
+                    self.stdout.write(f"        {line}")
+
+        if failed:
+            raise CommandError(f"{failed} hot queries have unindexed plans.")
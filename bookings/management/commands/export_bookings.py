@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from bookings import bulk
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = "Stream all bookings as CSV or NDJSON to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=bulk.FORMATS, default="csv")
+        parser.add_argument("--output", help="File to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        chunks = bulk.export_rows(Booking.objects.all(), options["format"])
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            output.writelines(chunks)
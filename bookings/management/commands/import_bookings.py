@@ -0,0 +1,54 @@
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings import bulk
+
+
+class Command(BaseCommand):
+    help = "Import bookings from a CSV or NDJSON file (or - for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or - for stdin.")
+        parser.add_argument(
+            "--user", required=True, help="Username that will own the bookings."
+        )
+        parser.add_argument(
+            "--format",
+            choices=bulk.FORMATS,
+            help="Defaults to the file extension (csv when reading stdin).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['user']!r}.")
+
+        path = options["path"]
+        fmt = options["format"] or bulk.guess_format(path)
+        source = sys.stdin.buffer if path == "-" else open(path, "rb")
+
+        started = time.perf_counter()
+        with bulk.text_stream(source) as stream:
+            result = bulk.import_bookings(
+                bulk.read_rows(stream, fmt), user, options["batch_size"]
+            )
+        elapsed = time.perf_counter() - started
+
+        for error in result.errors:
+            messages = "; ".join(
+                f"{field}: {' '.join(msgs)}" for field, msgs in error.errors.items()
+            )
+            self.stderr.write(f"line {error.line}: {messages}")
+
+        rows = result.created + result.rejected
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.created} bookings, rejected {result.rejected} "
+                f"({rows / elapsed if elapsed else 0:.0f} rows/s)."
+            )
+        )
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings import startup_profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Start fresh interpreters and report import time per module, the "
+        "warmup steps and time to first response, with and without warmup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            default=list(startup_profile.DEFAULT_PATHS),
+            help="Paths requested after startup (GET, anonymous).",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Cold starts per variant.")
+        parser.add_argument("--top", type=int, default=15, help="Modules listed by self time.")
+        parser.add_argument(
+            "--debug", action="store_true", help="Profile with DEBUG on (no cached loader)."
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"]
+        try:
+            variants = {
+                label: startup_profile.profile(
+                    paths, warm=warm, repeat=options["repeat"], production=not options["debug"]
+                )
+                for label, warm in (("no warmup", False), ("warmup", True))
+            }
+        except RuntimeError as exc:
+            raise CommandError(f"Child process failed: {exc}")
+
+        imports = variants["no warmup"]["imports"]
+        total = sum(self_us for _, self_us, _, _ in imports) / 1000
+        self.stdout.write(f"Imports: {len(imports)} modules, {total:.1f} ms")
+        for package, self_us in list(startup_profile.by_package(imports).items())[:8]:
+            self.stdout.write(f"  {package:<40} {self_us / 1000:8.1f} ms")
+        self.stdout.write("\nSlowest modules (self / cumulative):")
+        slowest = sorted(imports, key=lambda item: item[1], reverse=True)[: options["top"]]
+        for module, self_us, cumulative_us, _ in slowest:
+            self.stdout.write(
+                f"  {module:<40} {self_us / 1000:8.1f} ms {cumulative_us / 1000:8.1f} ms"
+            )
+
+        rows = [("load (import + setup)", {k: v["load"] for k, v in variants.items()})]
+        for step in variants["warmup"]["warmup"]:
+            rows.append((f"warmup: {step}", {"warmup": variants["warmup"]["warmup"][step]}))
+        for attempt, path in variants["warmup"]["requests"]:
+            rows.append(
+                (
+                    f"{attempt} GET {path}",
+                    {k: v["requests"][(attempt, path)] for k, v in variants.items()},
+                )
+            )
+        rows.append(
+            ("time to first response", {k: v["first_response"] for k, v in variants.items()})
+        )
+
+        self.stdout.write(f"\nMedian of {options['repeat']} cold starts (ms):")
+        self.stdout.write(f"  {'':<40} {'no warmup':>10} {'warmup':>10}")
+        for label, values in rows:
+            cells = [
+                f"{values[variant]:10.1f}" if variant in values else f"{'-':>10}"
+                for variant in variants
+            ]
+            self.stdout.write(f"  {label:<40} {' '.join(cells)}")
+
+        for path, status in variants["warmup"]["statuses"].items():
+            if status >= 400:
+                self.stdout.write(self.style.WARNING(f"{path} answered {status}"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from bookings import availability
+from bookings.models import Booking, SlotCapacity, TimeSlot
+
+
+class Command(BaseCommand):
+    help = "Recompute the SlotCapacity seat counters from the bookings table."
+
+    def handle(self, *args, **options):
+        capacities = dict(TimeSlot.objects.values_list("pk", "capacity"))
+        taken = (
+            Booking.objects.values("preferred_time_slot_id", "preferred_date")
+            .annotate(n=Count("pk"))
+            .order_by()
+        )
+
+        with transaction.atomic():
+            SlotCapacity.objects.all().delete()
+            SlotCapacity.objects.bulk_create(
+                (
+                    SlotCapacity(
+                        time_slot_id=row["preferred_time_slot_id"],
+                        date=row["preferred_date"],
+                        capacity=max(
+                            capacities[row["preferred_time_slot_id"]], row["n"]
+                        ),
+                        reserved=row["n"],
+                    )
+                    for row in taken.iterator()
+                ),
+                batch_size=1000,
+            )
+            availability.invalidate()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {SlotCapacity.objects.count()} slot counters.")
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the analytics rollups (BookingRollup) from the bookings table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare the rollups with a full recompute; fail if they differ.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            differences = rollups.check()
+            for key, stored, expected in differences[:20]:
+                self.stdout.write(f"{key}: stored {stored}, expected {expected}")
+            if differences:
+                raise CommandError(f"{len(differences)} rollup rows differ.")
+            self.stdout.write(self.style.SUCCESS("Rollups match the bookings table."))
+            return
+
+        rows = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} rollup rows."))
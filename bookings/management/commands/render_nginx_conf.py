@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.security import render_nginx_static_conf
+
+STATIC_CONF = (
+    Path(settings.BASE_DIR) / ".platform/nginx/conf.d/elasticbeanstalk/static.conf"
+)
+
+
+class Command(BaseCommand):
+    help = "Write the nginx static.conf security headers from SECURITY_HEADER_POLICIES."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if the checked-in static.conf differs instead of writing it.",
+        )
+
+    def handle(self, *args, **options):
+        rendered = render_nginx_static_conf()
+        if options["check"]:
+            if STATIC_CONF.read_text() != rendered:
+                raise CommandError(
+                    f"{STATIC_CONF} is out of date; run `manage.py render_nginx_conf`."
+                )
+            self.stdout.write(self.style.SUCCESS("static.conf is up to date."))
+            return
+
+        STATIC_CONF.write_text(rendered)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {STATIC_CONF}."))
@@ -0,0 +1,42 @@
+import asyncio
+import signal
+
+from django.core.management.base import BaseCommand
+
+from bookings.dispatcher import OutboxDispatcher
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox messages (booking confirmation emails)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Drain what is due now and exit."
+        )
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--concurrency", type=int)
+        parser.add_argument("--interval", type=float, default=2.0, help="Poll seconds.")
+
+    def handle(self, *args, **options):
+        overrides = {
+            name: options[name]
+            for name in ("batch_size", "concurrency")
+            if options[name] is not None
+        }
+        dispatcher = OutboxDispatcher.from_settings(**overrides)
+
+        if options["once"]:
+            handled = asyncio.run(dispatcher.drain())
+            self.stdout.write(self.style.SUCCESS(f"Handled {handled} messages."))
+            return
+
+        asyncio.run(self._run_forever(dispatcher, options["interval"]))
+
+    async def _run_forever(self, dispatcher, interval):
+        # Finish the current batch and exit on SIGTERM / SIGINT
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        self.stdout.write("Outbox dispatcher running.")
+        await dispatcher.run(interval, stop)
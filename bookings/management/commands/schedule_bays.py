@@ -0,0 +1,46 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings import scheduling, services
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign the bookings of one day to detailing bays and start times. "
+        "Prints the plan; --apply stores it on the bookings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("day", help="Day to plan (YYYY-MM-DD).")
+        parser.add_argument(
+            "--apply", action="store_true", help="Save bay and start time on each booking."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options["day"])
+        except ValueError:
+            raise CommandError("day must be YYYY-MM-DD.")
+        bays = scheduling.active_bays()
+        if not bays:
+            raise CommandError("No active bays. Add some in the admin first.")
+
+        plan = scheduling.plan_day(day, bays)
+        if options["verbosity"] >= 2:
+            for pk, (bay_id, start) in sorted(plan.assignments.items(), key=lambda a: a[1]):
+                self.stdout.write(f"  bay {bay_id}  {scheduling.clock(start):%H:%M}  booking {pk}")
+        self.stdout.write(
+            f"{day}: {len(plan.assignments)} bookings on {plan.bays_used}/{len(bays)} bays, "
+            f"{plan.utilization:.0%} of bay time booked"
+        )
+        if plan.unscheduled:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(plan.unscheduled)} bookings do not fit: "
+                    + ", ".join(map(str, sorted(plan.unscheduled)))
+                )
+            )
+        if options["apply"]:
+            saved = services.apply_bay_plan(day, plan)
+            self.stdout.write(self.style.SUCCESS(f"Saved {saved} assignments."))
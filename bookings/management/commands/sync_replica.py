@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from cardetailing.db import copy_sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite primary over its read replicas (DJANGO_DB_REPLICAS). "
+        "Postgres replicas follow the primary by streaming replication."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep copying every INTERVAL seconds (the replicas' lag).",
+        )
+
+    def handle(self, *args, **options):
+        primary = connections["default"]
+        replicas = [connections[alias] for alias in settings.DATABASE_REPLICAS]
+        if not replicas:
+            raise CommandError("No replicas configured (DJANGO_DB_REPLICAS).")
+        if primary.vendor != "sqlite":
+            raise CommandError("Only SQLite replicas are copied by this command.")
+
+        while True:
+            started = time.perf_counter()
+            for replica in replicas:
+                copy_sqlite(primary.settings_dict["NAME"], replica.settings_dict["NAME"])
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"Copied to {len(replicas)} replicas in {elapsed:.0f} ms.")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,138 @@
+# bookings/metrics.py
+# In-process request metrics, keyed by URL name: wall time, SQL query count,
+# DB time and template render time. Each worker keeps a rolling window of
+# recent samples per view for p50/p95/p99 and exports them in Prometheus text
+# format on /metrics/. Fed by PerformanceMetricsMiddleware and
+# TimedDjangoTemplates.
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    # Accumulates DB and template time for the request being served
+    __slots__ = ("queries", "db_seconds", "template_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def start_request():
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def add_template_time(seconds):
+    timings = _current.get()
+    if timings is not None:
+        timings.template_seconds += seconds
+
+
+class RollingSummary:
+    # Last ``window`` samples for quantiles, plus lifetime count and sum
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in QUANTILES}
+        last = len(ordered) - 1
+        return {q: ordered[min(int(q * len(ordered)), last)] for q in QUANTILES}
+
+
+class ViewMetrics:
+    FIELDS = ("duration", "queries", "db", "template")
+
+    def __init__(self, window):
+        for field in self.FIELDS:
+            setattr(self, field, RollingSummary(window))
+        self.last = None
+
+
+# (metric name, help, ViewMetrics attribute)
+EXPORTED = (
+    ("cardetailing_request_duration_seconds", "Request wall time per view.", "duration"),
+    ("cardetailing_db_queries", "SQL queries per request.", "queries"),
+    ("cardetailing_db_duration_seconds", "Time spent in SQL per request.", "db"),
+    ("cardetailing_template_render_seconds", "Template render time per request.", "template"),
+)
+
+
+class Registry:
+    def __init__(self, window=1024):
+        self.window = window
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, duration, queries, db, template):
+        with self._lock:
+            metrics = self._views.get(view)
+            if metrics is None:
+                metrics = self._views[view] = ViewMetrics(self.window)
+            metrics.duration.observe(duration)
+            metrics.queries.observe(queries)
+            metrics.db.observe(db)
+            metrics.template.observe(template)
+            metrics.last = {
+                "duration": duration,
+                "queries": queries,
+                "db": db,
+                "template": template,
+            }
+
+    def last(self, view):
+        # Most recent observation for ``view`` (used by query budget tests)
+        metrics = self._views.get(view)
+        return metrics.last if metrics else None
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            views = sorted(self._views.items())
+            for name, help_text, field in EXPORTED:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} summary")
+                for view, metrics in views:
+                    summary = getattr(metrics, field)
+                    for q, value in summary.quantiles().items():
+                        lines.append(f'{name}{{view="{view}",quantile="{q}"}} {value:.6g}')
+                    lines.append(f'{name}_sum{{view="{view}"}} {summary.total:.6g}')
+                    lines.append(f'{name}_count{{view="{view}"}} {summary.count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry(window=getattr(settings, "PERF_METRICS_WINDOW", 1024))
@@ -1,32 +1,210 @@
 # bookings/middleware.py
+import os
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+from . import metrics, routing, static_files, throttling
+from .security import compile_policies, new_nonce
+
+
 class SecurityHeadersMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
+        # Header values are built once per process from settings; per response
+        # we only pick a policy and copy its precomputed (name, value) pairs
+        policies = compile_policies()
+        self.default_policy = policies["default"]
+        self.route_policies = {
+            url_name: policies[name]
+            for url_name, name in settings.SECURITY_HEADER_ROUTES.items()
+        }
+        self.content_type_policies = {
+            content_type: policies[name]
+            for content_type, name in settings.SECURITY_HEADER_CONTENT_TYPES.items()
+        }
+        self.uses_nonce = any(p.csp_nonce_parts for p in policies.values())
+
     def __call__(self, request):
+        nonce = []
+        if self.uses_nonce:
+            # Templates use {{ request.csp_nonce }}; the token is only
+            # generated (and added to the CSP) if something reads it
+            request.csp_nonce = SimpleLazyObject(
+                lambda: nonce.append(new_nonce()) or nonce[0]
+            )
+
         response = self.get_response(request)
 
-        # Basic security headers
-        response.setdefault("X-Frame-Options", "DENY") # Prevents clickjacking by blocking the page from being embedded in iframes on other sites.
-        response.setdefault("Referrer-Policy", "same-origin") # Limits referrer information sent to same-origin requests only, reducing data leakage risks.
-        response.setdefault("X-Content-Type-Options", "nosniff")
-
-        # Site isolation to prevent cross-origin attacks like Spectre – helps with ZAP 90004
-        response.setdefault("Cross-Origin-Opener-Policy", "same-origin")
-        response.setdefault("Cross-Origin-Embedder-Policy", "require-corp")
-        response.setdefault("Cross-Origin-Resource-Policy", "same-origin")
-        response.setdefault("Permissions-Policy","geolocation=(), microphone=(), camera=()",)
-        # Content Security Policy (CSP)
-        csp = (
-            "default-src 'self'; "
-            "script-src 'self'; "
-            "style-src 'self' https://cdn.jsdelivr.net; "
-            "img-src 'self' https://images.unsplash.com data:; "
-            "font-src 'self' data:; "
-            "frame-ancestors 'none'; "
-            "base-uri 'self'; "
-            "form-action 'self';"
+        policy = self.policy_for(request, response)
+        policy.apply(response, nonce[0] if nonce else None)
+        return response
+
+    def policy_for(self, request, response):
+        match = request.resolver_match
+        if match is not None and match.url_name in self.route_policies:
+            return self.route_policies[match.url_name]
+        content_type = response.get("Content-Type", "").partition(";")[0]
+        return self.content_type_policies.get(content_type, self.default_policy)
+
+
+class HealthCheckMiddleware:
+    # Answers load balancer liveness probes before sessions, CSRF, auth and
+    # messages run. Goes first in MIDDLEWARE; everything else passes through.
+    BODY = b'{"status": "ok"}'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.path = settings.HEALTH_CHECK_PATH
+        policy_name = settings.SECURITY_HEADER_ROUTES.get("health", "default")
+        self.policy = compile_policies()[policy_name]
+
+    def __call__(self, request):
+        if request.path_info == self.path and request.method in ("GET", "HEAD"):
+            response = HttpResponse(self.BODY, content_type="application/json")
+            self.policy.apply(response)
+            return response
+        return self.get_response(request)
+
+
+class StaticFilesMiddleware:
+    # Serves STATIC_ROOT (collectstatic output) with precompressed variants
+    # when nginx is not in front; see bookings/static_files.py. Behind nginx
+    # /static/ never reaches Django. Sits right after HealthCheckMiddleware
+    # so asset requests skip sessions, auth and metrics.
+    def __init__(self, get_response):
+        if not settings.SERVE_STATIC or not os.path.isdir(settings.STATIC_ROOT):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.files = static_files.build_index(settings.STATIC_ROOT, settings.STATIC_URL)
+        # Same headers nginx adds to static.conf
+        self.policy = compile_policies()["default"]
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD"):
+            static = self.files.get(request.path_info)
+            if static is not None:
+                response = static_files.serve(request, static)
+                self.policy.apply(response)
+                return response
+        return self.get_response(request)
+
+
+class PerformanceMetricsMiddleware:
+    # Records wall time, SQL count, DB time and template time per URL name in
+    # bookings.metrics.registry. With PERF_SERVER_TIMING on, also adds a
+    # Server-Timing header so browser dev tools show the breakdown.
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(timings.sql_wrapper))
+                response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.url_name if match is not None and match.url_name else "unmatched"
+        metrics.registry.observe(
+            view, duration, timings.queries, timings.db_seconds, timings.template_seconds
         )
-        response.setdefault("Content-Security-Policy", csp)
 
+        if settings.PERF_SERVER_TIMING:
+            response["Server-Timing"] = (
+                f"app;dur={duration * 1000:.1f}, "
+                f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.queries} queries", '
+                f"tpl;dur={timings.template_seconds * 1000:.1f}"
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    # Lets bookings.routing.ReplicaRouter send a request's reads to a
+    # replica and pins clients that just wrote to the primary for
+    # REPLICA_PIN_SECONDS (longer than the replicas' worst lag). The pin is a
+    # cookie holding its expiry time; it only decides where its own client
+    # reads from, so it is not signed. Goes before SessionMiddleware so the
+    # session save at the end of a request counts as a write.
+    def __init__(self, get_response):
+        self.replicas = list(settings.DATABASE_REPLICAS)
+        if not self.replicas:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pin_seconds = settings.REPLICA_PIN_SECONDS
+
+    def pinned(self, request):
+        try:
+            return float(request.COOKIES.get(routing.PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def __call__(self, request):
+        replica = None
+        if request.method in ("GET", "HEAD") and not self.pinned(request):
+            replica = random.choice(self.replicas)
+        with routing.request_reads(replica) as reads:
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = routing.stream_reads(
+                reads, response.streaming_content
+            )
+        if reads.wrote:
+            response.set_cookie(
+                routing.PIN_COOKIE,
+                str(int(time.time()) + self.pin_seconds),
+                max_age=self.pin_seconds,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+        return response
+
+
+class ThrottleMiddleware:
+    # Answers 429 to POSTs over settings.THROTTLE_RATES (see
+    # bookings/throttling.py) before the view runs, so a bot storm costs
+    # cache increments instead of form validation, password hashing and
+    # inserts. Last in MIDDLEWARE: process_view runs once the URL is
+    # resolved, and the 429 still gets the security headers.
+    def __init__(self, get_response):
+        self.rules = throttling.compile_rules(
+            settings.THROTTLE_RATES, settings.THROTTLE_CACHE
+        )
+        if not self.rules:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.proxy_count = settings.THROTTLE_PROXY_COUNT
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method != "POST":
+            return None
+        url_name = request.resolver_match.url_name
+        rules = self.rules.get(url_name)
+        if rules is None:
+            return None
+        retry_after = throttling.check(request, url_name, rules, self.proxy_count)
+        if retry_after is None:
+            return None
+        response = HttpResponse(
+            b"Too many requests, please try again shortly.\n",
+            status=429,
+            content_type="text/plain; charset=utf-8",
+        )
+        response["Retry-After"] = str(retry_after)
         return response
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_alter_booking_notes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-preferred_date', 'preferred_time_slot', '-id'], name='booking_date_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', '-preferred_date', '-id'], name='booking_user_date_idx'),
+        ),
+    ]
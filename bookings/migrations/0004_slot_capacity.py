@@ -0,0 +1,57 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_counters(apps, schema_editor):
+    # Seed a counter for every (slot, day) that already has bookings
+    Booking = apps.get_model("bookings", "Booking")
+    SlotCapacity = apps.get_model("bookings", "SlotCapacity")
+    TimeSlot = apps.get_model("bookings", "TimeSlot")
+
+    capacities = dict(TimeSlot.objects.values_list("pk", "capacity"))
+    taken = (
+        Booking.objects.values("preferred_time_slot_id", "preferred_date")
+        .annotate(n=models.Count("pk"))
+        .order_by()
+    )
+    SlotCapacity.objects.bulk_create(
+        SlotCapacity(
+            time_slot_id=row["preferred_time_slot_id"],
+            date=row["preferred_date"],
+            capacity=max(capacities[row["preferred_time_slot_id"]], row["n"]),
+            reserved=row["n"],
+        )
+        for row in taken
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeslot',
+            name='capacity',
+            field=models.PositiveSmallIntegerField(default=4),
+        ),
+        migrations.CreateModel(
+            name='SlotCapacity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('capacity', models.PositiveSmallIntegerField()),
+                ('reserved', models.PositiveSmallIntegerField(default=0)),
+                ('time_slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='capacities', to='bookings.timeslot')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='slotcapacity',
+            constraint=models.UniqueConstraint(fields=('time_slot', 'date'), name='slot_capacity_unique_day'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_slot_capacity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='slotcapacity',
+            index=models.Index(fields=['date'], name='slot_capacity_date_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+def copy_start_times(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    TimeSlot = apps.get_model("bookings", "TimeSlot")
+    for slot_id, start_time in TimeSlot.objects.values_list("pk", "start_time"):
+        Booking.objects.filter(preferred_time_slot_id=slot_id).update(
+            preferred_start_time=start_time
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_outbox_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='preferred_start_time',
+            field=models.TimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(copy_start_times, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='booking',
+            name='preferred_start_time',
+            field=models.TimeField(editable=False),
+        ),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_user_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-preferred_date', '-preferred_start_time', '-id'], name='booking_date_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', '-preferred_date', '-preferred_start_time', '-id'], name='booking_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-created_at'], name='booking_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(fields=['start_time'], name='timeslot_start_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:36
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_booking_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Bay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('opens_at', models.TimeField(default=datetime.time(8, 0))),
+                ('closes_at', models.TimeField(default=datetime.time(18, 0))),
+                ('active', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='scheduled_start',
+            field=models.TimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='bay',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='bookings.bay'),
+        ),
+    ]
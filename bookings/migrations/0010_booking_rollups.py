@@ -0,0 +1,71 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+# Booking.SERVICE_MINUTES when this migration was written
+SERVICE_MINUTES = {
+    "Interior Detailing": 90,
+    "Exterior Detailing": 60,
+    "Full Detailing": 180,
+    "Ceramic Coating": 360,
+}
+
+
+def fill_rollups(apps, schema_editor):
+    # Same totals as bookings.rollups.rebuild() for existing bookings
+    Booking = apps.get_model("bookings", "Booking")
+    BookingRollup = apps.get_model("bookings", "BookingRollup")
+    totals = {}
+    rows = Booking.objects.values_list(
+        "preferred_date", "preferred_time_slot_id", "service_type", "created_at"
+    )
+    for day, slot_id, service, created_at in rows.iterator():
+        if timezone.is_aware(created_at):
+            created_at = timezone.localtime(created_at)
+        total = totals.setdefault((day, slot_id, service), [0, 0, 0])
+        total[0] += 1
+        total[1] += SERVICE_MINUTES.get(service, 0)
+        total[2] += (day - created_at.date()).days
+    BookingRollup.objects.bulk_create(
+        (
+            BookingRollup(
+                date=day,
+                time_slot_id=slot_id,
+                service_type=service,
+                bookings=count,
+                booked_minutes=minutes,
+                lead_days=lead,
+            )
+            for (day, slot_id, service), (count, minutes, lead) in totals.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_bays_and_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('service_type', models.CharField(choices=[('Interior Detailing', 'Interior Detailing'), ('Exterior Detailing', 'Exterior Detailing'), ('Full Detailing', 'Full Detailing'), ('Ceramic Coating', 'Ceramic Coating')], max_length=50)),
+                ('bookings', models.IntegerField(default=0)),
+                ('booked_minutes', models.IntegerField(default=0)),
+                ('lead_days', models.IntegerField(default=0)),
+                ('time_slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='bookings.timeslot')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='bookingrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'time_slot', 'service_type'), name='rollup_unique_key'),
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
+from datetime import time
+
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 
@@ -7,10 +10,40 @@ class TimeSlot(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
     slot = models.CharField(max_length=20, unique=True)
+    # How many bookings this slot can take on any one day
+    capacity = models.PositiveSmallIntegerField(default=4)
+
+    class Meta:
+        # Slot lists are shown in time order
+        indexes = [models.Index(fields=["start_time"], name="timeslot_start_idx")]
+
     def __str__(self):
         return f"{self.start_time.strftime('%I:%M %p')} - {self.end_time.strftime('%I:%M %p')}"
 
 
+class Bay(models.Model):
+    # A detailing bay. bookings/scheduling.py assigns every booking of a day
+    # to one bay for the length of its service, within the bay's hours.
+    name = models.CharField(max_length=50, unique=True)
+    opens_at = models.TimeField(default=time(8, 0))
+    closes_at = models.TimeField(default=time(18, 0))
+    # Inactive bays (maintenance) are left out of new plans
+    active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return self.name
+
+
+class BookingQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        # Bookings ``user`` may see and change: all of them for staff, their
+        # own otherwise. The owner check is part of the WHERE clause, so a
+        # request for someone else's booking is one indexed miss.
+        if user.is_staff or user.is_superuser:
+            return self.all()
+        return self.filter(user_id=user.pk)
+
+
 class Booking(models.Model):
     SERVICE_CHOICES = [
         ("Interior Detailing", "Interior Detailing"),
@@ -18,6 +51,13 @@ class Booking(models.Model):
         ("Full Detailing", "Full Detailing"),
         ("Ceramic Coating", "Ceramic Coating"),
     ]
+    # Bay time each service takes, in minutes
+    SERVICE_MINUTES = {
+        "Interior Detailing": 90,
+        "Exterior Detailing": 60,
+        "Full Detailing": 180,
+        "Ceramic Coating": 360,
+    }
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     customer_name = models.CharField(max_length=255)
@@ -27,9 +67,152 @@ class Booking(models.Model):
     service_type = models.CharField(max_length=50, choices=SERVICE_CHOICES)
     preferred_date = models.DateField()
     preferred_time_slot = models.ForeignKey(TimeSlot, on_delete=models.PROTECT)
+    # Copy of preferred_time_slot.start_time (kept in sync by save() and the
+    # TimeSlot post_save signal) so listings sort on this table's indexes
+    # alone instead of sorting joined rows
+    preferred_start_time = models.TimeField(editable=False)
 
     notes = models.TextField(blank=True, default="")
+    # Set by the bay scheduler (services.apply_bay_plan); cleared when the
+    # booking moves to another day or slot
+    bay = models.ForeignKey(
+        Bay, null=True, blank=True, on_delete=models.SET_NULL, related_name="bookings"
+    )
+    scheduled_start = models.TimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Change marker for the API ETag
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Booking list / API ordering (BOOKING_ORDERING) for staff and
+            # per customer, so pages are read in index order without a sort
+            models.Index(
+                fields=["-preferred_date", "-preferred_start_time", "-id"],
+                name="booking_date_start_idx",
+            ),
+            models.Index(
+                fields=["user", "-preferred_date", "-preferred_start_time", "-id"],
+                name="booking_user_date_idx",
+            ),
+            # Bookings of one slot on one day (seat counter rebuilds)
+            models.Index(
+                fields=["-preferred_date", "preferred_time_slot", "-id"],
+                name="booking_date_slot_idx",
+            ),
+            # Newest bookings first (admin, exports of recent bookings)
+            models.Index(fields=["-created_at"], name="booking_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.customer_name} - {self.service_type} on {self.preferred_date}"
+
+    @property
+    def duration_minutes(self):
+        return self.SERVICE_MINUTES[self.service_type]
+
+    def save(self, *args, **kwargs):
+        self.preferred_start_time = self.preferred_time_slot.start_time
+        super().save(*args, **kwargs)
+
+
+class SlotCapacity(models.Model):
+    # Seat counter per (time slot, day). Bookings reserve a seat with a
+    # conditional UPDATE on this row, so concurrent workers can never push
+    # ``reserved`` past ``capacity`` and only the one row is locked.
+    time_slot = models.ForeignKey(
+        TimeSlot, on_delete=models.CASCADE, related_name="capacities"
+    )
+    date = models.DateField()
+    capacity = models.PositiveSmallIntegerField()
+    reserved = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["time_slot", "date"], name="slot_capacity_unique_day"
+            ),
+        ]
+        # Availability is read by date range across all slots
+        indexes = [models.Index(fields=["date"], name="slot_capacity_date_idx")]
+
+    @property
+    def free(self):
+        return max(self.capacity - self.reserved, 0)
+
+    def __str__(self):
+        return f"{self.time_slot} on {self.date}: {self.reserved}/{self.capacity}"
+
+
+class BookingRollup(models.Model):
+    # Bookings per (day, time slot, service), kept up to date on every
+    # booking write (bookings/rollups.py) so staff reports sum these rows
+    # instead of scanning the bookings table. Plain integers, not positive
+    # ones: a move is applied as a decrement and an increment.
+    date = models.DateField()
+    time_slot = models.ForeignKey(
+        TimeSlot, on_delete=models.CASCADE, related_name="rollups"
+    )
+    service_type = models.CharField(max_length=50, choices=Booking.SERVICE_CHOICES)
+    bookings = models.IntegerField(default=0)
+    # Sum of Booking.SERVICE_MINUTES, for bay utilization
+    booked_minutes = models.IntegerField(default=0)
+    # Sum of (preferred_date - created_at) in days, for the mean lead time
+    lead_days = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the date range index the reports read through
+            models.UniqueConstraint(
+                fields=["date", "time_slot", "service_type"], name="rollup_unique_key"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.time_slot} {self.service_type}: {self.bookings}"
+
+
+class OutboxMessage(models.Model):
+    # Side effects (confirmation emails) written in the same transaction as
+    # the booking and delivered later by `manage.py run_outbox`, so requests
+    # never wait on the mail server.
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (SENT, "Sent"), (FAILED, "Failed")]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Not delivered before this time: retry backoff, or a dispatcher's lease
+    available_at = models.DateTimeField(default=timezone.now)
+    # Set by the dispatcher that claimed the message
+    lease = models.CharField(max_length=32, blank=True, default="")
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Dispatchers look for due pending messages, oldest first
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="outbox_due_idx"),
+            models.Index(fields=["lease"], name="outbox_lease_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ThrottleCounter(models.Model):
+    # Request counts for bookings/throttling.py when THROTTLE_CACHE is a
+    # database cache, whose incr() reads and rewrites a pickled value; here
+    # a hit is one UPDATE. Expired rows are swept now and then.
+    key = models.CharField(max_length=255, primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key}: {self.count}"
@@ -0,0 +1,52 @@
+# bookings/outbox.py
+# Transactional outbox. Write paths call enqueue() inside their transaction;
+# bookings/dispatcher.py delivers the messages afterwards. A message only
+# exists if the booking it describes was committed.
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.template.loader import render_to_string
+
+from .models import OutboxMessage
+
+BOOKING_CONFIRMATION = "booking_confirmation"
+
+
+def enqueue(kind, payload):
+    return OutboxMessage.objects.create(kind=kind, payload=payload)
+
+
+def enqueue_booking_confirmation(booking):
+    # Everything the email needs is copied into the payload, so sending never
+    # reads the booking (which may have been edited or deleted since)
+    slot = booking.preferred_time_slot
+    return enqueue(
+        BOOKING_CONFIRMATION,
+        {
+            "booking_id": booking.pk,
+            "email": booking.email,
+            "customer_name": booking.customer_name,
+            "service_type": booking.service_type,
+            "car_model": booking.car_model,
+            "preferred_date": booking.preferred_date.isoformat(),
+            "time_slot": str(slot),
+        },
+    )
+
+
+def _booking_confirmation(payload):
+    return EmailMessage(
+        subject=f"Booking confirmed: {payload['service_type']} on {payload['preferred_date']}",
+        body=render_to_string("bookings/email/booking_confirmation.txt", payload),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[payload["email"]],
+    )
+
+
+# kind -> payload -> EmailMessage
+RENDERERS = {
+    BOOKING_CONFIRMATION: _booking_confirmation,
+}
+
+
+def render(message):
+    return RENDERERS[message.kind](message.payload)
@@ -0,0 +1,100 @@
+# bookings/page_cache.py
+# Cached markup for the booking list (bookings/cache.py tiers).
+#
+# Two levels:
+#   rows  - each <tr>, keyed by booking id and updated_at, so an edited
+#           booking gets a new key and unchanged rows are never re-rendered
+#   pages - the whole list body for one cursor position, per viewer scope
+#           (each customer, or all staff, who see every booking)
+#
+# The site header around the list shows who is logged in, so it is rendered
+# on every request and only the body comes from the cache.
+#
+# signals.py invalidates precisely: a booking write bumps the page namespace
+# of its owner and of staff and drops the row's old markup; a time slot
+# change bumps everything, since every row shows its slot. Writes that skip
+# model signals call bookings_changed() (services.bulk_create_bookings) or
+# invalidate_all() (fixture seeding) themselves.
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .cache import tiered
+from .pagination import decode_cursor, encode_cursor
+
+ROWS_NAMESPACE = "booking-rows"
+PAGES_NAMESPACE = "booking-pages"
+ROW_TEMPLATE = "bookings/_booking_row.html"
+LISTING_TEMPLATE = "bookings/_booking_listing.html"
+
+ROW_TIMEOUT = 24 * 60 * 60
+PAGE_TIMEOUT = 5 * 60
+
+
+def scope(user):
+    return "staff" if user.is_staff or user.is_superuser else f"user:{user.pk}"
+
+
+def _pages_namespace(scope_name):
+    return f"{PAGES_NAMESPACE}:{scope_name}"
+
+
+def row_key(pk, updated_at):
+    return f"{pk}:{updated_at.isoformat()}"
+
+
+def render_rows(bookings):
+    # Markup of each booking's row, rendering only the ones not cached
+    bookings = {row_key(b.pk, b.updated_at): b for b in bookings}
+    html = tiered.get_many_or_set(
+        ROWS_NAMESPACE,
+        list(bookings),
+        lambda missing: {
+            key: render_to_string(ROW_TEMPLATE, {"booking": bookings[key]})
+            for key in missing
+        },
+        timeout=ROW_TIMEOUT,
+    )
+    return [mark_safe(html[key]) for key in bookings]
+
+
+def render_listing(user, cursor_token, build_page):
+    # List body for ``user`` at ``cursor_token``; build_page() returns the
+    # KeysetPage on a miss
+    cursor = decode_cursor(cursor_token)
+    # Re-encoded so junk tokens share the first page's entry
+    position = encode_cursor(*cursor) if cursor else ""
+    key = f"{tiered.version(PAGES_NAMESPACE)}:{position}"
+
+    def compute():
+        page = build_page()
+        return render_to_string(
+            LISTING_TEMPLATE,
+            {"bookings": page.items, "rows": render_rows(page.items), "page": page},
+        )
+
+    html = tiered.get_or_set(
+        _pages_namespace(scope(user)), key, compute, timeout=PAGE_TIMEOUT
+    )
+    return mark_safe(html)
+
+
+# ----- invalidation -----
+
+
+def bookings_changed(*user_ids):
+    # Bookings of ``user_ids`` were created, edited or deleted
+    scopes = {"staff"} | {f"user:{pk}" for pk in user_ids if pk is not None}
+    for scope_name in scopes:
+        tiered.invalidate_on_commit(_pages_namespace(scope_name))
+
+
+def purge_row(pk, updated_at):
+    if pk is not None and updated_at is not None:
+        tiered.delete(ROWS_NAMESPACE, row_key(pk, updated_at))
+
+
+def invalidate_all():
+    # Every row shows its time slot, so slot changes (and bulk loads that
+    # bypass signals) drop everything
+    tiered.invalidate_on_commit(ROWS_NAMESPACE)
+    tiered.invalidate_on_commit(PAGES_NAMESPACE)
@@ -0,0 +1,131 @@
+# bookings/pagination.py
+import base64
+import binascii
+import math
+from datetime import date, time
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+
+# Ordering shared by every booking listing, newest first. ``id`` is the
+# tie-breaker so the cursor always points at exactly one row. Matches the
+# booking_date_start_idx / booking_user_date_idx indexes column for column.
+BOOKING_ORDERING = ("-preferred_date", "-preferred_start_time", "-id")
+
+
+def encode_cursor(preferred_date, start_time, pk):
+    # Opaque, URL-safe token for the position of the last row on a page
+    raw = f"{preferred_date.isoformat()}|{start_time.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    # Returns (date, time, id) or None when the token is missing / tampered with
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        day, start, pk = raw.split("|")
+        return date.fromisoformat(day), time.fromisoformat(start), int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def after_cursor(queryset, cursor):
+    # Keyset predicate for rows that sort after ``cursor`` in BOOKING_ORDERING.
+    # The leading ``preferred_date__lte`` lets the date index bound the scan.
+    day, start, pk = cursor
+    return queryset.filter(preferred_date__lte=day).filter(
+        Q(preferred_date__lt=day)
+        | Q(preferred_date=day, preferred_start_time__lt=start)
+        | Q(preferred_date=day, preferred_start_time=start, id__lt=pk)
+    )
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, is_first):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def _instance_key(booking):
+    return booking.preferred_date, booking.preferred_start_time, booking.pk
+
+
+def page_queryset(queryset, cursor, page_size):
+    # The single query behind a page: ordered, bounded by the decoded
+    # ``cursor`` (or None for the first page), plus one look-ahead row
+    queryset = queryset.order_by(*BOOKING_ORDERING)
+    if cursor is not None:
+        queryset = after_cursor(queryset, cursor)
+    return queryset[: page_size + 1]
+
+
+def paginate_bookings(queryset, cursor_token, page_size, key=_instance_key):
+    # One query per page no matter how deep the page is: the cursor replaces
+    # OFFSET, and one extra row tells us whether a next page exists.
+    # ``key`` returns (date, start time, id) for a row, for querysets of
+    # values() tuples rather than model instances.
+    cursor = decode_cursor(cursor_token)
+    rows = list(page_queryset(queryset, cursor, page_size))
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(*key(rows[-1]))
+
+    return KeysetPage(rows, next_cursor, is_first=cursor is None)
+
+
+def estimated_rows(model, using):
+    # Cheap size estimate of ``model``'s whole table, None where the database
+    # has none: the planner's row estimate on PostgreSQL, the highest rowid
+    # on SQLite (an upper bound; bookings are rarely deleted)
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+        # -1: never analyzed
+        return int(row[0]) if row and row[0] >= 0 else None
+    if connection.vendor == "sqlite":
+        return model._default_manager.using(using).aggregate(rows=Max("pk"))["rows"] or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    # Offset paginator for the admin changelist at table scale. COUNT(*) over
+    # a million bookings reads every row, so the count stops at count_limit
+    # rows (a COUNT over a LIMITed subquery). Past that it is estimated:
+    # estimated_rows() for an unfiltered list, count_limit for a filtered
+    # one. Pages stop at count_limit rows as well, since OFFSET reads every
+    # row it skips; filters and the date hierarchy reach the rest.
+    count_limit = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        counted = queryset.order_by()[: self.count_limit + 1].count()
+        if counted <= self.count_limit:
+            return counted
+        if queryset.query.where:
+            return self.count_limit
+        estimate = estimated_rows(queryset.model, queryset.db)
+        if estimate is None:
+            return queryset.count()
+        return max(estimate, counted)
+
+    @cached_property
+    def num_pages(self):
+        reachable = min(self.count, self.count_limit)
+        if reachable == 0 and not self.allow_empty_first_page:
+            return 0
+        return math.ceil(max(1, reachable - self.orphans) / self.per_page)
@@ -0,0 +1,202 @@
+# bookings/query_plans.py
+# EXPLAIN checks for the hot booking queries.
+#
+# Every entry in HOT_QUERIES builds the same queryset the view, API or
+# worker runs (through the same helpers), so a change to a filter or an
+# ordering is checked against the indexes in bookings/models.py:
+#
+#   python manage.py check_query_plans        # fails on a scan or a sort
+#   python manage.py check_query_plans -v 2   # also prints every plan
+#
+# A plan is a problem when it reads a whole table without an index or sorts
+# rows itself instead of walking an index in order. On PostgreSQL the
+# planner is told to avoid both (enable_seqscan / enable_sort off), so a
+# Seq Scan or Sort left in the plan means no usable index exists, not just
+# that the table is small.
+import re
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.db.models import F, Sum
+from django.test import RequestFactory
+from django.utils import timezone
+
+from . import api, bulk, scheduling, views
+from .models import Booking, BookingRollup, OutboxMessage, SlotCapacity, TimeSlot
+from .pagination import page_queryset
+
+PAGE_SIZE = 25
+
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+_POSTGRES_SORT = re.compile(r"^\s*(?:->\s*)?(?:Incremental )?Sort\b")
+
+
+class HotQuery:
+    def __init__(self, label, build, full_scan=()):
+        self.label = label
+        # Callable returning the queryset to explain
+        self.build = build
+        # Tables this query is meant to read in full (e.g. exports)
+        self.full_scan = tuple(full_scan)
+
+
+def _customer():
+    return User(pk=1, username="plan-customer")
+
+
+def _staff():
+    return User(pk=2, username="plan-staff", is_staff=True)
+
+
+def _cursor():
+    return date.today() + timedelta(days=30), time(10, 0), 1000
+
+
+def _list_page(user, cursor=None):
+    return lambda: page_queryset(views._booking_list_queryset(user), cursor, PAGE_SIZE)
+
+
+def _api_page(viewer, cursor=None, **params):
+    def build():
+        request = RequestFactory().get("/api/bookings/", params)
+        request.user = viewer
+        bookings = api._filtered_bookings(request).values_list(
+            *api._lookups(api.BOOKING_FIELDS)
+        )
+        return page_queryset(bookings, cursor, PAGE_SIZE)
+
+    return build
+
+
+def _range():
+    start = date.today()
+    return {"start": start.isoformat(), "end": (start + timedelta(days=30)).isoformat()}
+
+
+
+def _admin_changelist():
+    # The booking admin's list: its joins and ordering
+    from .admin import BookingAdmin
+
+    return Booking.objects.select_related(*BookingAdmin.list_select_related).order_by(
+        *BookingAdmin.ordering
+    )
+
+HOT_QUERIES = [
+    HotQuery("booking_list customer", _list_page(_customer())),
+    HotQuery("booking_list customer, next page", _list_page(_customer(), _cursor())),
+    HotQuery("booking_list staff", _list_page(_staff())),
+    HotQuery("booking_list staff, next page", _list_page(_staff(), _cursor())),
+    HotQuery("api_bookings customer, date range", _api_page(_customer(), **_range())),
+    HotQuery("api_bookings staff, date range", _api_page(_staff(), **_range())),
+    HotQuery(
+        "api_bookings staff, service_type",
+        _api_page(_staff(), _cursor(), service_type=Booking.SERVICE_CHOICES[0][0]),
+    ),
+    HotQuery("api_bookings staff, user", _api_page(_staff(), user="1")),
+    HotQuery(
+        "edit/delete booking",
+        lambda: Booking.objects.filter(pk=1, user=_customer()),
+    ),
+    HotQuery(
+        "time slots",
+        lambda: TimeSlot.objects.order_by("start_time", "id"),
+    ),
+    HotQuery(
+        "availability counters",
+        lambda: SlotCapacity.objects.filter(
+            date__gte=date.today(), date__lte=date.today() + timedelta(days=30)
+        ),
+    ),
+    HotQuery(
+        "capacity claim",
+        lambda: SlotCapacity.objects.filter(
+            time_slot_id=1, date=date.today(), reserved__lte=F("capacity") - 1
+        ),
+    ),
+    HotQuery(
+        "outbox due messages",
+        lambda: OutboxMessage.objects.filter(
+            status=OutboxMessage.PENDING, available_at__lte=timezone.now()
+        )
+        .order_by("available_at", "pk")
+        .values_list("pk", flat=True)[:50],
+    ),
+    HotQuery(
+        "outbox leased messages",
+        lambda: OutboxMessage.objects.filter(lease="token"),
+    ),
+    HotQuery(
+        "bay scheduling, bookings of a day",
+        lambda: scheduling.day_bookings(date.today(), date.today()),
+    ),
+    HotQuery(
+        "analytics rollups per day",
+        lambda: BookingRollup.objects.filter(
+            date__gte=date.today() - timedelta(days=365), date__lte=date.today()
+        )
+        .values("date")
+        .annotate(bookings=Sum("bookings"))
+        .order_by("date"),
+    ),
+    HotQuery(
+        "admin booking changelist page",
+        lambda: _admin_changelist()[:100],
+    ),
+    HotQuery(
+        "admin date hierarchy bounds",
+        lambda: Booking.objects.order_by("preferred_date").values_list(
+            "preferred_date", flat=True
+        )[:1],
+    ),
+    HotQuery(
+        "booking export",
+        lambda: bulk.export_queryset(Booking.objects.all()),
+        full_scan=[Booking._meta.db_table],
+    ),
+]
+
+
+def explain(queryset):
+    # The plan of ``queryset`` as a list of lines, on its own database
+    connection = connections[queryset.db]
+    with transaction.atomic(using=queryset.db):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("SET LOCAL enable_sort = off")
+        plan = queryset.explain()
+    lines = plan.splitlines()
+    if connection.vendor == "sqlite":
+        # Drop the id / parent / notused columns
+        lines = [line.split(" ", 3)[-1] for line in lines]
+    return lines
+
+
+def problems(lines, vendor, full_scan=()):
+    # Human-readable problems found in the plan ``lines``
+    found = []
+    for line in lines:
+        if vendor == "sqlite":
+            scan = _SQLITE_SCAN.match(line.strip())
+            sort = "USE TEMP B-TREE" in line
+        elif vendor == "postgresql":
+            scan = _POSTGRES_SCAN.search(line)
+            sort = _POSTGRES_SORT.match(line)
+        else:
+            return found
+        if scan and scan.group(1) not in full_scan:
+            found.append(f"full scan of {scan.group(1)}: {line.strip()}")
+        if sort:
+            found.append(f"sort not served by an index: {line.strip()}")
+    return found
+
+
+def check(queries=None, using="default"):
+    # Yields (HotQuery, plan lines, problems) for each query
+    vendor = connections[using].vendor
+    for query in HOT_QUERIES if queries is None else queries:
+        lines = explain(query.build().using(using))
+        yield query, lines, problems(lines, vendor, query.full_scan)
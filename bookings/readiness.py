@@ -0,0 +1,76 @@
+# bookings/readiness.py
+# Deep readiness check behind /ready/: database round trip, unapplied
+# migrations and shared cache reachability. The result is kept in-process for
+# READINESS_CACHE_TTL seconds so a storm of probes costs one check per worker.
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connection
+from django.db.migrations.executor import MigrationExecutor
+
+_lock = threading.Lock()
+_cached = {"expires": 0.0, "result": None}
+
+
+def check_database():
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+def check_migrations():
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return {"ok": not plan, "pending": len(plan)}
+
+
+def check_cache():
+    cache = caches["default"]
+    key, token = "readiness:probe", uuid.uuid4().hex
+    cache.set(key, token, timeout=10)
+    return {"ok": cache.get(key) == token}
+
+
+CHECKS = {
+    "database": check_database,
+    "migrations": check_migrations,
+    "cache": check_cache,
+}
+
+
+def run_checks():
+    checks = {}
+    for name, check in CHECKS.items():
+        try:
+            checks[name] = check()
+        except (DatabaseError, OSError, ValueError) as exc:
+            checks[name] = {"ok": False, "error": exc.__class__.__name__}
+    return {
+        "ready": all(result["ok"] for result in checks.values()),
+        "checks": checks,
+    }
+
+
+def readiness():
+    # Cached run_checks(); concurrent probes wait for the one doing the work
+    now = time.monotonic()
+    if _cached["expires"] > now:
+        return _cached["result"]
+    with _lock:
+        if _cached["expires"] > time.monotonic():
+            return _cached["result"]
+        result = run_checks()
+        _cached["result"] = result
+        _cached["expires"] = time.monotonic() + getattr(
+            settings, "READINESS_CACHE_TTL", 5
+        )
+        return result
+
+
+def reset():
+    _cached["expires"] = 0.0
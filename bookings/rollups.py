@@ -0,0 +1,292 @@
+# bookings/rollups.py
+# Staff analytics (/staff/analytics/) read BookingRollup rows: one per
+# (day, time slot, service) holding the booking count, booked service
+# minutes and summed lead time. A year of data is at most
+# 366 x slots x services rows, summed by the database through the
+# (date, ...) unique index, so reports never scan the bookings table.
+#
+# The rows are maintained incrementally: signals.py moves a booking's
+# contribution when it is created, edited or deleted, in the same
+# transaction as the write when there is one (services.py always opens
+# one). Writes that skip model signals call add_rows() (services'
+# bulk import), move_many() (admin bulk actions) or rebuild() (fixture
+# seeding) themselves.
+#
+#   python manage.py rebuild_rollups            recompute from bookings
+#   python manage.py rebuild_rollups --check    only compare, fail on drift
+from collections import defaultdict
+
+from django.db import connections, router, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Booking, BookingRollup, SlotCapacity, TimeSlot
+from .scheduling import active_bays
+
+# Booking columns a rollup key and lead time are made of
+STATE_FIELDS = ("preferred_date", "preferred_time_slot_id", "service_type", "created_at")
+
+
+def lead_days(day, created_at):
+    if timezone.is_aware(created_at):
+        created_at = timezone.localtime(created_at)
+    return (day - created_at.date()).days
+
+
+def state_values(mapping):
+    # STATE_FIELDS of a booking's __dict__ or a values() row, None if not loaded
+    return tuple(mapping.get(name) for name in STATE_FIELDS)
+
+
+def booking_state(values):
+    # ((day, slot id, service), lead days) a booking contributes, from its
+    # state_values(); None when one of them is unknown
+    if values is None or None in values:
+        return None
+    day, slot_id, service, created_at = values
+    return (day, slot_id, service), lead_days(day, created_at)
+
+
+def move(old, new):
+    # Apply a booking going from state ``old`` to ``new`` (None: absent)
+    if old == new:
+        return
+    # Joins the caller's transaction; no savepoint of its own
+    with transaction.atomic(savepoint=False):
+        if old is not None:
+            _bump(old[0], -1, -old[1])
+        if new is not None:
+            _bump(new[0], 1, new[1])
+
+
+def add_rows(rows, created_at):
+    # Bulk form of move(None, ...) for cleaned import rows
+    move_many(
+        (
+            None,
+            booking_state(
+                (
+                    row["preferred_date"],
+                    row["preferred_time_slot"].pk,
+                    row["service_type"],
+                    created_at,
+                )
+            ),
+        )
+        for row in rows
+    )
+
+
+def move_many(changes):
+    # Bulk form of move() for (old, new) pairs: one update per key touched
+    totals = defaultdict(lambda: [0, 0])
+    for old, new in changes:
+        if old == new:
+            continue
+        for state, sign in ((old, -1), (new, 1)):
+            if state is not None:
+                key, lead = state
+                totals[key][0] += sign
+                totals[key][1] += sign * lead
+    if not totals:
+        return
+    with transaction.atomic(savepoint=False):
+        _create_missing(list(totals))
+        for key, (count, lead) in totals.items():
+            _rows(key).update(**_changes(key, count, lead))
+
+
+def _rows(key):
+    day, slot_id, service = key
+    return BookingRollup.objects.filter(date=day, time_slot_id=slot_id, service_type=service)
+
+
+def _changes(key, count, lead):
+    return {
+        "bookings": F("bookings") + count,
+        "booked_minutes": F("booked_minutes") + count * Booking.SERVICE_MINUTES[key[2]],
+        "lead_days": F("lead_days") + lead,
+    }
+
+
+def _create_missing(keys):
+    # Empty rows for ``keys``; ignore_conflicts skips the ones that exist,
+    # including any another worker creates at the same moment
+    BookingRollup.objects.bulk_create(
+        [
+            BookingRollup(date=day, time_slot_id=slot_id, service_type=service)
+            for day, slot_id, service in keys
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+def _bump(key, count, lead):
+    changes = _changes(key, count, lead)
+    if not _rows(key).update(**changes):
+        # First booking of this key
+        _create_missing([key])
+        _rows(key).update(**changes)
+
+
+# ----- rebuild and consistency check -----
+
+
+def recompute():
+    # {key: (bookings, booked_minutes, lead_days)} from the bookings table
+    totals = defaultdict(lambda: [0, 0, 0])
+    for values in Booking.objects.values_list(*STATE_FIELDS).iterator(chunk_size=2000):
+        key, lead = booking_state(values)
+        total = totals[key]
+        total[0] += 1
+        total[1] += Booking.SERVICE_MINUTES[key[2]]
+        total[2] += lead
+    return {key: tuple(total) for key, total in totals.items()}
+
+
+def stored():
+    # The same mapping read from BookingRollup, empty rows left out
+    return {
+        (day, slot_id, service): (count, minutes, lead)
+        for day, slot_id, service, count, minutes, lead in BookingRollup.objects.exclude(
+            bookings=0, booked_minutes=0, lead_days=0
+        ).values_list(
+            "date", "time_slot_id", "service_type", "bookings", "booked_minutes", "lead_days"
+        )
+    }
+
+
+def check():
+    # [(key, stored, expected)] for every key where the rollups disagree
+    # with a full recompute; empty when they match
+    expected, actual = recompute(), stored()
+    return [
+        (key, actual.get(key), expected.get(key))
+        for key in sorted(set(expected) | set(actual), key=str)
+        if actual.get(key) != expected.get(key)
+    ]
+
+
+def _lock_rollups(using):
+    # Hold off every booking write until the caller's transaction ends: each
+    # one moves a rollup row in its own transaction, so a booking committed
+    # between recompute() and the delete below would be lost. A write that
+    # matches nothing takes SQLite's database write lock; PostgreSQL needs a
+    # mode that conflicts with row updates but still lets readers in.
+    connection = connections[using]
+    table = connection.ops.quote_name(BookingRollup._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"DELETE FROM {table} WHERE 1 = 0")
+        elif connection.vendor == "postgresql":
+            cursor.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+
+
+def rebuild(batch_size=1000):
+    # Replace every rollup row with a full recompute; returns the row count
+    using = router.db_for_write(BookingRollup)
+    with transaction.atomic(using=using):
+        _lock_rollups(using)
+        totals = recompute()
+        BookingRollup.objects.all().delete()
+        BookingRollup.objects.bulk_create(
+            (
+                BookingRollup(
+                    date=day,
+                    time_slot_id=slot_id,
+                    service_type=service,
+                    bookings=count,
+                    booked_minutes=minutes,
+                    lead_days=lead,
+                )
+                for (day, slot_id, service), (count, minutes, lead) in totals.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(totals)
+
+
+# ----- reports -----
+
+
+def _mean(total, count):
+    return total / count if count else None
+
+
+def _ratio(part, whole):
+    return part / whole if whole else None
+
+
+def report(start, end):
+    # Demand between ``start`` and ``end`` inclusive:
+    #   {"totals": {...}, "by_day": [...], "by_service": [...], "by_slot": [...]}
+    # Each row has bookings, booked_minutes and avg_lead_days. Days add
+    # bay_utilization (booked minutes over the open minutes of today's
+    # active bays), slots seat_utilization (SlotCapacity reserved over
+    # capacity, for the days that have a counter).
+    rows = BookingRollup.objects.filter(date__gte=start, date__lte=end)
+    sums = {
+        "count": Sum("bookings"),
+        "minutes": Sum("booked_minutes"),
+        "lead": Sum("lead_days"),
+    }
+
+    def grouped(*fields):
+        return rows.values(*fields).annotate(**sums).order_by(*fields)
+
+    def figures(row):
+        count = row["count"] or 0
+        return {
+            "bookings": count,
+            "booked_minutes": row["minutes"] or 0,
+            "avg_lead_days": _mean(row["lead"] or 0, count),
+        }
+
+    bay_minutes = sum(bay.closes - bay.opens for bay in active_bays())
+    by_day = [
+        dict(
+            figures(row),
+            date=row["date"],
+            bay_utilization=_ratio(row["minutes"] or 0, bay_minutes),
+        )
+        for row in grouped("date")
+        if row["count"]
+    ]
+
+    totals = figures(rows.aggregate(**sums))
+    by_service = [
+        dict(
+            figures(row),
+            service_type=row["service_type"],
+            share=_ratio(row["count"], totals["bookings"]),
+        )
+        for row in grouped("service_type")
+        if row["count"]
+    ]
+
+    seats = {
+        row["time_slot_id"]: _ratio(row["reserved"], row["capacity"])
+        for row in SlotCapacity.objects.filter(date__gte=start, date__lte=end)
+        .values("time_slot_id")
+        .annotate(reserved=Sum("reserved"), capacity=Sum("capacity"))
+        .order_by()
+    }
+    by_slot_id = {row["time_slot_id"]: row for row in grouped("time_slot_id")}
+    by_slot = [
+        dict(
+            figures(by_slot_id[slot.pk]),
+            time_slot=slot,
+            seat_utilization=seats.get(slot.pk),
+        )
+        for slot in TimeSlot.objects.order_by("start_time", "pk")
+        if slot.pk in by_slot_id and by_slot_id[slot.pk]["count"]
+    ]
+    return {
+        "start": start,
+        "end": end,
+        "totals": totals,
+        "by_day": by_day,
+        "by_service": by_service,
+        "by_slot": by_slot,
+    }
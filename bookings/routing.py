@@ -0,0 +1,121 @@
+# bookings/routing.py
+# Primary/replica split (DATABASE_ROUTERS). Writes always go to "default".
+# A read goes to one of settings.DATABASE_REPLICAS only when all of these
+# hold, and to the primary otherwise:
+#
+#   - it runs inside a GET or HEAD request (ReplicaRoutingMiddleware picks
+#     one replica per request, so a page reads one consistent copy)
+#   - the client has not written in the last REPLICA_PIN_SECONDS (the
+#     middleware sets a pin cookie on any response whose request wrote), so
+#     people always see the booking they just created or edited
+#   - the request itself has not written and is not inside a transaction on
+#     the primary
+#   - it is not filling a cache entry (bookings/cache.py wraps computes in
+#     use_primary()), since a value built from a lagging replica would be
+#     served to everyone, the writer included, until it expires
+#
+# Management commands, the outbox dispatcher and anything else outside a
+# request read the primary. Code that writes without the ORM (raw SQL) calls
+# mark_written() so the pin still applies.
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+PIN_COOKIE = "primary_pin"
+
+_current = ContextVar("replica_routing", default=None)
+
+
+class RequestReads:
+    def __init__(self, replica):
+        # Alias this request may read from, None for the primary
+        self.replica = replica
+        self.wrote = False
+        self.forced = 0
+
+    @property
+    def alias(self):
+        if self.replica is None or self.wrote or self.forced:
+            return None
+        if transaction.get_connection(DEFAULT_DB_ALIAS).in_atomic_block:
+            return None
+        return self.replica
+
+
+@contextmanager
+def request_reads(replica):
+    # Routing state for one request; yields it so the caller can check
+    # .wrote afterwards
+    state = RequestReads(replica)
+    token = _current.set(state)
+    try:
+        yield state
+    finally:
+        _current.reset(token)
+
+
+def stream_reads(state, content):
+    # A streaming response body runs its queries after the middleware has
+    # returned; iterate it under the request's routing
+    iterator = iter(content)
+    while True:
+        token = _current.set(state)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield chunk
+
+
+@contextmanager
+def use_primary():
+    # Reads inside the block go to the primary
+    state = _current.get()
+    if state is None:
+        yield
+        return
+    state.forced += 1
+    try:
+        yield
+    finally:
+        state.forced -= 1
+
+
+def mark_written():
+    state = _current.get()
+    if state is not None:
+        state.wrote = True
+
+
+def current_replica():
+    # Alias reads would use right now, None for the primary
+    state = _current.get()
+    return None if state is None else state.alias
+
+
+# Written on requests that change nothing a page shows: DatabaseCache
+# entries (refilled by plain GETs) and throttle counts. They go to the
+# primary without pinning the client to it.
+UNPINNED_WRITES = {("django_cache", "cacheentry"), ("bookings", "throttlecounter")}
+
+
+class ReplicaRouter:
+    # None means Django's default: the instance's database, else "default"
+    def db_for_read(self, model, **hints):
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        if (model._meta.app_label, model._meta.model_name) not in UNPINNED_WRITES:
+            mark_written()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, migrated with it
+        return db == DEFAULT_DB_ALIAS
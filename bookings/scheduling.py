@@ -0,0 +1,250 @@
+# bookings/scheduling.py
+# Bay scheduling. A booking occupies one bay for its service's
+# Booking.SERVICE_MINUTES, has to start inside its time slot (between the
+# slot's start and end time) and has to finish before the bay closes.
+#
+#   plan_day(day)                   pack a day's bookings onto the active bays
+#   services.apply_bay_plan(...)    store the result on the bookings
+#   suggest_slots(...)              nearest (day, slot) a new booking fits
+#
+# Solver: each bay keeps its busy intervals sorted, so "earliest start at
+# or after t" is a bisect plus a walk over the gaps that follow. Jobs are
+# placed one at a time on the bay that can start them earliest, ties going
+# to the bay where they leave the smallest idle gap (best fit, which keeps
+# the day dense and leaves long gaps for long services). Days up to
+# SEARCH_LIMIT bookings are solved in several job orders and the best plan
+# is kept; larger days get the single tightest-deadline-first pass.
+#
+# Times inside the solver are minutes since midnight.
+from bisect import bisect_right, insort
+from datetime import time, timedelta
+
+from django.utils import timezone
+
+from .models import Bay, Booking, SlotCapacity, TimeSlot
+
+# Days with more bookings than this are solved with one ordering only
+SEARCH_LIMIT = 150
+
+_END = float("inf")
+
+
+def minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def clock(total):
+    return time(total // 60, total % 60)
+
+
+class Job:
+    def __init__(self, key, duration, earliest, latest):
+        self.key = key
+        self.duration = duration
+        # Window for the start time (the booking's time slot)
+        self.earliest = earliest
+        self.latest = latest
+
+
+class BayHours:
+    def __init__(self, key, opens, closes):
+        self.key = key
+        self.opens = opens
+        self.closes = closes
+
+
+class Plan:
+    # Bookings placed on bays so far; also answers "where would this fit?"
+    def __init__(self, bays):
+        self.bays = list(bays)
+        self.busy = {bay.key: [] for bay in self.bays}
+        # job key -> (bay key, start)
+        self.assignments = {}
+        self.unscheduled = []
+        self.booked_minutes = 0
+
+    def fit(self, duration, earliest, latest):
+        # (bay key, start) for the best place to start a job, or None
+        best = None
+        for bay in self.bays:
+            busy = self.busy[bay.key]
+            start = max(earliest, bay.opens)
+            last = min(latest, bay.closes - duration)
+            index = bisect_right(busy, (start, _END))
+            previous_end = busy[index - 1][1] if index else bay.opens
+            start = max(start, previous_end)
+            while start <= last:
+                if index == len(busy) or start + duration <= busy[index][0]:
+                    rank = (start, start - previous_end)
+                    if best is None or rank < best[0]:
+                        best = (rank, bay.key, start)
+                    break
+                previous_end = busy[index][1]
+                start = max(start, previous_end)
+                index += 1
+        return None if best is None else best[1:]
+
+    def place(self, job):
+        spot = self.fit(job.duration, job.earliest, job.latest)
+        if spot is None:
+            self.unscheduled.append(job.key)
+            return False
+        bay_key, start = spot
+        insort(self.busy[bay_key], (start, start + job.duration))
+        self.assignments[job.key] = spot
+        self.booked_minutes += job.duration
+        return True
+
+    @property
+    def open_minutes(self):
+        return sum(bay.closes - bay.opens for bay in self.bays)
+
+    @property
+    def utilization(self):
+        return self.booked_minutes / self.open_minutes if self.open_minutes else 0.0
+
+    @property
+    def bays_used(self):
+        return sum(1 for busy in self.busy.values() if busy)
+
+    def score(self):
+        # Higher is better: most bay time booked, then most bookings, then
+        # fewest bays in use, then the earliest finish
+        finish = max((busy[-1][1] for busy in self.busy.values() if busy), default=0)
+        return (self.booked_minutes, len(self.assignments), -self.bays_used, -finish)
+
+
+ORDERINGS = (
+    # Tightest start window first, long services before short ones
+    lambda job: (job.latest, -job.duration, job.key),
+    # Longest first: big services claim the long gaps while they exist
+    lambda job: (-job.duration, job.latest, job.key),
+    # In start order, the classic interval partitioning order
+    lambda job: (job.earliest, -job.duration, job.key),
+)
+
+
+def schedule(jobs, bays, search_limit=SEARCH_LIMIT):
+    # Best Plan for ``jobs`` on ``bays``
+    jobs = list(jobs)
+    orderings = ORDERINGS if len(jobs) <= search_limit else ORDERINGS[:1]
+    best = None
+    for ordering in orderings:
+        plan = Plan(bays)
+        for job in sorted(jobs, key=ordering):
+            plan.place(job)
+        if best is None or plan.score() > best.score():
+            best = plan
+    return best
+
+
+# ----- database -----
+
+
+def active_bays():
+    return [
+        BayHours(pk, minutes(opens_at), minutes(closes_at))
+        for pk, opens_at, closes_at in Bay.objects.filter(active=True)
+        .order_by("name", "pk")
+        .values_list("pk", "opens_at", "closes_at")
+    ]
+
+
+def day_bookings(start, end):
+    # What the solver needs of each booking between start and end inclusive
+    return Booking.objects.filter(
+        preferred_date__gte=start, preferred_date__lte=end
+    ).values_list(
+        "pk",
+        "preferred_date",
+        "service_type",
+        "preferred_time_slot__start_time",
+        "preferred_time_slot__end_time",
+    )
+
+
+def _jobs_by_day(start, end):
+    jobs = {}
+    for pk, day, service_type, slot_start, slot_end in day_bookings(start, end):
+        jobs.setdefault(day, []).append(
+            Job(
+                pk,
+                Booking.SERVICE_MINUTES[service_type],
+                minutes(slot_start),
+                minutes(slot_end),
+            )
+        )
+    return jobs
+
+
+def plan_day(day, bays=None):
+    # Plan for every booking on ``day`` (booking pk -> (bay pk, start))
+    bays = active_bays() if bays is None else bays
+    return schedule(_jobs_by_day(day, day).get(day, []), bays)
+
+
+class Suggestion:
+    def __init__(self, day, time_slot, bay_id=None, start=None):
+        self.day = day
+        self.time_slot = time_slot
+        self.bay_id = bay_id
+        self.start = start
+
+    def __str__(self):
+        return f"{self.day:%a %d %b} {self.time_slot}"
+
+
+def suggest_slots(service_type, day, time_slot, limit=3, search_days=7):
+    # Nearest (day, slot) pairs with a free seat and, when bays are set up,
+    # room for this service on a bay. Nearest means fewest days away, then
+    # closest start time; the requested pair itself is skipped.
+    now = timezone.localtime()
+    first = max(now.date(), day - timedelta(days=search_days))
+    last = day + timedelta(days=search_days)
+    slots = list(TimeSlot.objects.order_by("start_time", "pk"))
+    free = {
+        (row_day, slot_id): capacity - reserved
+        for slot_id, row_day, capacity, reserved in SlotCapacity.objects.filter(
+            date__gte=first, date__lte=last
+        ).values_list("time_slot_id", "date", "capacity", "reserved")
+    }
+    bays = active_bays()
+    jobs = _jobs_by_day(first, last) if bays else {}
+    plans = {}
+    duration = Booking.SERVICE_MINUTES[service_type]
+    wanted = minutes(time_slot.start_time)
+
+    days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+    candidates = sorted(
+        (
+            abs((candidate_day - day).days),
+            abs(minutes(slot.start_time) - wanted),
+            candidate_day,
+            slot.pk,
+            slot,
+        )
+        for candidate_day in days
+        for slot in slots
+    )
+    suggestions = []
+    for _, _, candidate_day, _, slot in candidates:
+        if (candidate_day, slot.pk) == (day, time_slot.pk):
+            continue
+        if candidate_day == now.date() and slot.start_time <= now.time():
+            continue
+        if free.get((candidate_day, slot.pk), slot.capacity) <= 0:
+            continue
+        if bays:
+            if candidate_day not in plans:
+                plans[candidate_day] = schedule(jobs.get(candidate_day, []), bays)
+            spot = plans[candidate_day].fit(
+                duration, minutes(slot.start_time), minutes(slot.end_time)
+            )
+            if spot is None:
+                continue
+            suggestions.append(Suggestion(candidate_day, slot, spot[0], clock(spot[1])))
+        else:
+            suggestions.append(Suggestion(candidate_day, slot))
+        if len(suggestions) == limit:
+            break
+    return suggestions
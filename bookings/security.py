@@ -0,0 +1,106 @@
+# bookings/security.py
+# Security header policies, compiled once from settings.SECURITY_HEADER_POLICIES.
+# SecurityHeadersMiddleware applies the compiled headers to responses and
+# `manage.py render_nginx_conf` writes the same headers (plus the static
+# file compression settings) into the nginx static.conf, so the two can't
+# drift apart.
+import secrets
+
+from django.conf import settings
+from django.http.response import ResponseHeaders
+
+NONCE_PLACEHOLDER = "{nonce}"
+
+
+def build_csp(directives):
+    # {"default-src": ["'self'"], ...} -> "default-src 'self'; ..."
+    return "; ".join(
+        " ".join([name, *sources]) for name, sources in directives.items()
+    )
+
+
+def _strip_nonce(directives):
+    return {
+        name: [source for source in sources if NONCE_PLACEHOLDER not in source]
+        for name, sources in directives.items()
+    }
+
+
+class CompiledPolicy:
+    # Header list for one policy, built once at startup
+    def __init__(self, name, headers, csp=None):
+        self.name = name
+        self.headers = tuple(headers.items())
+        self.csp = None
+        self.csp_nonce_parts = None
+
+        if csp:
+            csp_value = build_csp(csp)
+            if NONCE_PLACEHOLDER in csp_value:
+                # Rendered with a nonce only when the response used one
+                prefix, _, suffix = csp_value.partition(NONCE_PLACEHOLDER)
+                self.csp_nonce_parts = (prefix, suffix)
+                csp_value = build_csp(_strip_nonce(csp))
+            self.csp = csp_value
+            self.headers += (("Content-Security-Policy", csp_value),)
+
+        # Validated by Django's own header container now, so a bad value
+        # fails at startup rather than on the first response
+        ResponseHeaders(dict(self.headers))
+
+    def apply(self, response, nonce=None):
+        headers = response.headers
+        for name, value in self.headers:
+            headers.setdefault(name, value)
+        if nonce is not None and self.csp_nonce_parts is not None:
+            prefix, suffix = self.csp_nonce_parts
+            response["Content-Security-Policy"] = prefix + nonce + suffix
+
+
+def compile_policies(definitions=None):
+    definitions = (
+        settings.SECURITY_HEADER_POLICIES if definitions is None else definitions
+    )
+    return {
+        name: CompiledPolicy(name, spec.get("headers", {}), spec.get("csp"))
+        for name, spec in definitions.items()
+    }
+
+
+def new_nonce():
+    return secrets.token_urlsafe(16)
+
+
+# ----- nginx -----
+
+NGINX_STATIC_CONF = """\
+# .platform/nginx/conf.d/elasticbeanstalk/static.conf
+# Generated by `python manage.py render_nginx_conf` from
+# SECURITY_HEADER_POLICIES in cardetailing/settings.py - do not edit by hand.
+location /static/ {{
+    alias /var/app/current/staticfiles/;
+    access_log off;
+    # Templates reference content-hashed names, so files never change
+    expires max;
+    # Precompressed siblings written by collectstatic (cardetailing/storage.py)
+    gzip_static on;
+{brotli}    gzip_vary on;
+
+{headers}
+}}
+"""
+
+
+def _nginx_quote(value):
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def render_nginx_static_conf(policy=None):
+    # static.conf with the headers of the ``default`` policy
+    policy = policy or compile_policies()["default"]
+    headers = "\n".join(
+        f"    add_header {name} {_nginx_quote(value)} always;"
+        for name, value in policy.headers
+    )
+    brotli = "    brotli_static on;\n" if settings.NGINX_BROTLI_STATIC else ""
+    return NGINX_STATIC_CONF.format(headers=headers, brotli=brotli)
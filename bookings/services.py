@@ -0,0 +1,283 @@
+# bookings/services.py
+# Write paths for bookings. Views (and anything else that creates, moves or
+# deletes a booking) go through here so seat counters stay in step with the
+# bookings table.
+import functools
+import random
+import time
+from collections import Counter
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+
+from . import capacity, outbox, page_cache, rollups, routing, scheduling
+from .models import Booking
+
+# SQLite reports writer contention as "database is locked" / "table is locked"
+# instead of queueing; retrying the whole transaction with jittered backoff
+# keeps bursts from surfacing as 500s.
+LOCK_RETRIES = 50
+LOCK_BACKOFF = 0.002
+LOCK_BACKOFF_MAX = 0.05
+
+
+def retry_on_lock(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(LOCK_RETRIES):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as exc:
+                if "locked" not in str(exc) or attempt == LOCK_RETRIES - 1:
+                    raise
+                delay = min(LOCK_BACKOFF * 2 ** attempt, LOCK_BACKOFF_MAX)
+                time.sleep(random.uniform(0, delay))
+
+    return wrapper
+
+
+@retry_on_lock
+def create_booking(form, user):
+    # Save a valid BookingForm for ``user``; raises capacity.SlotFullError
+    booking = form.save(commit=False)
+    booking.user = user
+    with transaction.atomic():
+        capacity.reserve(booking.preferred_time_slot, booking.preferred_date)
+        booking.save()
+        # Sent by `manage.py run_outbox`, never inside the request
+        outbox.enqueue_booking_confirmation(booking)
+    return booking
+
+
+@retry_on_lock
+def update_booking(form):
+    # Save edits from a valid BookingForm, moving the seat if slot/date changed
+    booking = form.instance
+    with transaction.atomic():
+        old_slot_id, old_date = Booking.objects.filter(pk=booking.pk).values_list(
+            "preferred_time_slot_id", "preferred_date"
+        ).get()
+        moved = (old_slot_id, old_date) != (
+            booking.preferred_time_slot_id,
+            booking.preferred_date,
+        )
+        if moved:
+            capacity.reserve(booking.preferred_time_slot, booking.preferred_date)
+            capacity.release(old_slot_id, old_date)
+            # The bay plan was for the old day and slot
+            booking.bay = None
+            booking.scheduled_start = None
+        form.save()
+    return booking
+
+
+@retry_on_lock
+def delete_booking(booking):
+    with transaction.atomic():
+        capacity.release(booking.preferred_time_slot_id, booking.preferred_date)
+        booking.delete()
+
+
+@retry_on_lock
+def change_service(queryset, service_type):
+    # Staff bulk edit (admin action): every booking in ``queryset`` gets
+    # ``service_type`` in a single UPDATE. update() sends no signals, so the
+    # rollups and cached pages are brought along here. The new service
+    # takes a different time in the bay, so the bay plan is cleared.
+    # Returns the number of bookings changed.
+    queryset = queryset.exclude(service_type=service_type).order_by().select_related(None)
+    with transaction.atomic():
+        before = list(
+            queryset.select_for_update().values_list("user_id", *rollups.STATE_FIELDS)
+        )
+        changed = queryset.update(
+            service_type=service_type,
+            bay=None,
+            scheduled_start=None,
+            updated_at=timezone.now(),
+        )
+        rollups.move_many(
+            (
+                rollups.booking_state((day, slot_id, service, created_at)),
+                rollups.booking_state((day, slot_id, service_type, created_at)),
+            )
+            for _user_id, day, slot_id, service, created_at in before
+        )
+        page_cache.bookings_changed(*{row[0] for row in before})
+    return changed
+
+
+@retry_on_lock
+def delete_bookings(queryset, batch_size=500):
+    # Staff bulk delete (admin action): seats go back with one update per
+    # (slot, day), the rows go in one DELETE per ``batch_size`` bookings.
+    # Nothing references a booking, so there is no cascade to collect.
+    # Returns the number deleted.
+    queryset = queryset.order_by().select_related(None)
+    with transaction.atomic():
+        before = list(
+            queryset.select_for_update().values_list("pk", "user_id", *rollups.STATE_FIELDS)
+        )
+        seats = Counter((slot_id, day) for _pk, _user_id, day, slot_id, *_rest in before)
+        for (slot_id, day), count in seats.items():
+            capacity.release(slot_id, day, seats=count)
+        rollups.move_many((rollups.booking_state(row[2:]), None) for row in before)
+        deleted = _delete_rows([row[0] for row in before], batch_size)
+        page_cache.bookings_changed(*{row[1] for row in before})
+    return deleted
+
+
+def _delete_rows(pks, batch_size):
+    # QuerySet.delete() would load every booking to send its signals, which
+    # the caller has already done the work of; the locked rows go by key
+    ops = connection.ops
+    sql = "DELETE FROM {} WHERE {} IN ({{}})".format(
+        ops.quote_name(Booking._meta.db_table), ops.quote_name(Booking._meta.pk.column)
+    )
+    deleted = 0
+    # Not through the ORM, so the replica router does not see this write
+    routing.mark_written()
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start : start + batch_size]
+            cursor.execute(sql.format(", ".join(["%s"] * len(batch))), batch)
+            deleted += cursor.rowcount
+    return deleted
+
+
+@retry_on_lock
+def bulk_create_bookings(user, rows):
+    # Insert many cleaned rows (dicts of Booking field values, as produced by
+    # bulk.RowValidator) for ``user`` in one transaction. Returns
+    # (created, full): ``full`` are the rows whose slot had no seat left.
+    wanted = Counter((row["preferred_time_slot"], row["preferred_date"]) for row in rows)
+    with transaction.atomic():
+        granted = capacity.reserve_many(wanted)
+        created, full = [], []
+        for row in rows:
+            key = (row["preferred_time_slot"], row["preferred_date"])
+            if granted[key]:
+                granted[key] -= 1
+                created.append(row)
+            else:
+                full.append(row)
+        now = timezone.now()
+        _insert_bookings(user, created, now)
+        if created:
+            # executemany sends no post_save
+            page_cache.bookings_changed(user.pk)
+            rollups.add_rows(created, now)
+    return created, full
+
+
+@retry_on_lock
+def apply_bay_plan(day, plan, batch_size=500):
+    # Store a scheduling.plan_day() result: every booking on ``day`` gets its
+    # bay and start time, or neither if it did not fit. Neither field is
+    # shown in the cached booking list, so pages are not invalidated.
+    bookings = [
+        Booking(pk=pk, bay_id=bay_id, scheduled_start=scheduling.clock(start))
+        for pk, (bay_id, start) in plan.assignments.items()
+    ]
+    with transaction.atomic():
+        Booking.objects.filter(preferred_date=day).exclude(bay=None).update(
+            bay=None, scheduled_start=None
+        )
+        Booking.objects.bulk_update(
+            bookings, ["bay", "scheduled_start"], batch_size=batch_size
+        )
+    return len(bookings)
+
+
+# Booking fields an import row does not hold but save() would fill in
+_DERIVED = {
+    "preferred_start_time": lambda row: row["preferred_time_slot"].start_time,
+}
+# Stand for the importing user and the batch's timestamp in insert_plan()
+_USER = object()
+_NOW = object()
+_ADAPTERS = {
+    "DateField": "adapt_datefield_value",
+    "DateTimeField": "adapt_datetimefield_value",
+    "TimeField": "adapt_timefield_value",
+}
+
+
+def insert_plan(row_fields):
+    # (fields, constants): every concrete Booking field but the primary key,
+    # in model order, and the value of each one that neither an import row
+    # (``row_fields``) nor _DERIVED provides: _USER for the owner, _NOW for
+    # auto_now / auto_now_add, else the field's default. A required field
+    # none of these cover raises, so a new field cannot silently break
+    # imports.
+    fields, constants = [], {}
+    for field in Booking._meta.concrete_fields:
+        if field.primary_key:
+            continue
+        fields.append(field)
+        if field.name in row_fields or field.name in _DERIVED:
+            continue
+        if field.name == "user":
+            constants[field.name] = _USER
+        elif getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+            constants[field.name] = _NOW
+        elif field.has_default() or field.null:
+            constants[field.name] = field.get_default()
+        else:
+            raise ImproperlyConfigured(
+                f"Booking.{field.name} has no default and bulk imports do not set it"
+            )
+    return fields, constants
+
+
+def _db_value(field, ops):
+    # Python value -> query parameter, cheaper than get_db_prep_save() for
+    # the few types a booking has; None when the value goes in as it is
+    if field.is_relation:
+        return lambda value: None if value is None else value.pk
+    adapt = _ADAPTERS.get(field.get_internal_type())
+    return None if adapt is None else getattr(ops, adapt)
+
+
+def _converted(get, to_db):
+    return lambda row: to_db(get(row))
+
+
+def _insert_bookings(user, rows, now):
+    # One executemany of plain tuples. bulk_create() runs every field of
+    # every object through the ORM's value preparation, which costs several
+    # times the insert itself at import volumes (about 7k against 45k rows/s
+    # into SQLite).
+    if not rows:
+        return
+    ops = connection.ops
+    fields, constants = insert_plan(rows[0].keys())
+    # Row columns first, read per row; constants are converted once
+    row_fields, getters, constant_fields, constant_values = [], [], [], []
+    for field in fields:
+        to_db = _db_value(field, ops)
+        if field.name in constants:
+            value = constants[field.name]
+            value = user if value is _USER else now if value is _NOW else value
+            constant_fields.append(field)
+            constant_values.append(value if to_db is None else to_db(value))
+            continue
+        get = _DERIVED.get(field.name) or itemgetter(field.name)
+        if to_db is not None:
+            get = _converted(get, to_db)
+        row_fields.append(field)
+        getters.append(get)
+    columns = ", ".join(ops.quote_name(f.column) for f in row_fields + constant_fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    sql = (
+        f"INSERT INTO {ops.quote_name(Booking._meta.db_table)} ({columns}) "
+        f"VALUES ({placeholders})"
+    )
+    constant_values = tuple(constant_values)
+    params = [tuple([get(row) for get in getters]) + constant_values for row in rows]
+    # Not through the ORM, so the replica router does not see this write
+    routing.mark_written()
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
@@ -0,0 +1,102 @@
+# bookings/session_backend.py
+# SESSION_ENGINE "bookings.session_backend": the django_session table with a
+# per-worker read-through cache in front, so an authenticated request only
+# reads the database when this worker has not seen the current version of
+# the session in the last SESSION_LOCAL_CACHE["ttl"] seconds.
+#
+# Writes are coalesced: a session that was marked modified but holds the
+# same data is not written again, except to push its expiry forward once it
+# is SESSION_LOCAL_CACHE["refresh"] seconds old (SESSION_SAVE_EVERY_REQUEST).
+#
+# Every session has a version in the tiered cache's shared backend (see
+# bookings/cache.py) that each save and delete moves on, and cached copies
+# are keyed by it: a logout or password change handled by one worker reaches
+# the others on their next request, at the cost of one shared-cache read.
+# Signed-cookie sessions (DJANGO_SESSION_BACKEND=cookie) can never be revoked
+# early.
+import copy
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.db import router, transaction
+from django.utils import timezone
+
+from .cache import LocalLRU, tiered
+
+_OPTIONS = getattr(settings, "SESSION_LOCAL_CACHE", {})
+
+# "session key:version" -> (session_data as stored, expire_date)
+local = LocalLRU(_OPTIONS.get("size", 2048), _OPTIONS.get("ttl", 5.0))
+
+
+def _namespace(session_key):
+    return f"session:{session_key}"
+
+
+def _local_key(session_key):
+    return f"{session_key}:{tiered.version(_namespace(session_key))}"
+
+
+class SessionStore(DBStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # What the database holds for this key, for coalescing writes
+        self._stored_data = None
+        self._stored_expiry = None
+        self._written = None
+
+    def load(self):
+        key = self.session_key
+        # Versioned before reading the row, so a save in between leaves the
+        # copy under a version nobody asks for
+        local_key = _local_key(key) if key else None
+        entry = local.get(local_key) if key else None
+        if entry is None or entry[1] <= timezone.now():
+            session = self._get_session_from_db()
+            if session is None:
+                return {}
+            entry = (session.session_data, session.expire_date)
+            local.set(local_key, entry)
+        data = self.decode(entry[0])
+        self._remember(data, entry[1])
+        return data
+
+    def _remember(self, data, expire_date):
+        self._stored_data = copy.deepcopy(data)
+        self._stored_expiry = expire_date
+
+    def _unchanged(self):
+        if self._stored_data is None or self._session_cache != self._stored_data:
+            return False
+        refresh = timedelta(seconds=_OPTIONS.get("refresh", 60))
+        return self.get_expiry_date() - self._stored_expiry < refresh
+
+    def create_model_instance(self, data):
+        instance = super().create_model_instance(data)
+        self._written = (instance.session_data, instance.expire_date)
+        return instance
+
+    def save(self, must_create=False):
+        if not must_create and self.session_key is not None and self._unchanged():
+            return
+        if self.session_key is None:
+            # create() comes back here with must_create and a new key
+            return super().save()
+        super().save(must_create=must_create)
+        namespace = _namespace(self.session_key)
+        using = router.db_for_write(self.model)
+        if transaction.get_connection(using).in_atomic_block:
+            # Might still roll back; the next read goes to the database
+            tiered.invalidate_on_commit(namespace)
+        else:
+            tiered.invalidate(namespace)
+            local.set(_local_key(self.session_key), self._written)
+        self._remember(self._get_session(no_load=True), self._written[1])
+
+    def delete(self, session_key=None):
+        session_key = session_key or self.session_key
+        super().delete(session_key)
+        if session_key is not None:
+            # After the row is gone, or another worker could cache it again
+            tiered.invalidate(_namespace(session_key))
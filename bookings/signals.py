@@ -0,0 +1,122 @@
+# bookings/signals.py
+import django
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from cardetailing.db import apply_sqlite_pragmas, close_unusable_connections
+
+from . import availability, page_cache, rollups, slot_cache
+from .cache import tiered
+from .capacity import sync_slot_capacity
+from .models import Booking, TimeSlot
+
+# Database connection tuning (see cardetailing/db.py)
+connection_created.connect(apply_sqlite_pragmas, dispatch_uid="sqlite_pragmas")
+if django.VERSION < (4, 1):
+    request_started.connect(
+        close_unusable_connections, dispatch_uid="close_unusable_connections"
+    )
+
+
+@receiver(post_init, sender=TimeSlot)
+def timeslot_loaded(sender, instance, **kwargs):
+    # Times the slot's bookings were last stamped with (None if deferred)
+    instance._booking_times = (
+        instance.__dict__.get("start_time"),
+        instance.__dict__.get("end_time"),
+    )
+
+
+@receiver(post_save, sender=TimeSlot)
+def timeslot_saved(sender, instance, created, **kwargs):
+    # A new slot has no counters or bookings yet; an edited one may have a
+    # new capacity or new times
+    times = (instance.start_time, instance.end_time)
+    if not created:
+        sync_slot_capacity(instance)
+        if instance._booking_times != times:
+            # The API shows both times of every booking in the slot: move
+            # their change marker too, or the ETag would keep answering 304
+            # for the old times
+            Booking.objects.filter(preferred_time_slot=instance).update(
+                preferred_start_time=instance.start_time, updated_at=timezone.now()
+            )
+    instance._booking_times = times
+    _timeslots_changed()
+
+
+@receiver(post_delete, sender=TimeSlot)
+def timeslot_deleted(sender, instance, **kwargs):
+    _timeslots_changed()
+
+
+def _timeslots_changed():
+    tiered.invalidate_on_commit(slot_cache.NAMESPACE)
+    # The availability grid lists every slot with its times and capacity
+    availability.invalidate()
+    page_cache.invalidate_all()
+
+
+@receiver(post_init, sender=Booking)
+def booking_loaded(sender, instance, **kwargs):
+    # Owner and version the cached list markup was built from. Read from
+    # __dict__ so a deferred column is not fetched just for this.
+    instance._page_cache_state = (
+        instance.__dict__.get("user_id"),
+        instance.__dict__.get("updated_at"),
+    )
+    # What the booking counts for in the analytics rollups
+    instance._rollup_values = rollups.state_values(instance.__dict__)
+
+
+def _load_rollup_values(instance):
+    # An instance loaded with only() may lack the rollup columns: read them
+    # from its row before the row changes (one query, only in that case)
+    if instance._state.adding or None not in instance._rollup_values:
+        return
+    row = Booking.objects.filter(pk=instance.pk).values_list(*rollups.STATE_FIELDS).first()
+    if row is not None:
+        instance._rollup_values = row
+        # created_at never changes; the state after the save needs it too
+        instance.__dict__.setdefault("created_at", row[-1])
+
+
+@receiver(pre_save, sender=Booking)
+def booking_saving(sender, instance, **kwargs):
+    _load_rollup_values(instance)
+
+
+@receiver(pre_delete, sender=Booking)
+def booking_deleting(sender, instance, **kwargs):
+    _load_rollup_values(instance)
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, **kwargs):
+    old_user_id, old_updated_at = instance._page_cache_state
+    page_cache.bookings_changed(instance.user_id, old_user_id)
+    page_cache.purge_row(instance.pk, old_updated_at)
+    instance._page_cache_state = (instance.user_id, instance.updated_at)
+
+    values = rollups.state_values(instance.__dict__)
+    rollups.move(
+        rollups.booking_state(instance._rollup_values), rollups.booking_state(values)
+    )
+    instance._rollup_values = values
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    old_user_id, old_updated_at = instance._page_cache_state
+    page_cache.bookings_changed(instance.user_id, old_user_id)
+    page_cache.purge_row(instance.pk, old_updated_at)
+    rollups.move(rollups.booking_state(instance._rollup_values), None)
@@ -0,0 +1,25 @@
+# bookings/slot_cache.py
+# TimeSlot <select> choices for BookingForm. Slots change about once a month,
+# so the rendered labels live in the tiered cache: each worker serves them
+# from memory and only checks the namespace version in the shared cache.
+# TimeSlot signals bump that version, which makes every worker rebuild on its
+# next form render.
+from .cache import tiered
+from .models import TimeSlot
+
+NAMESPACE = "timeslot-choices"
+
+
+def _build():
+    return tuple(
+        (slot.pk, str(slot)) for slot in TimeSlot.objects.order_by("start_time")
+    )
+
+
+def slot_choices():
+    # ((pk, label), ...) ordered by start time
+    return tiered.get_or_set(NAMESPACE, "choices", _build, timeout=None)
+
+
+def invalidate():
+    tiered.invalidate(NAMESPACE)
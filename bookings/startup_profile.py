@@ -0,0 +1,134 @@
+# bookings/startup_profile.py
+# Cold start measurements for `python manage.py profile_startup`.
+#
+# Each run is a fresh interpreter (python -X importtime) that loads
+# cardetailing.wsgi, optionally runs bookings/warmup.py, then sends every
+# path through the WSGI application twice. The first pass is what the first
+# visitors to a new worker wait for; the second is steady state.
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.db import connection
+
+DEFAULT_PATHS = ("/accounts/login/", "/availability/")
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Runs in the child process: argv is [warm (1/0), path, ...]. Prints one
+# JSON line; -X importtime writes to stderr.
+CHILD = r"""
+import json, sys, time
+from io import BytesIO
+
+started = time.perf_counter()
+from cardetailing.wsgi import application
+result = {"load": time.perf_counter() - started, "warmup": {}, "requests": []}
+
+from django.conf import settings
+
+if sys.argv[1] == "1":
+    from bookings.warmup import warm_up
+    result["warmup"] = warm_up()["timings"]
+
+host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+for attempt in ("first", "second"):
+    for url in sys.argv[2:]:
+        path, _, query = url.partition("?")
+        environ = {
+            "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query,
+            "SCRIPT_NAME": "", "SERVER_NAME": host, "SERVER_PORT": "80",
+            "HTTP_HOST": host, "SERVER_PROTOCOL": "HTTP/1.1",
+            "wsgi.input": BytesIO(), "wsgi.url_scheme": "http", "wsgi.errors": sys.stderr,
+        }
+        status = []
+        started = time.perf_counter()
+        response = application(environ, lambda s, headers, exc_info=None: status.append(s))
+        b"".join(response)
+        response.close()
+        result["requests"].append({
+            "attempt": attempt, "path": url, "status": int(status[0].split()[0]),
+            "seconds": time.perf_counter() - started,
+        })
+print(json.dumps(result))
+"""
+
+
+def parse_importtime(text):
+    # [(module, self_us, cumulative_us, depth)] from -X importtime output
+    imports = []
+    for line in text.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return imports
+
+
+def by_package(imports):
+    # {top-level package: self time in us}, largest first
+    totals = {}
+    for module, self_us, _, _ in imports:
+        package = module.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def run_child(paths, warm, production=True):
+    # One cold process; returns (child result, imports)
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "cardetailing.settings"),
+        # The child decides itself whether to warm up, so it can time it
+        DJANGO_WARMUP="False",
+        DJANGO_DB_NAME=str(connection.settings_dict["NAME"]),
+    )
+    if production:
+        env["DJANGO_DEBUG"] = "False"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, "1" if warm else "0", *paths],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return json.loads(completed.stdout.strip().splitlines()[-1]), parse_importtime(
+        completed.stderr
+    )
+
+
+def profile(paths=DEFAULT_PATHS, warm=True, repeat=3, production=True):
+    # Medians over ``repeat`` cold processes, in milliseconds:
+    #   {"load", "warmup": {step: ms}, "requests": {(attempt, path): ms},
+    #    "statuses": {path: status}, "first_response", "imports"}
+    runs = [run_child(paths, warm, production) for _ in range(repeat)]
+
+    def median(values):
+        return statistics.median(values) * 1000
+
+    results = [result for result, _ in runs]
+    requests = {}
+    for index, request in enumerate(results[0]["requests"]):
+        key = (request["attempt"], request["path"])
+        requests[key] = median([r["requests"][index]["seconds"] for r in results])
+    warmup = {
+        step: median([r["warmup"][step] for r in results]) for step in results[0]["warmup"]
+    }
+    load = median([r["load"] for r in results])
+    return {
+        "load": load,
+        "warmup": warmup,
+        "requests": requests,
+        "statuses": {
+            r["path"]: r["status"] for r in results[0]["requests"] if r["attempt"] == "first"
+        },
+        # From interpreter ready to the first path answered
+        "first_response": load + sum(warmup.values()) + requests[("first", paths[0])],
+        "imports": runs[0][1],
+    }
@@ -0,0 +1,124 @@
+# bookings/static_files.py
+# Serving collectstatic output from Django (StaticFilesMiddleware), for
+# deployments without nginx in front. Mirrors what nginx does with
+# static.conf: precompressed .br / .gz siblings picked by Accept-Encoding,
+# and far-future immutable caching for content-hashed names.
+#
+# STATIC_ROOT is indexed once per process, so a request costs a dict lookup
+# and an open(); collectstatic output only changes on deploy.
+import json
+import mimetypes
+import os
+
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+# Preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Unhashed names may change on the next deploy
+SHORT_LIVED = "public, max-age=60"
+
+MANIFEST = "staticfiles.json"
+
+
+class Variant:
+    # One file on disk: the original or a precompressed sibling
+    def __init__(self, path, encoding=None):
+        stat = os.stat(path)
+        self.path = path
+        self.encoding = encoding
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.etag = f'"{self.size:x}-{int(self.mtime):x}{"-" + encoding if encoding else ""}"'
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.original = Variant(path)
+        self.encoded = [
+            Variant(path + suffix, encoding)
+            for encoding, suffix in ENCODINGS
+            if os.path.exists(path + suffix)
+        ]
+        content_type, _ = mimetypes.guess_type(path)
+        if content_type and content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        self.content_type = content_type or "application/octet-stream"
+        self.cache_control = IMMUTABLE if immutable else SHORT_LIVED
+
+    def variant_for(self, accept_encoding):
+        accepted = accepted_encodings(accept_encoding)
+        for variant in self.encoded:
+            if variant.encoding in accepted:
+                return variant
+        return self.original
+
+
+def accepted_encodings(header):
+    # Codings in an Accept-Encoding header, minus those with q=0
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    if "*" in accepted:
+        accepted.update(encoding for encoding, _ in ENCODINGS)
+    return accepted
+
+
+def _hashed_names(root):
+    try:
+        with open(os.path.join(root, MANIFEST), encoding="utf-8") as manifest:
+            return set(json.load(manifest).get("paths", {}).values())
+    except (OSError, ValueError):
+        return set()
+
+
+def build_index(root, url_prefix):
+    # {url path: StaticFile} for every file collectstatic wrote
+    hashed = _hashed_names(root)
+    suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    index = {}
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(suffixes) or filename == MANIFEST:
+                continue
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, "/")
+            index[url_prefix + name] = StaticFile(path, immutable=name in hashed)
+    return index
+
+
+def serve(request, static):
+    variant = static.variant_for(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    not_modified = get_conditional_response(
+        request, etag=variant.etag, last_modified=int(static.original.mtime)
+    )
+    if not_modified is not None:
+        response = not_modified
+    elif request.method == "HEAD":
+        response = HttpResponse(content_type=static.content_type)
+        response["Content-Length"] = variant.size
+    else:
+        response = FileResponse(open(variant.path, "rb"), content_type=static.content_type)
+        # FileResponse names the file it sends (.gz / .br); not wanted here
+        del response["Content-Disposition"]
+
+    if variant.encoding:
+        response["Content-Encoding"] = variant.encoding
+    if static.encoded:
+        response["Vary"] = "Accept-Encoding"
+    response["ETag"] = variant.etag
+    response["Last-Modified"] = http_date(static.original.mtime)
+    response["Cache-Control"] = static.cache_control
+    return response
@@ -0,0 +1,125 @@
+# bookings/templatetags/booking_admin.py
+# Date hierarchy for the booking changelist. Django's {% date_hierarchy %}
+# lists the years / months / days that have rows with a DISTINCT over the
+# truncated dates, which on SQLite calls a Python function for every
+# booking in range: seconds at a million rows. This one reads only the
+# first and last date (two index seeks) and offers every year, month or
+# day between them, so a choice can now and then lead to an empty list.
+import calendar
+from datetime import date, timedelta
+
+from django import template
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.utils import formats
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+register = template.Library()
+
+
+def _bounds(queryset, field_name):
+    # (first, last) value of ``field_name``, or None when nothing matches.
+    # Separate ORDER BY ... LIMIT 1 queries: the index is walked from either
+    # end and stops at the first match, even under other filters.
+    values = queryset.values_list(field_name, flat=True)
+    first = values.order_by(field_name).first()
+    if first is None:
+        return None
+    return first, values.order_by(f"-{field_name}").first()
+
+
+def _days(first, last):
+    return [first + timedelta(days=n) for n in range((last - first).days + 1)]
+
+
+def _months(first, last):
+    return [
+        date(year, month, 1)
+        for year in range(first.year, last.year + 1)
+        for month in range(1, 13)
+        if (first.year, first.month) <= (year, month) <= (last.year, last.month)
+    ]
+
+
+def estimated_date_hierarchy(cl):
+    field_name = cl.date_hierarchy
+    year_field = f"{field_name}__year"
+    month_field = f"{field_name}__month"
+    day_field = f"{field_name}__day"
+    year = cl.params.get(year_field)
+    month = cl.params.get(month_field)
+    day = cl.params.get(day_field)
+
+    def link(filters):
+        return cl.get_query_string(filters, [f"{field_name}__"])
+
+    if year and month and day:
+        chosen = date(int(year), int(month), int(day))
+        return {
+            "show": True,
+            "back": {
+                "link": link({year_field: year, month_field: month}),
+                "title": capfirst(formats.date_format(chosen, "YEAR_MONTH_FORMAT")),
+            },
+            "choices": [{"title": capfirst(formats.date_format(chosen, "MONTH_DAY_FORMAT"))}],
+        }
+
+    bounds = _bounds(cl.queryset, field_name)
+    if bounds is None:
+        return {"show": True, "back": None, "choices": []}
+    first, last = bounds
+    if not year and first.year == last.year:
+        # Start at the deepest level that still has a choice to make
+        year = first.year
+        if first.month == last.month:
+            month = first.month
+
+    if year and month:
+        year, month = int(year), int(month)
+        start = max(first, date(year, month, 1))
+        end = min(last, date(year, month, calendar.monthrange(year, month)[1]))
+        return {
+            "show": True,
+            "back": {"link": link({year_field: year}), "title": str(year)},
+            "choices": [
+                {
+                    "link": link({year_field: year, month_field: month, day_field: d.day}),
+                    "title": capfirst(formats.date_format(d, "MONTH_DAY_FORMAT")),
+                }
+                for d in _days(start, end)
+            ],
+        }
+    if year:
+        year = int(year)
+        start = max(first, date(year, 1, 1))
+        end = min(last, date(year, 12, 31))
+        return {
+            "show": True,
+            "back": {"link": link({}), "title": _("All dates")},
+            "choices": [
+                {
+                    "link": link({year_field: year, month_field: m.month}),
+                    "title": capfirst(formats.date_format(m, "YEAR_MONTH_FORMAT")),
+                }
+                for m in _months(start, end)
+            ],
+        }
+    return {
+        "show": True,
+        "back": None,
+        "choices": [
+            {"link": link({year_field: str(y)}), "title": str(y)}
+            for y in range(first.year, last.year + 1)
+        ],
+    }
+
+
+@register.tag(name="estimated_date_hierarchy")
+def estimated_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=estimated_date_hierarchy,
+        template_name="date_hierarchy.html",
+        takes_context=False,
+    )
@@ -1,3 +1,336 @@
-from django.test import TestCase
+# bookings/testing.py
+# Test helpers shared by the bookings test suite and the benchmarks.
+import itertools
+import time as clock
+from datetime import date, time, timedelta
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+from . import page_cache, rollups
+from .metrics import registry
+from .models import Booking, TimeSlot
+
+# Maximum SQL queries per request, by URL name. Counts include the session
+# and user lookups for logged-in requests and transaction savepoints.
+QUERY_BUDGETS = {
+    "root_redirect": 0,
+    "health": 0,
+    "ready": 3,
+    "metrics": 2,
+    "availability": 2,
+    "login": 2,
+    "logout": 4,
+    "signup": 2,
+    "signup_submit": 10,
+    "booking_list": 3,
+    # One more on a cold TimeSlot choice cache
+    "create_booking": 3,
+    # The first booking of a slot/day also creates its seat counter and
+    # rollup row; every booking writes its confirmation email to the outbox
+    "create_booking_submit": 19,
+    # Session, user and one owner-scoped booking query (Booking.objects
+    # .visible_to); the edit form takes one more on a cold choice cache
+    "edit_booking": 4,
+    "edit_booking_submit": 9,
+    "delete_booking": 3,
+    "delete_booking_confirm": 7,
+    # Two-row CSV: slots, counters, one claim per (slot, day), one insert,
+    # rollup rows and one rollup update per (day, slot, service)
+    "booking_import": 17,
+    "booking_export": 2,
+    "api_bookings": 3,
+    "api_timeslots": 1,
+    # Session, user, then the rollup sums (bays, totals, days, services,
+    # slots, seat counters, time slots)
+    "analytics": 9,
+    "admin:index": 3,
+    # Session, user, time slots (filter), capped count, table estimate past
+    # the cap, the page, first and last date (hierarchy)
+    "admin:bookings_booking_changelist": 8,
+}
+
+PASSWORD = "secret123"
+
+
+class QueryBudgetMixin:
+    # For TestCase subclasses: requests made through self.client are recorded
+    # by PerformanceMetricsMiddleware, so a test can check the last request
+    # to a view against its budget.
+
+    def assertQueryBudget(self, url_name, budget=None):
+        last = registry.last(url_name)
+        if last is None:
+            self.fail(f"No request to {url_name!r} was recorded.")
+        budget = QUERY_BUDGETS[url_name] if budget is None else budget
+        self.assertLessEqual(
+            last["queries"],
+            budget,
+            f"{url_name} ran {last['queries']} queries (budget {budget}).",
+        )
+
+
+# ---------- route exercise (query budget tests + benchmarks/regression.py) ----------
+
+
+def project_route_names():
+    # Every named route in the root URLconf (namespaced admin routes excluded)
+    return {name for name in get_resolver().reverse_dict if isinstance(name, str)}
+
+
+class RouteFixtures:
+    # Data the route requests point at; built by seed_route_fixtures()
+    def __init__(self, customer, staff, slot, booking, disposable):
+        self.customer = customer
+        self.staff = staff
+        self.slot = slot
+        self.booking = booking
+        self.disposable = iter(disposable)
+        self.counter = itertools.count()
+
+    def import_file(self):
+        # Two-row CSV upload for booking_import (slots referenced by code)
+        rows = []
+        for _ in range(2):
+            data = dict(
+                self.booking_data(next(self.counter)), preferred_time_slot=self.slot.slot
+            )
+            rows.append(",".join(data.values()))
+        content = "\n".join([",".join(data), *rows])
+        return SimpleUploadedFile("import.csv", content.encode())
+
+    def booking_data(self, offset=0):
+        return {
+            "customer_name": "Jane Doe",
+            "email": "jane@example.com",
+            "phone": "0851234567",
+            "car_model": "Golf",
+            "service_type": "Full Detailing",
+            "preferred_date": (date.today() + timedelta(days=1 + offset % 60)).isoformat(),
+            "preferred_time_slot": self.slot.pk,
+            "notes": "",
+        }
+
+
+def seed_route_fixtures(users=5, bookings=50, slots=6, disposable=50, batch_size=5000):
+    # Customers, staff, time slots and bookings spread over the next 90 days.
+    # Passwords are hashed once and shared so seeding thousands of users is fast.
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(username=f"customer{i}", password=password) for i in range(users)
+    )
+    customer = User.objects.get(username="customer0")
+    staff = User.objects.create(
+        username="staff", password=password, is_staff=True, is_superuser=True
+    )
+    TimeSlot.objects.bulk_create(
+        TimeSlot(
+            start_time=time(7 + (i % 12), 0),
+            end_time=time(8 + (i % 12), 0),
+            slot=f"SLOT-{i}",
+            capacity=1000,
+        )
+        for i in range(slots)
+    )
+    slot_rows = list(TimeSlot.objects.values_list("pk", "start_time"))
+    user_ids = list(User.objects.filter(is_staff=False).values_list("pk", flat=True))
+
+    def booking(i, user_id):
+        return Booking(
+            user_id=user_id,
+            customer_name=f"Customer {i}",
+            email=f"customer{i}@example.com",
+            phone="0851234567",
+            car_model="Golf",
+            service_type=Booking.SERVICE_CHOICES[i % 4][0],
+            preferred_date=date.today() + timedelta(days=i % 90),
+            # bulk_create() skips Booking.save(), which sets the start time
+            preferred_time_slot_id=slot_rows[i % len(slot_rows)][0],
+            preferred_start_time=slot_rows[i % len(slot_rows)][1],
+            notes="" if i % 3 else "Pet hair in the back seats",
+        )
+
+    for start in range(0, bookings, batch_size):
+        Booking.objects.bulk_create(
+            booking(i, user_ids[i % len(user_ids)])
+            for i in range(start, min(start + batch_size, bookings))
+        )
+    Booking.objects.bulk_create(
+        booking(bookings + i, customer.pk) for i in range(disposable)
+    )
+    # bulk_create() sends no signals
+    page_cache.invalidate_all()
+    rollups.rebuild()
+    owned = list(
+        Booking.objects.filter(user=customer).order_by("-pk").values_list("pk", flat=True)
+    )
+    return RouteFixtures(
+        customer=customer,
+        staff=staff,
+        slot=TimeSlot.objects.get(pk=slot_rows[0][0]),
+        booking=Booking.objects.get(pk=owned[-1]),
+        disposable=owned[:disposable],
+    )
+
+
+class RouteRequest:
+    # One request per named route. ``args`` and ``data`` may be callables
+    # taking the fixtures, for routes that need fresh data on every call.
+    def __init__(self, url_name, method="get", role="anonymous", args=(), data=None):
+        self.url_name = url_name
+        self.method = method
+        self.role = role
+        self.args = args
+        self.data = data
+
+    def resolve(self, fixtures):
+        args = self.args(fixtures) if callable(self.args) else self.args
+        data = self.data(fixtures) if callable(self.data) else self.data
+        return reverse(self.url_name, args=args), data or {}
+
+
+ROUTE_REQUESTS = {
+    "root_redirect": RouteRequest("root_redirect"),
+    "health": RouteRequest("health"),
+    "ready": RouteRequest("ready"),
+    "metrics": RouteRequest("metrics", role="staff"),
+    "availability": RouteRequest(
+        "availability",
+        data=lambda f: {
+            "start": date.today().isoformat(),
+            "end": (date.today() + timedelta(days=89)).isoformat(),
+        },
+    ),
+    "login": RouteRequest("login"),
+    "logout": RouteRequest("logout", role="fresh_customer"),
+    "signup": RouteRequest("signup"),
+    "signup_submit": RouteRequest(
+        "signup_submit",
+        method="post",
+        role="fresh_anonymous",
+        data=lambda f: {
+            "username": f"signup{next(f.counter)}",
+            "password1": "VeryStrongPass123!",
+            "password2": "VeryStrongPass123!",
+        },
+    ),
+    "booking_list": RouteRequest("booking_list", role="customer"),
+    "booking_list:staff": RouteRequest("booking_list", role="staff"),
+    "create_booking": RouteRequest("create_booking", role="customer"),
+    "create_booking_submit": RouteRequest(
+        "create_booking_submit",
+        method="post",
+        role="customer",
+        data=lambda f: f.booking_data(next(f.counter)),
+    ),
+    "edit_booking": RouteRequest(
+        "edit_booking", role="customer", args=lambda f: [f.booking.pk]
+    ),
+    "edit_booking_submit": RouteRequest(
+        "edit_booking_submit",
+        method="post",
+        role="customer",
+        args=lambda f: [f.booking.pk],
+        data=lambda f: dict(
+            f.booking_data(),
+            preferred_date=f.booking.preferred_date.isoformat(),
+            preferred_time_slot=f.booking.preferred_time_slot_id,
+        ),
+    ),
+    "delete_booking": RouteRequest(
+        "delete_booking", role="customer", args=lambda f: [f.booking.pk]
+    ),
+    "delete_booking_confirm": RouteRequest(
+        "delete_booking_confirm",
+        method="post",
+        role="customer",
+        args=lambda f: [next(f.disposable)],
+    ),
+    "booking_import": RouteRequest(
+        "booking_import",
+        method="post",
+        role="staff",
+        data=lambda f: {"file": f.import_file(), "user": f.customer.username},
+    ),
+    "booking_export": RouteRequest("booking_export", role="staff"),
+    "api_bookings": RouteRequest("api_bookings", role="customer"),
+    "api_bookings:staff": RouteRequest(
+        "api_bookings", role="staff", data={"fields": "id,preferred_date,start_time"}
+    ),
+    "api_timeslots": RouteRequest("api_timeslots"),
+    "analytics": RouteRequest(
+        "analytics",
+        role="staff",
+        data=lambda f: {
+            "start": (date.today() - timedelta(days=365)).isoformat(),
+            "end": date.today().isoformat(),
+        },
+    ),
+    "admin:index": RouteRequest("admin:index", role="staff"),
+    "admin:bookings_booking_changelist": RouteRequest(
+        "admin:bookings_booking_changelist", role="staff"
+    ),
+}
+
+
+class RouteExerciser:
+    # Sends ROUTE_REQUESTS through the test client as the right user and
+    # reports (status, queries, seconds) per call
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.clients = {
+            "anonymous": Client(),
+            "customer": self._logged_in(fixtures.customer),
+            "staff": self._logged_in(fixtures.staff),
+        }
+
+    def _logged_in(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def _client(self, role):
+        # "fresh_*" roles get a new client (logout / signup change the session)
+        if role == "fresh_customer":
+            return self._logged_in(self.fixtures.customer)
+        if role == "fresh_anonymous":
+            return Client()
+        return self.clients[role]
+
+    def call(self, label):
+        spec = ROUTE_REQUESTS[label]
+        client = self._client(spec.role)
+        path, data = spec.resolve(self.fixtures)
+        with CaptureQueriesContext(connection) as queries:
+            started = clock.perf_counter()
+            response = getattr(client, spec.method)(path, data)
+            elapsed = clock.perf_counter() - started
+        return response.status_code, len(queries), elapsed
+
+
+# Every test client posts from 127.0.0.1, so suites and benchmarks run
+# unthrottled; bookings/tests/test_throttling.py turns it back on
+no_throttling = override_settings(THROTTLE_RATES={})
+
+
+# Tests run one process against the locmem cache on purpose
+local_cache_is_fine = override_settings(SILENCED_SYSTEM_CHECKS=["bookings.W001"])
+
+
+class TestRunner(DiscoverRunner):
+    # settings.TEST_RUNNER
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        no_throttling.enable()
+        local_cache_is_fine.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        local_cache_is_fine.disable()
+        no_throttling.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,217 @@
+# bookings/tests/test_admin.py
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bookings import rollups, services
+from bookings.forms import BookingForm
+from bookings.models import Bay, Booking, SlotCapacity, TimeSlot
+from bookings.pagination import EstimatedCountPaginator
+from bookings.testing import QUERY_BUDGETS
+
+CHANGELIST = "admin:bookings_booking_changelist"
+
+
+def statements(queries, verb):
+    # Captured SQL statements of ``verb`` against the bookings table
+    table = Booking._meta.db_table
+    return [
+        q["sql"] for q in queries if q["sql"].startswith(verb) and f'"{table}"' in q["sql"]
+    ]
+
+
+class BookingAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser(username="admin", password="secret123")
+        cls.customer = User.objects.create_user(username="customer", password="secret123")
+        cls.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING", capacity=50
+        )
+        cls.bay = Bay.objects.create(name="Bay 1")
+        cls.day = date.today() + timedelta(days=5)
+        cls.bookings = [cls._create(cls.day) for _ in range(3)]
+        Booking.objects.update(bay=cls.bay, scheduled_start=time(9, 0))
+
+    @classmethod
+    def _create(cls, day, service="Full Detailing"):
+        form = BookingForm(
+            data={
+                "customer_name": "Jane Doe",
+                "email": "jane@example.com",
+                "phone": "0851234567",
+                "car_model": "Golf",
+                "service_type": service,
+                "preferred_date": day.isoformat(),
+                "preferred_time_slot": cls.slot.pk,
+                "notes": "",
+            }
+        )
+        assert form.is_valid(), form.errors
+        return services.create_booking(form, cls.customer)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def _action(self, action, bookings, **extra):
+        return self.client.post(
+            reverse(CHANGELIST),
+            {"action": action, "_selected_action": [b.pk for b in bookings], **extra},
+        )
+
+    def test_changelist_queries_do_not_grow_with_bookings(self):
+        url = reverse(CHANGELIST)
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        for offset in range(40):
+            self._create(self.day + timedelta(days=offset % 7))
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(few), len(many))
+        self.assertLessEqual(len(many), QUERY_BUDGETS[CHANGELIST])
+        self.assertContains(response, "43 bookings")
+
+    def test_date_hierarchy_offers_the_days_between_first_and_last(self):
+        self._create(date(2031, 3, 10))
+        self._create(date(2031, 3, 12))
+        url = reverse(CHANGELIST)
+        page = self.client.get(url).content.decode()
+        for year in range(self.day.year, 2032):
+            self.assertIn(f"?preferred_date__year={year}", page)
+
+        page = self.client.get(
+            url, {"preferred_date__year": 2031, "preferred_date__month": 3}
+        ).content.decode()
+        days = [d for d in range(1, 32) if f"preferred_date__day={d}&" in page]
+        self.assertEqual(days, [10, 11, 12])
+
+    def test_change_service_is_one_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self._action("set_service_ceramic_coating", self.bookings[:2])
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(statements(queries, "UPDATE")), 1)
+        changed = Booking.objects.filter(service_type="Ceramic Coating")
+        self.assertEqual(changed.count(), 2)
+        self.assertFalse(changed.exclude(bay=None).exists())
+        self.assertEqual(rollups.check(), [])
+
+    def test_clear_bay(self):
+        self._action("clear_bay", self.bookings)
+        self.assertFalse(Booking.objects.exclude(bay=None).exists())
+
+    def test_delete_selected_releases_seats_in_one_delete(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self._action("delete_selected", self.bookings[:2], post="yes")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(statements(queries, "DELETE")), 1)
+        self.assertEqual(Booking.objects.count(), 1)
+        seats = SlotCapacity.objects.get(time_slot=self.slot, date=self.day)
+        self.assertEqual(seats.reserved, 1)
+        self.assertEqual(rollups.check(), [])
+
+    def _form_data(self, booking, **changes):
+        data = {
+            "user": booking.user_id,
+            "customer_name": booking.customer_name,
+            "email": booking.email,
+            "phone": booking.phone,
+            "car_model": booking.car_model,
+            "service_type": booking.service_type,
+            "preferred_date": booking.preferred_date.isoformat(),
+            "preferred_time_slot": booking.preferred_time_slot_id,
+            "notes": booking.notes,
+        }
+        data.update(changes)
+        return data
+
+    def _reserved(self, day):
+        return SlotCapacity.objects.get(time_slot=self.slot, date=day).reserved
+
+    def test_add_takes_a_seat(self):
+        response = self.client.post(
+            reverse("admin:bookings_booking_add"), self._form_data(self.bookings[0])
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Booking.objects.count(), 4)
+        self.assertEqual(self._reserved(self.day), 4)
+        self.assertEqual(rollups.check(), [])
+
+    def test_add_to_a_full_slot_is_refused(self):
+        TimeSlot.objects.filter(pk=self.slot.pk).update(capacity=3)
+        SlotCapacity.objects.filter(time_slot=self.slot).update(capacity=3)
+        data = self._form_data(self.bookings[0], customer_name="Walk-in")
+        response = self.client.post(reverse("admin:bookings_booking_add"), data)
+        self.assertEqual(response.status_code, 200)
+        errors = response.context["adminform"].form.errors
+        self.assertIn("fully booked", errors["preferred_time_slot"][0])
+        self.assertContains(response, 'value="Walk-in"')
+        self.assertEqual(Booking.objects.count(), 3)
+        self.assertEqual(self._reserved(self.day), 3)
+
+    def test_move_gives_the_seat_back(self):
+        booking = self.bookings[0]
+        later = self.day + timedelta(days=1)
+        response = self.client.post(
+            reverse("admin:bookings_booking_change", args=[booking.pk]),
+            self._form_data(booking, preferred_date=later.isoformat()),
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual((self._reserved(self.day), self._reserved(later)), (2, 1))
+        booking.refresh_from_db()
+        self.assertEqual(booking.preferred_date, later)
+        self.assertIsNone(booking.bay)
+        self.assertEqual(rollups.check(), [])
+
+    def test_delete_one_booking_releases_its_seat(self):
+        booking = self.bookings[0]
+        url = reverse("admin:bookings_booking_delete", args=[booking.pk])
+        self.client.post(url, {"post": "yes"})
+        seats = SlotCapacity.objects.get(time_slot=self.slot, date=self.day)
+        self.assertEqual(seats.reserved, 2)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username="customer")
+        slot = TimeSlot.objects.create(start_time=time(9, 0), end_time=time(10, 0), slot="A")
+        Booking.objects.bulk_create(
+            Booking(
+                user=user,
+                customer_name=f"Customer {i}",
+                email="c@example.com",
+                phone="0851234567",
+                car_model="Golf",
+                service_type="Full Detailing",
+                preferred_date=date(2030, 1, 1) + timedelta(days=i),
+                preferred_time_slot=slot,
+                preferred_start_time=slot.start_time,
+            )
+            for i in range(30)
+        )
+
+    def paginator(self, queryset, per_page=4):
+        paginator = EstimatedCountPaginator(queryset.order_by("-id"), per_page)
+        paginator.count_limit = 10
+        return paginator
+
+    def test_small_lists_are_counted_exactly(self):
+        paginator = self.paginator(Booking.objects.filter(preferred_date__lt=date(2030, 1, 6)))
+        self.assertEqual(paginator.count, 5)
+        self.assertEqual(paginator.num_pages, 2)
+
+    def test_large_lists_are_estimated_and_pages_capped(self):
+        unfiltered = self.paginator(Booking.objects.all())
+        self.assertEqual(unfiltered.count, Booking.objects.latest("pk").pk)
+        self.assertEqual(unfiltered.num_pages, 3)
+
+        filtered = self.paginator(Booking.objects.filter(preferred_date__gte=date(2030, 1, 1)))
+        with self.assertNumQueries(1):
+            self.assertEqual(filtered.count, 10)
+        self.assertEqual(filtered.num_pages, 3)
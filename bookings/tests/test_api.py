@@ -0,0 +1,161 @@
+# bookings/tests/test_api.py
+import json
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from bookings.models import Booking, TimeSlot
+
+
+def _json(response):
+    if response.streaming:
+        return json.loads(b"".join(response.streaming_content))
+    return response.json()
+
+
+@override_settings(BOOKINGS_PAGE_SIZE=3)
+class BookingApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="normal_user", password="secret123")
+        cls.other = User.objects.create_user(username="other_user", password="secret123")
+        cls.staff = User.objects.create_user(
+            username="staff", password="secret123", is_staff=True
+        )
+        cls.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING"
+        )
+        cls.day = date.today() + timedelta(days=1)
+        for offset, service in enumerate(["Full Detailing"] * 4 + ["Ceramic Coating"]):
+            cls._booking(cls.user, cls.day + timedelta(days=offset), service)
+        cls._booking(cls.other, cls.day, "Full Detailing")
+
+    @classmethod
+    def _booking(cls, user, day, service):
+        return Booking.objects.create(
+            user=user,
+            customer_name=user.username,
+            email="jane@example.com",
+            phone="0851234567",
+            car_model="Golf",
+            service_type=service,
+            preferred_date=day,
+            preferred_time_slot=cls.slot,
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def _get(self, **params):
+        return self.client.get(reverse("api_bookings"), params)
+
+    def test_requires_login(self):
+        self.assertEqual(Client().get(reverse("api_bookings")).status_code, 401)
+
+    def test_pages_follow_the_cursor(self):
+        first = _json(self._get())
+        self.assertEqual(len(first["results"]), 3)
+        second = _json(self._get(cursor=first["next_cursor"]))
+        self.assertEqual(len(second["results"]), 2)
+        self.assertIsNone(second["next_cursor"])
+        dates = [row["preferred_date"] for row in first["results"] + second["results"]]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    def test_customers_only_see_their_own_bookings(self):
+        response = self._get(page_size=50, fields="customer_name")
+        names = {row["customer_name"] for row in _json(response)["results"]}
+        self.assertEqual(names, {"normal_user"})
+
+    def test_field_selection_and_filters(self):
+        response = self._get(fields="id,service_type", service_type="Ceramic Coating")
+        results = _json(response)["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(set(results[0]), {"id", "service_type"})
+
+        end = (self.day + timedelta(days=1)).isoformat()
+        response = self._get(start=self.day.isoformat(), end=end)
+        self.assertEqual(len(_json(response)["results"]), 2)
+
+    def test_staff_can_filter_by_user(self):
+        self.client.force_login(self.staff)
+        response = self._get(user=self.other.pk)
+        self.assertEqual(len(_json(response)["results"]), 1)
+
+    def test_bad_parameters_are_rejected(self):
+        self.assertEqual(self._get(fields="id,password").status_code, 400)
+        self.assertEqual(self._get(start="soon").status_code, 400)
+        self.assertEqual(self._get(service_type="Wash").status_code, 400)
+
+    def test_unchanged_page_returns_304(self):
+        response = self._get()
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertNotIn("Last-Modified", response)
+
+        # User and page queries only (the session is cached); nothing is
+        # serialized
+        with self.assertNumQueries(2):
+            cached = self.client.get(
+                reverse("api_bookings"), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+
+    def test_changes_produce_a_new_etag(self):
+        etag = self._get()["ETag"]
+        booking = Booking.objects.filter(user=self.user).latest("preferred_date")
+        booking.notes = "Changed"
+        booking.save()
+        response = self.client.get(reverse("api_bookings"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        booking.delete()
+        response = self.client.get(reverse("api_bookings"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since_never_answers_304(self):
+        # Deleting a booking leaves the newest updated_at on the page alone
+        self._get()
+        Booking.objects.filter(user=self.user).earliest("updated_at").delete()
+        later = http_date(timezone.now().timestamp() + 60)
+        response = self.client.get(reverse("api_bookings"), HTTP_IF_MODIFIED_SINCE=later)
+        self.assertEqual(response.status_code, 200)
+
+    def test_editing_the_time_slot_produces_a_new_etag(self):
+        response = self._get(fields="id,start_time,end_time,updated_at")
+        before = _json(response)["results"]
+        slot = TimeSlot.objects.get(pk=self.slot.pk)
+        slot.end_time = time(11, 0)
+        slot.save()
+
+        response = self.client.get(
+            reverse("api_bookings"),
+            {"fields": "id,start_time,end_time,updated_at"},
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 200)
+        after = _json(response)["results"]
+        self.assertEqual({row["end_time"] for row in after}, {"11:00:00"})
+        self.assertTrue(all(a["updated_at"] > b["updated_at"] for a, b in zip(after, before)))
+
+        # Saving it unchanged leaves the bookings alone
+        stamps = list(Booking.objects.values_list("updated_at", flat=True))
+        slot.save()
+        self.assertEqual(list(Booking.objects.values_list("updated_at", flat=True)), stamps)
+
+
+class TimeSlotApiTests(TestCase):
+    def test_lists_slots_with_etag(self):
+        TimeSlot.objects.create(start_time=time(9, 0), end_time=time(10, 0), slot="MORNING")
+        client = Client()
+        response = client.get(reverse("api_timeslots"))
+        self.assertEqual(response.json()["results"][0]["slot"], "MORNING")
+
+        cached = client.get(reverse("api_timeslots"), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
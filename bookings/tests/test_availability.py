@@ -0,0 +1,113 @@
+# bookings/tests/test_availability.py
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from bookings import availability
+from bookings.capacity import reserve
+from bookings.models import Booking, SlotCapacity, TimeSlot
+
+
+class AvailabilityEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.morning = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING", capacity=3
+        )
+        cls.noon = TimeSlot.objects.create(
+            start_time=time(12, 0), end_time=time(13, 0), slot="NOON", capacity=2
+        )
+        cls.day = date.today() + timedelta(days=2)
+
+    def setUp(self):
+        self.client = Client()
+        # Responses cached by earlier (rolled back) tests must not leak in
+        availability.invalidate()
+
+    def _get(self, **params):
+        return self.client.get(reverse("availability"), params)
+
+    def test_empty_days_report_full_capacity(self):
+        response = self._get(start=self.day.isoformat(), end=self.day.isoformat())
+        self.assertEqual(response.status_code, 200)
+        free = response.json()["days"][self.day.isoformat()]
+        self.assertEqual(free, {str(self.morning.pk): 3, str(self.noon.pk): 2})
+
+    def test_reservations_reduce_free_seats(self):
+        reserve(self.noon, self.day)
+        reserve(self.noon, self.day)
+        response = self._get(start=self.day.isoformat(), end=self.day.isoformat())
+        self.assertEqual(response.json()["days"][self.day.isoformat()][str(self.noon.pk)], 0)
+
+    def test_repeat_requests_are_served_from_cache(self):
+        params = {"start": self.day.isoformat(), "end": self.day.isoformat()}
+        self._get(**params)
+        with self.assertNumQueries(0):
+            self._get(**params)
+
+        reserve(self.noon, self.day)
+        response = self._get(**params)
+        self.assertEqual(response.json()["days"][self.day.isoformat()][str(self.noon.pk)], 1)
+
+    def test_slot_changes_show_up_at_once(self):
+        params = {"start": self.day.isoformat(), "end": self.day.isoformat()}
+        self._get(**params)
+        evening = TimeSlot.objects.create(
+            start_time=time(17, 0), end_time=time(18, 0), slot="EVENING", capacity=4
+        )
+        free = self._get(**params).json()["days"][self.day.isoformat()]
+        self.assertEqual(free[str(evening.pk)], 4)
+
+        evening.delete()
+        free = self._get(**params).json()["days"][self.day.isoformat()]
+        self.assertNotIn(str(evening.pk), free)
+
+    def test_query_count_does_not_depend_on_bookings(self):
+        """Two queries (slots + counters) for a 90 day range."""
+        for offset in range(0, 60, 3):
+            reserve(self.morning, self.day + timedelta(days=offset))
+        end = self.day + timedelta(days=89)
+        with self.assertNumQueries(2):
+            response = self._get(start=self.day.isoformat(), end=end.isoformat())
+        self.assertEqual(len(response.json()["days"]), 90)
+
+    def test_invalid_ranges_are_rejected(self):
+        self.assertEqual(self._get(start="tomorrow").status_code, 400)
+        self.assertEqual(
+            self._get(start="2030-02-01", end="2030-01-01").status_code, 400
+        )
+        self.assertEqual(
+            self._get(start="2030-01-01", end="2030-06-01").status_code, 400
+        )
+
+
+class RebuildAvailabilityCommandTests(TestCase):
+    def test_rebuild_matches_bookings(self):
+        user = User.objects.create_user(username="normal_user", password="secret123")
+        slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING", capacity=3
+        )
+        day = date.today() + timedelta(days=1)
+        Booking.objects.bulk_create(
+            Booking(
+                user=user,
+                customer_name="Jane",
+                email="jane@example.com",
+                phone="0851234567",
+                car_model="Golf",
+                service_type="Full Detailing",
+                preferred_date=day,
+                preferred_time_slot=slot,
+                preferred_start_time=slot.start_time,
+            )
+            for _ in range(2)
+        )
+
+        call_command("rebuild_availability", stdout=StringIO())
+
+        counter = SlotCapacity.objects.get(time_slot=slot, date=day)
+        self.assertEqual((counter.reserved, counter.capacity), (2, 3))
@@ -0,0 +1,156 @@
+# bookings/tests/test_cache.py
+import threading
+import time
+import uuid
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from bookings import checks
+from bookings.cache import LocalLRU, TieredCache
+
+
+class LocalLRUTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        lru = LocalLRU(maxsize=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual((lru.get("a"), lru.get("b"), lru.get("c")), (1, None, 3))
+
+    def test_entries_expire(self):
+        lru = LocalLRU(ttl=0.01)
+        lru.set("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(lru.get("a"))
+
+
+class TieredCacheCases:
+    """Two TieredCache instances stand in for two workers sharing a backend."""
+
+    shared_cache = None
+
+    def setUp(self):
+        settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+                },
+                "shared": self.shared_cache,
+            }
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(caches["shared"].clear)
+        self.worker_a = TieredCache(alias="shared")
+        self.worker_b = TieredCache(alias="shared")
+
+    def test_second_worker_reads_shared_value(self):
+        calls = []
+        compute = lambda: calls.append(1) or "value"  # noqa: E731
+        self.assertEqual(self.worker_a.get_or_set("ns", "k", compute), "value")
+        self.assertEqual(self.worker_b.get_or_set("ns", "k", compute), "value")
+        self.assertEqual(len(calls), 1)
+
+    def test_invalidation_reaches_every_worker(self):
+        self.worker_a.get_or_set("ns", "k", lambda: "old")
+        self.worker_b.get_or_set("ns", "k", lambda: "old")
+
+        self.worker_a.invalidate("ns")
+
+        self.assertEqual(self.worker_b.get_or_set("ns", "k", lambda: "new"), "new")
+        self.assertEqual(self.worker_a.get_or_set("ns", "k", lambda: "new"), "new")
+
+    def test_evicted_version_does_not_bring_back_old_values(self):
+        self.worker_a.get_or_set("ns", "k", lambda: "old")
+        self.worker_a.invalidate("ns")
+        self.worker_a.get_or_set("ns", "k", lambda: "new")
+        caches["shared"].delete(self.worker_a._version_key("ns"))
+
+        self.assertEqual(self.worker_b.get_or_set("ns", "k", lambda: "newer"), "newer")
+        self.assertEqual(self.worker_a.get_or_set("ns", "k", lambda: "newest"), "newer")
+
+    def test_none_is_cached(self):
+        calls = []
+        for _ in range(2):
+            self.worker_a.get_or_set("ns", "k", lambda: calls.append(1))
+        self.assertEqual(len(calls), 1)
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        gate = threading.Event()
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        def read(worker):
+            gate.wait()
+            try:
+                results.append(worker.get_or_set("ns", "hot", slow))
+            finally:
+                connections.close_all()
+
+        results = []
+        threads = [
+            threading.Thread(target=read, args=(worker,))
+            for worker in [self.worker_a] * 10 + [self.worker_b] * 10
+        ]
+        for thread in threads:
+            thread.start()
+        gate.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["value"] * 20)
+        self.assertEqual(len(calls), 1)
+
+
+class TieredCacheTests(TieredCacheCases, SimpleTestCase):
+    # A LocMemCache location is shared by every thread of the process and,
+    # like memcached, has an atomic add()
+    shared_cache = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": f"tiered-test-{uuid.uuid4().hex}",
+    }
+
+
+class DatabaseTieredCacheTests(TieredCacheCases, TransactionTestCase):
+    # The shared backend this tree runs across workers (DJANGO_CACHE_BACKEND=db).
+    # Its add() is an INSERT on the key's primary key, so only one worker wins
+    # the lock, and on SQLite no write is lost to a concurrent one.
+    shared_cache = {
+        "BACKEND": "bookings.cache_backend.DatabaseCache",
+        "LOCATION": "tiered_test_cache",
+    }
+
+    def setUp(self):
+        super().setUp()
+        call_command("createcachetable", "tiered_test_cache", verbosity=0)
+
+
+@override_settings(DEBUG=False)
+class SharedCacheCheckTests(SimpleTestCase):
+    def _hints(self):
+        return [(w.id, w.hint) for w in checks.caches_are_shared(None)]
+
+    @override_settings(THROTTLE_RATES={"login": {"ip": "5/m"}})
+    def test_process_local_cache_is_reported(self):
+        [(warning, hint)] = self._hints()
+        self.assertEqual(warning, "bookings.W001")
+        self.assertIn("cache tier", hint)
+        self.assertIn("throttle counts", hint)
+
+    @override_settings(THROTTLE_RATES={})
+    def test_reported_without_throttling_too(self):
+        [(_, hint)] = self._hints()
+        self.assertNotIn("throttle", hint)
+
+    def test_shared_cache_is_not_reported(self):
+        backend = "django.core.cache.backends.filebased.FileBasedCache"
+        with override_settings(CACHES={"default": {"BACKEND": backend, "LOCATION": "/tmp/unused"}}):
+            self.assertEqual(self._hints(), [])
@@ -0,0 +1,143 @@
+# bookings/tests/test_capacity.py
+import threading
+import time as clock
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from bookings import services
+from bookings.capacity import SlotFullError, reserve
+from bookings.forms import BookingForm
+from bookings.models import Booking, SlotCapacity, TimeSlot
+
+
+def booking_data(slot, day, **extra):
+    data = {
+        "customer_name": "Jane Doe",
+        "email": "jane@example.com",
+        "phone": "0851234567",
+        "car_model": "Golf",
+        "service_type": "Full Detailing",
+        "preferred_date": day.isoformat(),
+        "preferred_time_slot": slot.pk,
+        "notes": "",
+    }
+    data.update(extra)
+    return data
+
+
+class SlotCapacityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="normal_user", password="secret123")
+        cls.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING", capacity=2
+        )
+        cls.other = TimeSlot.objects.create(
+            start_time=time(11, 0), end_time=time(12, 0), slot="NOON", capacity=1
+        )
+        cls.day = date.today() + timedelta(days=3)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.login(username="normal_user", password="secret123")
+
+    def _counter(self, slot):
+        return SlotCapacity.objects.get(time_slot=slot, date=self.day)
+
+    def test_reserve_stops_at_capacity(self):
+        reserve(self.slot, self.day)
+        reserve(self.slot, self.day)
+        with self.assertRaises(SlotFullError):
+            reserve(self.slot, self.day)
+        self.assertEqual(self._counter(self.slot).reserved, 2)
+
+    def test_full_slot_rerenders_form_with_error(self):
+        """The last seat goes to the first POST; the next one gets a form error."""
+        url = reverse("create_booking_submit")
+        self.client.post(url, booking_data(self.other, self.day))
+        response = self.client.post(url, booking_data(self.other, self.day))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("preferred_time_slot", response.context["form"].errors)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_edit_moves_seat_between_slots(self):
+        self.client.post(reverse("create_booking_submit"), booking_data(self.slot, self.day))
+        booking = Booking.objects.get()
+
+        self.client.post(
+            reverse("edit_booking_submit", args=[booking.pk]),
+            booking_data(self.other, self.day),
+        )
+
+        self.assertEqual(self._counter(self.slot).reserved, 0)
+        self.assertEqual(self._counter(self.other).reserved, 1)
+
+    def test_delete_releases_seat(self):
+        self.client.post(reverse("create_booking_submit"), booking_data(self.other, self.day))
+        booking = Booking.objects.get()
+
+        self.client.post(reverse("delete_booking_confirm", args=[booking.pk]))
+
+        self.assertEqual(self._counter(self.other).reserved, 0)
+
+    def test_capacity_change_reaches_future_counters(self):
+        reserve(self.slot, self.day)
+        self.slot.capacity = 6
+        self.slot.save()
+        self.assertEqual(self._counter(self.slot).capacity, 6)
+
+
+class ConcurrentReservationStressTests(TransactionTestCase):
+    SUBMISSIONS = 300
+    WORKERS = 32
+    CAPACITY = 25
+    # SQLite's default busy timeout; no submission may wait out its lock
+    P99_BUDGET = 5.0
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="normal_user", password="secret123")
+        self.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING",
+            capacity=self.CAPACITY,
+        )
+        self.day = date.today() + timedelta(days=1)
+
+    def _submit(self, gate):
+        gate.wait()
+        started = clock.perf_counter()
+        try:
+            form = BookingForm(booking_data(self.slot, self.day))
+            assert form.is_valid(), form.errors
+            try:
+                services.create_booking(form, self.user)
+                booked = True
+            except SlotFullError:
+                booked = False
+            return booked, clock.perf_counter() - started
+        finally:
+            connection.close()
+
+    def test_parallel_submissions_never_overbook(self):
+        gate = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            futures = [pool.submit(self._submit, gate) for _ in range(self.SUBMISSIONS)]
+            gate.set()
+            results = [future.result() for future in futures]
+
+        booked = sum(1 for ok, _ in results if ok)
+        latencies = sorted(elapsed for _, elapsed in results)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+
+        self.assertEqual(booked, self.CAPACITY)
+        self.assertEqual(Booking.objects.count(), self.CAPACITY)
+        self.assertEqual(
+            SlotCapacity.objects.get(time_slot=self.slot, date=self.day).reserved,
+            self.CAPACITY,
+        )
+        self.assertLess(p99, self.P99_BUDGET)
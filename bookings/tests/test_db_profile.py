@@ -0,0 +1,91 @@
+# bookings/tests/test_db_profile.py
+from pathlib import Path
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from cardetailing.db import database_profile, replica_aliases, sqlite_pragmas, uses_wal
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    base_dir = Path("/srv/app")
+
+    def test_sqlite_is_default_with_persistent_connections(self):
+        default = database_profile(self.base_dir, {})["default"]
+        self.assertEqual(default["ENGINE"], "django.db.backends.sqlite3")
+        self.assertEqual(default["NAME"], self.base_dir / "db.sqlite3")
+        self.assertEqual(default["CONN_MAX_AGE"], 60)
+
+    def test_postgres_profile_reads_environment(self):
+        default = database_profile(
+            self.base_dir,
+            {
+                "DJANGO_DB_ENGINE": "postgres",
+                "DJANGO_DB_HOST": "db.internal",
+                "DJANGO_DB_CONN_MAX_AGE": "120",
+            },
+        )["default"]
+        self.assertEqual(default["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual((default["HOST"], default["PORT"]), ("db.internal", "5432"))
+        self.assertEqual(default["CONN_MAX_AGE"], 120)
+        self.assertNotIn("DISABLE_SERVER_SIDE_CURSORS", default)
+
+    def test_pooled_profile_targets_pooler(self):
+        default = database_profile(
+            self.base_dir, {"DJANGO_DB_ENGINE": "postgres", "DJANGO_DB_POOL": "1"}
+        )["default"]
+        self.assertEqual(default["PORT"], "6432")
+        self.assertTrue(default["DISABLE_SERVER_SIDE_CURSORS"])
+
+    def test_sqlite_replicas_are_files_next_to_the_primary(self):
+        databases = database_profile(
+            self.base_dir, {"DJANGO_DB_REPLICAS": "replica-a.sqlite3, /data/b.sqlite3"}
+        )
+        self.assertEqual(list(databases), ["default", "replica_1", "replica_2"])
+        self.assertEqual(databases["replica_1"]["NAME"], self.base_dir / "replica-a.sqlite3")
+        self.assertEqual(databases["replica_2"]["NAME"], Path("/data/b.sqlite3"))
+        self.assertEqual(databases["replica_1"]["TEST"], {"MIRROR": "default"})
+        self.assertEqual(replica_aliases(databases), ["replica_1", "replica_2"])
+
+    def test_project_databases_keep_their_journal_in_development(self):
+        base_dir = self.base_dir
+        self.assertFalse(uses_wal(base_dir / "db.sqlite3", base_dir, debug=True))
+        self.assertTrue(uses_wal(Path("/data/db.sqlite3"), base_dir, debug=True))
+        self.assertTrue(uses_wal(base_dir / "db.sqlite3", base_dir, debug=False))
+
+    def test_postgres_replicas_are_hosts(self):
+        databases = database_profile(
+            self.base_dir,
+            {
+                "DJANGO_DB_ENGINE": "postgres",
+                "DJANGO_DB_REPLICAS": "replica.internal,10.0.0.7:5433",
+            },
+        )
+        first, second = databases["replica_1"], databases["replica_2"]
+        self.assertEqual((first["HOST"], first["PORT"]), ("replica.internal", "5432"))
+        self.assertEqual((second["HOST"], second["PORT"]), ("10.0.0.7", "5433"))
+        self.assertEqual(first["NAME"], databases["default"]["NAME"])
+        self.assertEqual(replica_aliases(database_profile(self.base_dir, {})), [])
+
+
+class SqlitePragmaTests(TestCase):
+    def _pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        self.assertEqual(self._pragma("journal_mode"), "wal")
+        self.assertEqual(self._pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self._pragma("busy_timeout"), 5000)
+        self.assertEqual(self._pragma("cache_size"), -20000)
+
+    def test_one_setting_for_the_lock_wait(self):
+        environ = {"DJANGO_SQLITE_TIMEOUT": "12.5"}
+        databases = database_profile(Path("/srv/app"), environ)
+        self.assertEqual(databases["default"]["OPTIONS"]["timeout"], 12.5)
+        self.assertEqual(sqlite_pragmas(environ)["busy_timeout"], 12500)
+        self.assertEqual(
+            self._pragma("busy_timeout"),
+            round(connection.settings_dict["OPTIONS"]["timeout"] * 1000),
+        )
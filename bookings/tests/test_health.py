@@ -0,0 +1,70 @@
+# bookings/tests/test_health.py
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from bookings import readiness
+
+
+class HealthShortCircuitTests(TestCase):
+    def setUp(self) -> None:
+        self.client = Client()
+
+    def test_probe_answered_without_touching_database(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("health"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "ok"})
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+
+    def test_probe_skips_session_and_csrf_middleware(self):
+        """Nothing past HealthCheckMiddleware runs on the request."""
+        request = self.client.get(reverse("health")).wsgi_request
+        self.assertFalse(hasattr(request, "session"))
+        self.assertFalse(hasattr(request, "user"))
+        self.assertIsNone(request.resolver_match)
+
+    def test_other_methods_fall_through_to_view(self):
+        self.assertEqual(self.client.post(reverse("health")).status_code, 405)
+
+
+class ReadinessTests(TestCase):
+    def setUp(self) -> None:
+        self.client = Client()
+        readiness.reset()
+        self.addCleanup(readiness.reset)
+
+    def test_ready_reports_each_check(self):
+        response = self.client.get(reverse("ready"))
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertTrue(body["ready"])
+        self.assertEqual(set(body["checks"]), {"database", "migrations", "cache"})
+        self.assertEqual(body["checks"]["migrations"]["pending"], 0)
+
+    def test_result_is_reused_between_probes(self):
+        self.client.get(reverse("ready"))
+        with mock.patch.object(readiness, "run_checks") as run_checks:
+            self.client.get(reverse("ready"))
+        run_checks.assert_not_called()
+
+    def test_database_failure_is_not_ready(self):
+        failing = mock.patch.dict(
+            readiness.CHECKS, {"database": mock.Mock(side_effect=DatabaseError)}
+        )
+        with failing:
+            response = self.client.get(reverse("ready"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response.json()["checks"]["database"], {"ok": False, "error": "DatabaseError"}
+        )
+
+    def test_pending_migrations_are_not_ready(self):
+        with mock.patch.object(
+            readiness.MigrationExecutor, "migration_plan", return_value=[("m", False)]
+        ):
+            response = self.client.get(reverse("ready"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["checks"]["migrations"]["pending"], 1)
@@ -0,0 +1,89 @@
+# bookings/tests/test_metrics.py
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from bookings.metrics import Registry, registry
+from bookings.models import Booking, TimeSlot
+from bookings.testing import QueryBudgetMixin
+
+
+class RegistryTests(TestCase):
+    def test_quantiles_come_from_rolling_window(self):
+        stats = Registry(window=100)
+        for value in range(1, 201):
+            stats.observe("booking_list", value / 1000, 3, 0.001, 0.002)
+        text = stats.render_prometheus()
+        # Only the last 100 samples (101..200 ms) are in the window
+        self.assertIn(
+            'cardetailing_request_duration_seconds{view="booking_list",quantile="0.5"} 0.151',
+            text,
+        )
+        self.assertIn(
+            'cardetailing_request_duration_seconds_count{view="booking_list"} 200', text
+        )
+        self.assertIn("# TYPE cardetailing_db_queries summary", text)
+
+
+class PerformanceMetricsMiddlewareTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="normal_user", password="secret123")
+        cls.staff = User.objects.create_user(
+            username="staff_user", password="secret123", is_staff=True
+        )
+        slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING"
+        )
+        cls.booking = Booking.objects.create(
+            user=cls.user,
+            customer_name="Jane",
+            email="jane@example.com",
+            phone="0851234567",
+            car_model="Golf",
+            service_type="Full Detailing",
+            preferred_date=date.today() + timedelta(days=1),
+            preferred_time_slot=slot,
+        )
+
+    def setUp(self):
+        self.client = Client()
+        registry.reset()
+
+    def test_records_queries_and_template_time_per_view(self):
+        self.client.login(username="normal_user", password="secret123")
+        self.client.get(reverse("booking_list"))
+        last = registry.last("booking_list")
+        self.assertEqual(last["queries"], 3)
+        self.assertGreater(last["template"], 0)
+        self.assertGreaterEqual(last["duration"], last["template"])
+
+    def test_views_stay_within_query_budgets(self):
+        self.client.login(username="normal_user", password="secret123")
+        self.client.get(reverse("booking_list"))
+        self.client.get(reverse("create_booking"))
+        self.client.get(reverse("edit_booking", args=[self.booking.pk]))
+        self.client.get(reverse("delete_booking", args=[self.booking.pk]))
+        for view in ("booking_list", "create_booking", "edit_booking", "delete_booking"):
+            self.assertQueryBudget(view)
+
+    @override_settings(PERF_METRICS_TOKEN="scrape-me")
+    def test_scrape_endpoint_requires_token_or_staff(self):
+        self.client.get(reverse("root_redirect"))
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer scrape-me")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('view="root_redirect"', response.content.decode())
+
+        self.client.login(username="staff_user", password="secret123")
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_server_timing_header_behind_flag(self):
+        self.assertNotIn("Server-Timing", self.client.get(reverse("login")))
+        with self.settings(PERF_SERVER_TIMING=True):
+            response = self.client.get(reverse("login"))
+        self.assertRegex(response["Server-Timing"], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=')
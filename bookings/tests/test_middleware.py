@@ -1,6 +1,10 @@
 # bookings/tests/test_middleware.py
-from django.http import HttpResponse
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import HttpResponse, JsonResponse
 from django.test import RequestFactory, SimpleTestCase
+from django.urls import ResolverMatch
 
 from bookings.middleware import SecurityHeadersMiddleware
 
@@ -34,3 +38,59 @@ class SecurityHeadersMiddlewareTests(SimpleTestCase):
         csp = response["Content-Security-Policy"]
         self.assertIn("default-src 'self'", csp)
         self.assertIn("style-src 'self' https://cdn.jsdelivr.net", csp)
+
+
+class SecurityHeaderPolicyTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.factory = RequestFactory()
+
+    def _run(self, response, url_name=None, get_response=None):
+        request = self.factory.get("/")
+        if url_name:
+            request.resolver_match = ResolverMatch(lambda r: None, (), {}, url_name=url_name)
+        middleware = SecurityHeadersMiddleware(get_response or (lambda _r: response))
+        return middleware(request)
+
+    def test_json_responses_get_api_policy(self):
+        response = self._run(JsonResponse({"ok": True}))
+        self.assertEqual(
+            response["Content-Security-Policy"], "default-src 'none'; frame-ancestors 'none'"
+        )
+        self.assertNotIn("Permissions-Policy", response)
+
+    def test_health_route_gets_minimal_policy(self):
+        response = self._run(JsonResponse({"status": "ok"}), url_name="health")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertNotIn("Content-Security-Policy", response)
+
+    def test_view_headers_are_not_overwritten(self):
+        view_response = HttpResponse("OK")
+        view_response["X-Frame-Options"] = "SAMEORIGIN"
+        self.assertEqual(self._run(view_response)["X-Frame-Options"], "SAMEORIGIN")
+
+    def test_nonce_added_only_when_used(self):
+        csp = {"default-src": ["'self'"], "script-src": ["'self'", "'nonce-{nonce}'"]}
+        policies = {"default": {"headers": {}, "csp": csp}}
+        with self.settings(
+            SECURITY_HEADER_POLICIES=policies,
+            SECURITY_HEADER_ROUTES={},
+            SECURITY_HEADER_CONTENT_TYPES={},
+        ):
+            unused = self._run(HttpResponse("OK"))
+            seen = {}
+
+            def view(request):
+                seen["nonce"] = str(request.csp_nonce)
+                return HttpResponse("<script nonce='%s'></script>" % seen["nonce"])
+
+            used = self._run(None, get_response=view)
+
+        self.assertEqual(unused["Content-Security-Policy"], "default-src 'self'; script-src 'self'")
+        self.assertEqual(
+            used["Content-Security-Policy"],
+            f"default-src 'self'; script-src 'self' 'nonce-{seen['nonce']}'",
+        )
+
+    def test_nginx_static_conf_matches_policy(self):
+        """The checked-in nginx snippet must be regenerated after policy edits."""
+        call_command("render_nginx_conf", check=True, stdout=StringIO())
@@ -0,0 +1,139 @@
+# bookings/tests/test_outbox.py
+import time as clock
+from datetime import date, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings import slot_cache
+from bookings.dispatcher import OutboxDispatcher
+from bookings.models import Booking, OutboxMessage, TimeSlot
+
+LOCMEM = "django.core.mail.backends.locmem.EmailBackend"
+
+
+class FlakyBackend(LocmemBackend):
+    # Fails for one address so retries can be observed
+    def send_messages(self, messages):
+        if any("bounce@" in address for m in messages for address in m.to):
+            raise ConnectionError("mail server refused")
+        return super().send_messages(messages)
+
+
+class SlowBackend(LocmemBackend):
+    def send_messages(self, messages):
+        clock.sleep(0.5)
+        return super().send_messages(messages)
+
+
+def booking_data(slot, email="jane@example.com"):
+    return {
+        "customer_name": "Jane Doe",
+        "email": email,
+        "phone": "0851234567",
+        "car_model": "Golf",
+        "service_type": "Full Detailing",
+        "preferred_date": (date.today() + timedelta(days=1)).isoformat(),
+        "preferred_time_slot": slot.pk,
+        "notes": "",
+    }
+
+
+class OutboxTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="normal_user", password="secret123")
+        cls.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING"
+        )
+
+    def setUp(self):
+        slot_cache.invalidate()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def _book(self, email="jane@example.com"):
+        return self.client.post(
+            reverse("create_booking_submit"), booking_data(self.slot, email)
+        )
+
+
+@override_settings(EMAIL_BACKEND=f"{SlowBackend.__module__}.SlowBackend")
+class OutboxWriteTests(OutboxTestCase):
+    def test_booking_queues_email_instead_of_sending(self):
+        started = clock.perf_counter()
+        response = self._book()
+        elapsed = clock.perf_counter() - started
+
+        self.assertEqual(response.status_code, 302)
+        # The (slow) email backend was never touched by the request
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(mail.outbox, [])
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.payload["email"], "jane@example.com")
+        self.assertEqual(message.status, OutboxMessage.PENDING)
+
+    def test_failed_booking_queues_nothing(self):
+        self.slot.capacity = 0
+        self.slot.save()
+        self._book()
+        self.assertFalse(OutboxMessage.objects.exists())
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM)
+class DispatcherTests(OutboxTestCase):
+    async def test_drain_sends_and_marks_messages(self):
+        await self._async_book()
+        await self._async_book()
+
+        handled = await OutboxDispatcher(batch_size=1, concurrency=2).drain()
+
+        self.assertEqual(handled, 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn("Booking confirmed", mail.outbox[0].subject)
+        self.assertEqual(mail.outbox[0].to, ["jane@example.com"])
+        statuses = await self._statuses()
+        self.assertEqual(statuses, [OutboxMessage.SENT, OutboxMessage.SENT])
+
+    async def test_failures_are_retried_with_backoff_then_given_up(self):
+        await self._async_book("bounce@example.com")
+        dispatcher = OutboxDispatcher(
+            max_attempts=2, backoff=60, backend=f"{FlakyBackend.__module__}.FlakyBackend"
+        )
+
+        await dispatcher.drain()
+        message = await self._only_message()
+        self.assertEqual((message.status, message.attempts), (OutboxMessage.PENDING, 1))
+        self.assertGreater(message.available_at, timezone.now())
+        self.assertIn("refused", message.last_error)
+
+        # Not due yet: nothing happens
+        self.assertEqual(await dispatcher.drain(), 0)
+
+        await self._make_due()
+        await dispatcher.drain()
+        message = await self._only_message()
+        self.assertEqual((message.status, message.attempts), (OutboxMessage.FAILED, 2))
+
+    # Django 3.2 has no async ORM; these run the sync calls in the test thread
+
+    async def _async_book(self, email="jane@example.com"):
+        await sync_to_async(self._book)(email)
+
+    async def _statuses(self):
+        return await sync_to_async(
+            lambda: list(OutboxMessage.objects.order_by("pk").values_list("status", flat=True))
+        )()
+
+    async def _only_message(self):
+        return await sync_to_async(OutboxMessage.objects.get)()
+
+    async def _make_due(self):
+        await sync_to_async(
+            lambda: OutboxMessage.objects.update(available_at=timezone.now())
+        )()
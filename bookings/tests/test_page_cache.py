@@ -0,0 +1,171 @@
+# bookings/tests/test_page_cache.py
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from bookings import bulk, page_cache
+from bookings.cache import tiered
+from bookings.models import Booking, TimeSlot
+
+
+class BookingListCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(username="customer", password="secret123")
+        cls.other = User.objects.create_user(username="other", password="secret123")
+        cls.staff = User.objects.create_user(
+            username="staff", password="secret123", is_staff=True
+        )
+        cls.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING", capacity=10
+        )
+        cls.day = date.today() + timedelta(days=2)
+        cls.bookings = [cls._booking(cls.customer, f"Car {i}") for i in range(3)]
+        cls.others = cls._booking(cls.other, "Other car")
+
+    @classmethod
+    def _booking(cls, user, car_model):
+        return Booking.objects.create(
+            user=user,
+            customer_name=user.username,
+            email="jane@example.com",
+            phone="0851234567",
+            car_model=car_model,
+            service_type="Full Detailing",
+            preferred_date=cls.day,
+            preferred_time_slot=cls.slot,
+        )
+
+    def setUp(self):
+        page_cache.invalidate_all()
+        self.client = Client()
+        self.client.force_login(self.customer)
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def _list(self, client=None):
+        response = (client or self.client).get(reverse("booking_list"))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def _form_data(self, booking, **changes):
+        data = {
+            "customer_name": booking.customer_name,
+            "email": booking.email,
+            "phone": booking.phone,
+            "car_model": booking.car_model,
+            "service_type": booking.service_type,
+            "preferred_date": booking.preferred_date.isoformat(),
+            "preferred_time_slot": booking.preferred_time_slot_id,
+            "notes": booking.notes,
+        }
+        data.update(changes)
+        return data
+
+    def _scope_versions(self):
+        return {
+            scope: tiered.version(f"{page_cache.PAGES_NAMESPACE}:{scope}")
+            for scope in ("staff", f"user:{self.customer.pk}", f"user:{self.other.pk}")
+        }
+
+    def test_warm_page_skips_the_bookings_query(self):
+        with self.assertNumQueries(3):
+            first = self._list()
+        # User only; the session is cached too
+        with self.assertNumQueries(1):
+            second = self._list()
+        self.assertEqual(first.content, second.content)
+        self.assertContains(second, "Car 0")
+        self.assertNotContains(second, "Other car")
+
+    def test_staff_and_customers_have_separate_pages(self):
+        self._list()
+        self.assertContains(self._list(self.staff_client), "Other car")
+        self.assertNotContains(self._list(), "Other car")
+
+    def test_edit_is_served_on_the_next_request(self):
+        self._list()
+        self._list(self.staff_client)
+        booking = self.bookings[0]
+        response = self.client.post(
+            reverse("edit_booking_submit", args=[booking.pk]),
+            self._form_data(booking, notes="Fresh wax please"),
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertContains(self._list(), "Fresh wax please")
+        self.assertContains(self._list(self.staff_client), "Fresh wax please")
+
+    def test_edit_purges_only_the_affected_scopes(self):
+        before = self._scope_versions()
+        booking = self.bookings[0]
+        self.client.post(
+            reverse("edit_booking_submit", args=[booking.pk]),
+            self._form_data(booking, car_model="Polo"),
+        )
+        after = self._scope_versions()
+        self.assertNotEqual(after["staff"], before["staff"])
+        self.assertNotEqual(
+            after[f"user:{self.customer.pk}"], before[f"user:{self.customer.pk}"]
+        )
+        self.assertEqual(after[f"user:{self.other.pk}"], before[f"user:{self.other.pk}"])
+
+    def test_edit_rerenders_only_the_changed_row(self):
+        cold = self._list()
+        rows = [t.name for t in cold.templates].count(page_cache.ROW_TEMPLATE)
+        self.assertEqual(rows, 3)
+
+        booking = self.bookings[1]
+        self.client.post(
+            reverse("edit_booking_submit", args=[booking.pk]),
+            self._form_data(booking, car_model="Polo"),
+        )
+        warm = self._list()
+        rows = [t.name for t in warm.templates].count(page_cache.ROW_TEMPLATE)
+        self.assertEqual(rows, 1)
+        self.assertContains(warm, "Polo")
+
+    def test_delete_is_served_on_the_next_request(self):
+        self._list()
+        booking = self.bookings[2]
+        response = self.client.post(reverse("delete_booking_confirm", args=[booking.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertNotContains(self._list(), "Car 2")
+
+    def test_create_is_served_on_the_next_request(self):
+        self._list()
+        self._list(self.staff_client)
+        booking = Booking(
+            customer_name="customer",
+            email="jane@example.com",
+            phone="0851234567",
+            car_model="Brand new car",
+            service_type="Full Detailing",
+            preferred_date=self.day,
+            preferred_time_slot=self.slot,
+        )
+        self.client.post(reverse("create_booking_submit"), self._form_data(booking))
+        self.assertContains(self._list(), "Brand new car")
+        self.assertContains(self._list(self.staff_client), "Brand new car")
+
+    def test_reassigned_booking_leaves_the_old_owners_page(self):
+        self._list()
+        booking = Booking.objects.get(pk=self.bookings[0].pk)
+        booking.user = self.other
+        booking.save()
+        self.assertNotContains(self._list(), "Car 0")
+
+    def test_time_slot_change_rerenders_rows(self):
+        self.assertContains(self._list(), "10:00 AM")
+        self.slot.end_time = time(11, 30)
+        self.slot.save()
+        self.assertContains(self._list(), "11:30 AM")
+
+    def test_bulk_import_is_served_on_the_next_request(self):
+        self._list()
+        row = self._form_data(self.bookings[0], car_model="Imported car")
+        row["preferred_time_slot"] = self.slot.slot
+        result = bulk.import_bookings([(2, row)], self.customer)
+        self.assertEqual(result.created, 1)
+        self.assertContains(self._list(), "Imported car")
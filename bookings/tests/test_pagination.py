@@ -0,0 +1,98 @@
+# bookings/tests/test_pagination.py
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from bookings import page_cache
+from bookings.models import Booking, TimeSlot
+from bookings.pagination import decode_cursor, encode_cursor
+
+
+class CursorTokenTests(TestCase):
+    def test_cursor_round_trip(self):
+        token = encode_cursor(date(2030, 1, 2), time(9, 30), 42)
+        self.assertEqual(decode_cursor(token), (date(2030, 1, 2), time(9, 30), 42))
+
+    def test_garbage_cursor_is_ignored(self):
+        self.assertIsNone(decode_cursor("not-a-cursor"))
+        self.assertIsNone(decode_cursor(""))
+
+
+@override_settings(BOOKINGS_PAGE_SIZE=10)
+class BookingListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(
+            username="staff_user", password="secret123", is_staff=True
+        )
+        cls.customer = User.objects.create_user(
+            username="normal_user", password="secret123"
+        )
+        slots = [
+            TimeSlot.objects.create(
+                start_time=time(hour, 0), end_time=time(hour + 1, 0), slot=f"S{hour}"
+            )
+            for hour in (9, 11, 14)
+        ]
+        start = date.today() + timedelta(days=1)
+        Booking.objects.bulk_create(
+            Booking(
+                user=cls.customer if i % 2 else cls.staff,
+                customer_name=f"Customer {i}",
+                email="c@example.com",
+                phone="0851234567",
+                car_model="Golf",
+                service_type="Full Detailing",
+                preferred_date=start + timedelta(days=i % 7),
+                preferred_time_slot=slots[i % 3],
+                preferred_start_time=slots[i % 3].start_time,
+            )
+            for i in range(45)
+        )
+        # bulk_create() sends no signals
+        page_cache.invalidate_all()
+
+    def _walk(self, username):
+        self.client.login(username=username, password="secret123")
+        seen, cursor = [], None
+        while True:
+            params = {"cursor": cursor} if cursor else {}
+            response = self.client.get(reverse("booking_list"), params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(b.pk for b in response.context["bookings"])
+            page = response.context["page"]
+            if not page.has_next:
+                return seen
+            cursor = page.next_cursor
+
+    def test_pages_cover_every_booking_once_in_order(self):
+        expected = list(
+            Booking.objects.order_by(
+                "-preferred_date", "-preferred_time_slot__start_time", "-id"
+            ).values_list("pk", flat=True)
+        )
+        self.assertEqual(self._walk("staff_user"), expected)
+
+    def test_customer_only_pages_through_own_bookings(self):
+        own = set(
+            Booking.objects.filter(user=self.customer).values_list("pk", flat=True)
+        )
+        seen = self._walk("normal_user")
+        self.assertEqual(len(seen), len(own))
+        self.assertEqual(set(seen), own)
+
+    def test_query_count_is_constant_per_page(self):
+        """User + one bookings query per page, plus the session on the first request."""
+        page_cache.invalidate_all()
+        self.client.login(username="staff_user", password="secret123")
+        url = reverse("booking_list")
+        with self.assertNumQueries(3):
+            first = self.client.get(url)
+        # The session now comes from the worker's session cache
+        with self.assertNumQueries(2):
+            self.client.get(url, {"cursor": first.context["page"].next_cursor})
+        # Served from the page cache: no bookings query at all
+        with self.assertNumQueries(1):
+            self.client.get(url)
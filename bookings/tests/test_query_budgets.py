@@ -0,0 +1,43 @@
+# bookings/tests/test_query_budgets.py
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+
+from bookings import slot_cache
+from bookings.testing import (
+    QUERY_BUDGETS,
+    ROUTE_REQUESTS,
+    RouteExerciser,
+    project_route_names,
+    seed_route_fixtures,
+)
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class QueryBudgetTests(TestCase):
+    """Every route stays within its query budget, whatever the data volume."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with override_settings(PASSWORD_HASHERS=FAST_HASHERS):
+            make_password("warm-up")
+            cls.fixtures = seed_route_fixtures(users=20, bookings=300, slots=8)
+
+    def setUp(self):
+        slot_cache.invalidate()
+        self.exerciser = RouteExerciser(self.fixtures)
+
+    def test_every_route_has_a_request_and_budget(self):
+        exercised = {spec.url_name for spec in ROUTE_REQUESTS.values()}
+        self.assertLessEqual(project_route_names(), exercised)
+        self.assertLessEqual(exercised, set(QUERY_BUDGETS))
+
+    def test_routes_stay_within_budget(self):
+        for label, spec in ROUTE_REQUESTS.items():
+            with self.subTest(route=label):
+                # Second call is steady state (warm caches, counters exist)
+                self.exerciser.call(label)
+                status, queries, _elapsed = self.exerciser.call(label)
+                self.assertLess(status, 400)
+                self.assertLessEqual(queries, QUERY_BUDGETS[spec.url_name])
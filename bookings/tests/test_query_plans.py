@@ -0,0 +1,58 @@
+# bookings/tests/test_query_plans.py
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from bookings import query_plans
+from bookings.models import Booking
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command("check_query_plans", stdout=out)
+        self.assertNotIn("FAIL", out.getvalue())
+
+    def test_unindexed_sort_is_reported(self):
+        bad = query_plans.HotQuery(
+            "by notes", lambda: Booking.objects.filter(user_id=1).order_by("notes")
+        )
+        [(_, _, problems)] = query_plans.check([bad])
+        self.assertTrue(any("sort" in problem for problem in problems))
+
+    def test_full_scan_is_reported_unless_allowed(self):
+        build = lambda: Booking.objects.filter(notes="x")
+        [(_, _, problems)] = query_plans.check([query_plans.HotQuery("scan", build)])
+        self.assertTrue(any("full scan" in problem for problem in problems))
+
+        allowed = query_plans.HotQuery("scan", build, full_scan=["bookings_booking"])
+        [(_, _, problems)] = query_plans.check([allowed])
+        self.assertEqual(problems, [])
+
+    def test_command_fails_on_a_bad_plan(self):
+        bad = query_plans.HotQuery("by notes", lambda: Booking.objects.order_by("notes"))
+        original = query_plans.HOT_QUERIES
+        query_plans.HOT_QUERIES = [bad]
+        try:
+            with self.assertRaises(CommandError):
+                call_command("check_query_plans", stdout=StringIO())
+        finally:
+            query_plans.HOT_QUERIES = original
+
+    def test_postgres_plan_lines(self):
+        lines = [
+            "Limit  (cost=0.42..8.44 rows=26 width=64)",
+            "  ->  Sort  (cost=0.42..8.44 rows=26 width=64)",
+            "        ->  Seq Scan on bookings_booking  (cost=0.00..1.00 rows=1 width=64)",
+        ]
+        problems = query_plans.problems(lines, "postgresql")
+        self.assertEqual(len(problems), 2)
+        self.assertEqual(
+            query_plans.problems(
+                ["Index Scan using booking_date_start_idx on bookings_booking"],
+                "postgresql",
+            ),
+            [],
+        )
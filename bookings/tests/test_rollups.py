@@ -0,0 +1,213 @@
+# bookings/tests/test_rollups.py
+import threading
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from bookings import rollups, services
+from bookings.forms import BookingForm
+from bookings.models import Bay, Booking, BookingRollup, TimeSlot
+from bookings.testing import QUERY_BUDGETS
+
+
+def booking_data(slot, day, **extra):
+    data = {
+        "customer_name": "Jane Doe",
+        "email": "jane@example.com",
+        "phone": "0851234567",
+        "car_model": "Golf",
+        "service_type": "Full Detailing",
+        "preferred_date": day.isoformat(),
+        "preferred_time_slot": slot.pk,
+        "notes": "",
+    }
+    data.update(extra)
+    return data
+
+
+class RollupMaintenanceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="normal_user", password="secret123")
+        cls.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING"
+        )
+        cls.other = TimeSlot.objects.create(
+            start_time=time(14, 0), end_time=time(15, 0), slot="AFTERNOON"
+        )
+        cls.day = date.today() + timedelta(days=3)
+
+    def _create(self, **extra):
+        form = BookingForm(data=booking_data(self.slot, self.day, **extra))
+        self.assertTrue(form.is_valid(), form.errors)
+        return services.create_booking(form, self.user)
+
+    def _row(self, slot, day, service="Full Detailing"):
+        return BookingRollup.objects.get(time_slot=slot, date=day, service_type=service)
+
+    def test_create_counts_booking_minutes_and_lead_time(self):
+        self._create()
+        self._create()
+        row = self._row(self.slot, self.day)
+        self.assertEqual((row.bookings, row.booked_minutes, row.lead_days), (2, 360, 6))
+        self.assertEqual(rollups.check(), [])
+
+    def test_edit_moves_the_booking_between_rows(self):
+        booking = self._create()
+        later = self.day + timedelta(days=2)
+        form = BookingForm(
+            data=booking_data(self.other, later, service_type="Interior Detailing"),
+            instance=booking,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        services.update_booking(form)
+
+        self.assertEqual(self._row(self.slot, self.day).bookings, 0)
+        moved = self._row(self.other, later, "Interior Detailing")
+        self.assertEqual((moved.bookings, moved.booked_minutes, moved.lead_days), (1, 90, 5))
+        self.assertEqual(rollups.check(), [])
+
+    def test_edit_of_a_partly_loaded_booking(self):
+        # The edit view loads only some columns; the rollup still sees the
+        # row's previous values
+        pk = self._create().pk
+        booking = Booking.objects.only("preferred_date", "preferred_time_slot").get(pk=pk)
+        booking.service_type = "Ceramic Coating"
+        booking.save()
+        self.assertEqual(rollups.check(), [])
+        self.assertEqual(self._row(self.slot, self.day, "Ceramic Coating").bookings, 1)
+
+    def test_delete_and_bulk_import(self):
+        booking = self._create()
+        services.delete_booking(booking)
+        rows = [
+            {
+                "preferred_date": self.day,
+                "preferred_time_slot": slot,
+                "service_type": "Exterior Detailing",
+                **{k: "x" for k in ("customer_name", "phone", "car_model", "notes")},
+                "email": "jane@example.com",
+            }
+            for slot in (self.slot, self.slot, self.other)
+        ]
+        created, _ = services.bulk_create_bookings(self.user, rows)
+        self.assertEqual(len(created), 3)
+        self.assertEqual(self._row(self.slot, self.day, "Exterior Detailing").bookings, 2)
+        self.assertEqual(rollups.check(), [])
+
+    def test_check_reports_drift_and_rebuild_repairs_it(self):
+        self._create()
+        BookingRollup.objects.update(bookings=5)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_rollups", "--check", stdout=StringIO())
+
+        out = StringIO()
+        call_command("rebuild_rollups", stdout=out)
+        self.assertIn("Rebuilt 1 rollup rows", out.getvalue())
+        self.assertEqual(rollups.check(), [])
+
+
+class ConcurrentRebuildTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="normal_user", password="secret123")
+        self.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING"
+        )
+        self.day = date.today() + timedelta(days=3)
+
+    def _create(self):
+        try:
+            form = BookingForm(data=booking_data(self.slot, self.day))
+            assert form.is_valid(), form.errors
+            services.create_booking(form, self.user)
+        finally:
+            connection.close()
+
+    def test_booking_written_during_a_rebuild_is_kept(self):
+        self._create()
+        recompute = rollups.recompute
+        writer = threading.Thread(target=self._create)
+
+        def booking_arrives():
+            totals = recompute()
+            # A booking submitted after the recompute has to wait for the
+            # rebuild, or its rollup move would be overwritten
+            writer.start()
+            writer.join(0.5)
+            self.assertTrue(writer.is_alive())
+            return totals
+
+        with mock.patch.object(rollups, "recompute", booking_arrives):
+            rollups.rebuild()
+        writer.join()
+        self.assertEqual(Booking.objects.count(), 2)
+        self.assertEqual(rollups.check(), [])
+
+
+class AnalyticsReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(
+            username="staff", password="secret123", is_staff=True
+        )
+        cls.customer = User.objects.create_user(username="customer", password="secret123")
+        cls.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING", capacity=4
+        )
+        # One bay open 10 hours: 600 minutes a day
+        Bay.objects.create(name="Bay 1")
+        cls.day = date.today() + timedelta(days=10)
+        for service in ("Full Detailing", "Full Detailing", "Exterior Detailing"):
+            form = BookingForm(data=booking_data(cls.slot, cls.day, service_type=service))
+            form.is_valid()
+            services.create_booking(form, cls.customer)
+
+    def test_report_figures(self):
+        report = rollups.report(self.day, self.day)
+        self.assertEqual(report["totals"]["bookings"], 3)
+        self.assertEqual(report["totals"]["avg_lead_days"], 10)
+
+        [day] = report["by_day"]
+        self.assertEqual(day["booked_minutes"], 180 * 2 + 60)
+        self.assertAlmostEqual(day["bay_utilization"], 420 / 600)
+
+        shares = {row["service_type"]: row["share"] for row in report["by_service"]}
+        self.assertAlmostEqual(shares["Full Detailing"], 2 / 3)
+
+        [slot] = report["by_slot"]
+        self.assertEqual(slot["time_slot"], self.slot)
+        self.assertAlmostEqual(slot["seat_utilization"], 3 / 4)
+
+    def test_empty_range(self):
+        report = rollups.report(self.day + timedelta(days=1), self.day + timedelta(days=5))
+        self.assertEqual(report["totals"]["bookings"], 0)
+        self.assertEqual(report["by_day"], [])
+
+    def test_view_is_for_staff(self):
+        client = Client()
+        client.force_login(self.customer)
+        self.assertEqual(client.get(reverse("analytics")).status_code, 403)
+
+    def test_view_renders_the_report(self):
+        client = Client()
+        client.force_login(self.staff)
+        url = reverse("analytics")
+        with self.assertNumQueries(QUERY_BUDGETS["analytics"]):
+            response = client.get(url, {"end": self.day.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["report"]["totals"]["bookings"], 3)
+        self.assertContains(response, "Exterior Detailing")
+
+        for params in (
+            {"start": "soon"},
+            {"start": "2030-01-02", "end": "2030-01-01"},
+            {"start": "2030-01-01", "end": "2033-01-01"},
+        ):
+            self.assertEqual(client.get(url, params).status_code, 400)
@@ -0,0 +1,180 @@
+# bookings/tests/test_routing.py
+import json
+import shutil
+import tempfile
+import time
+from datetime import date, time as clock, timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache.backends.db import DatabaseCache
+from django.db import connections, transaction
+from django.test import (
+    Client,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from bookings import routing
+from bookings.cache import tiered
+from bookings.models import Booking, ThrottleCounter, TimeSlot
+from cardetailing.db import copy_sqlite
+
+REPLICA = "replica_1"
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routing.ReplicaRouter()
+
+    def test_outside_a_request_reads_use_the_default(self):
+        self.assertIsNone(self.router.db_for_read(Booking))
+
+    def test_request_reads_go_to_its_replica_until_it_writes(self):
+        with routing.request_reads(REPLICA) as reads:
+            self.assertEqual(self.router.db_for_read(Booking), REPLICA)
+            self.assertEqual(self.router.db_for_write(Booking), "default")
+            self.assertTrue(reads.wrote)
+            self.assertIsNone(self.router.db_for_read(Booking))
+
+    def test_cache_and_throttle_writes_do_not_pin(self):
+        cache_entry = DatabaseCache("cache_table", {}).cache_model_class
+        with routing.request_reads(REPLICA) as reads:
+            for model in (cache_entry, ThrottleCounter):
+                self.assertEqual(self.router.db_for_write(model), "default")
+            self.assertFalse(reads.wrote)
+            self.assertEqual(self.router.db_for_read(Booking), REPLICA)
+
+    def test_use_primary_and_transactions_read_the_primary(self):
+        with routing.request_reads(REPLICA):
+            with routing.use_primary():
+                self.assertIsNone(self.router.db_for_read(Booking))
+            self.assertEqual(self.router.db_for_read(Booking), REPLICA)
+            primary = transaction.get_connection("default")
+            primary.in_atomic_block = True
+            try:
+                self.assertIsNone(self.router.db_for_read(Booking))
+            finally:
+                primary.in_atomic_block = False
+
+    def test_replicas_are_not_migrated(self):
+        self.assertTrue(self.router.allow_migrate("default", "bookings"))
+        self.assertFalse(self.router.allow_migrate(REPLICA, "bookings"))
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_PIN_SECONDS=5)
+class ReadYourWritesTests(TransactionTestCase):
+    # A real second SQLite file that only changes when sync() copies the
+    # primary over it, i.e. a replica lagging until the next sync. Added
+    # after the test runner has set up its databases, which must not create
+    # or flush it.
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.replica_dir = tempfile.mkdtemp()
+        settings_dict = dict(connections.settings["default"])
+        settings_dict.update(NAME=str(Path(cls.replica_dir) / "replica.sqlite3"), TEST={})
+        connections.settings[REPLICA] = settings_dict
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        shutil.rmtree(cls.replica_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        tiered.local.clear()
+        self.customer = User.objects.create_user(username="customer", password="secret123")
+        self.staff = User.objects.create_user(
+            username="staff", password="secret123", is_staff=True
+        )
+        self.slot = TimeSlot.objects.create(
+            start_time=clock(9, 0), end_time=clock(10, 0), slot="MORNING"
+        )
+        self.day = date.today() + timedelta(days=3)
+        self.customer_client = self._client(self.customer)
+        self.staff_client = self._client(self.staff)
+        self.sync()
+
+    def _client(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def sync(self):
+        connections[REPLICA].close()
+        copy_sqlite(
+            connections["default"].settings_dict["NAME"],
+            connections[REPLICA].settings_dict["NAME"],
+        )
+
+    def _api_names(self, client):
+        response = client.get(reverse("api_bookings"), {"fields": "customer_name"})
+        self.assertEqual(response.status_code, 200)
+        rows = json.loads(b"".join(response.streaming_content))["results"]
+        return [row["customer_name"] for row in rows]
+
+    def _create(self, client, name):
+        return client.post(
+            reverse("create_booking_submit"),
+            {
+                "customer_name": name,
+                "email": "jane@example.com",
+                "phone": "0851234567",
+                "car_model": "Golf",
+                "service_type": "Full Detailing",
+                "preferred_date": self.day.isoformat(),
+                "preferred_time_slot": self.slot.pk,
+                "notes": "",
+            },
+        )
+
+    def test_writer_sees_own_booking_before_the_replica_catches_up(self):
+        response = self._create(self.customer_client, "Jane Doe")
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(routing.PIN_COOKIE, response.cookies)
+        self.assertEqual(response.cookies[routing.PIN_COOKIE]["max-age"], 5)
+
+        # Pinned: reads the primary
+        self.assertEqual(self._api_names(self.customer_client), ["Jane Doe"])
+        # Not pinned: reads the lagging replica
+        self.assertEqual(self._api_names(self.staff_client), [])
+
+        self.sync()
+        self.assertEqual(self._api_names(self.staff_client), ["Jane Doe"])
+
+    def test_pin_expires(self):
+        self._create(self.customer_client, "Jane Doe")
+        self.customer_client.cookies[routing.PIN_COOKIE] = str(int(time.time()) - 1)
+        self.assertEqual(self._api_names(self.customer_client), [])
+
+    def test_reads_do_not_pin(self):
+        response = self.customer_client.get(reverse("booking_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(routing.PIN_COOKIE, response.cookies)
+
+    def test_posts_read_the_primary(self):
+        # The form validates the slot against the primary, not the copy
+        # taken before the slot existed
+        late = TimeSlot.objects.create(
+            start_time=clock(15, 0), end_time=clock(16, 0), slot="AFTERNOON"
+        )
+        response = self.customer_client.post(
+            reverse("create_booking_submit"),
+            {
+                "customer_name": "Late",
+                "email": "jane@example.com",
+                "phone": "0851234567",
+                "car_model": "Golf",
+                "service_type": "Full Detailing",
+                "preferred_date": self.day.isoformat(),
+                "preferred_time_slot": late.pk,
+                "notes": "",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Booking.objects.filter(preferred_time_slot=late).exists())
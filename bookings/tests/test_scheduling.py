@@ -0,0 +1,172 @@
+# bookings/tests/test_scheduling.py
+import random
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from bookings import scheduling, services
+from bookings.models import Bay, Booking, TimeSlot
+from bookings.scheduling import BayHours, Job, schedule
+from bookings.tests.test_capacity import booking_data
+
+H = 60
+
+
+def assert_valid(test, plan, jobs):
+    # Every placed job starts in its window, fits its bay's hours and
+    # overlaps nothing else on that bay
+    by_key = {job.key: job for job in jobs}
+    hours = {bay.key: bay for bay in plan.bays}
+    per_bay = {}
+    for key, (bay, start) in plan.assignments.items():
+        job = by_key[key]
+        test.assertTrue(job.earliest <= start <= job.latest, key)
+        test.assertTrue(hours[bay].opens <= start, key)
+        test.assertLessEqual(start + job.duration, hours[bay].closes, key)
+        per_bay.setdefault(bay, []).append((start, start + job.duration))
+    for intervals in per_bay.values():
+        intervals.sort()
+        for (_, end), (start, _) in zip(intervals, intervals[1:]):
+            test.assertLessEqual(end, start)
+    test.assertEqual(len(plan.assignments) + len(plan.unscheduled), len(jobs))
+
+
+class SolverTests(SimpleTestCase):
+    def bays(self, count, opens=8 * H, closes=18 * H):
+        return [BayHours(i, opens, closes) for i in range(count)]
+
+    def test_back_to_back_bookings_share_one_bay(self):
+        jobs = [Job(i, 60, (8 + i) * H, (9 + i) * H) for i in range(4)]
+        plan = schedule(jobs, self.bays(3))
+        assert_valid(self, plan, jobs)
+        self.assertEqual(plan.bays_used, 1)
+        self.assertEqual([plan.assignments[i][1] for i in range(4)], [480, 540, 600, 660])
+
+    def test_long_services_get_their_own_bay(self):
+        ceramic = Job("ceramic", 360, 8 * H, 9 * H)
+        interiors = [Job(i, 90, 9 * H, 11 * H) for i in range(2)]
+        plan = schedule([ceramic, *interiors], self.bays(2))
+        assert_valid(self, plan, [ceramic, *interiors])
+        self.assertEqual(plan.unscheduled, [])
+        self.assertNotEqual(plan.assignments["ceramic"][0], plan.assignments[0][0])
+
+    def test_jobs_that_cannot_fit_are_reported(self):
+        jobs = [Job(i, 360, 8 * H, 9 * H) for i in range(3)]
+        plan = schedule(jobs, self.bays(2))
+        self.assertEqual(len(plan.unscheduled), 1)
+        self.assertEqual(plan.booked_minutes, 720)
+
+    def test_service_must_end_before_closing(self):
+        plan = schedule([Job(1, 180, 16 * H, 17 * H)], self.bays(1))
+        self.assertEqual(plan.unscheduled, [1])
+
+    def test_large_day_stays_valid(self):
+        rng = random.Random(7)
+        durations = list(Booking.SERVICE_MINUTES.values())
+        jobs = []
+        for i in range(500):
+            start = rng.randrange(7, 18) * H
+            jobs.append(Job(i, rng.choice(durations), start, start + H))
+        plan = schedule(jobs, self.bays(20))
+        assert_valid(self, plan, jobs)
+        self.assertGreater(plan.utilization, 0.8)
+
+    def test_fit_finds_gaps_between_bookings(self):
+        plan = scheduling.Plan(self.bays(1))
+        plan.place(Job(1, 60, 8 * H, 8 * H))
+        plan.place(Job(2, 60, 11 * H, 11 * H))
+        self.assertEqual(plan.fit(90, 8 * H, 12 * H), (0, 9 * H))
+        self.assertEqual(plan.fit(120, 8 * H, 10 * H), (0, 9 * H))
+        self.assertIsNone(plan.fit(150, 8 * H, 10 * H))
+
+
+class BayPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="customer", password="secret123")
+        cls.morning = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING", capacity=1
+        )
+        cls.noon = TimeSlot.objects.create(
+            start_time=time(12, 0), end_time=time(13, 0), slot="NOON", capacity=4
+        )
+        cls.evening = TimeSlot.objects.create(
+            start_time=time(16, 0), end_time=time(17, 0), slot="EVENING", capacity=4
+        )
+        cls.bay = Bay.objects.create(name="Bay 1")
+        cls.day = date.today() + timedelta(days=3)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def _book(self, slot, service_type="Full Detailing", day=None):
+        response = self.client.post(
+            reverse("create_booking_submit"),
+            booking_data(slot, day or self.day, service_type=service_type),
+        )
+        self.assertEqual(response.status_code, 302)
+        return Booking.objects.latest("pk")
+
+    def test_apply_stores_the_plan(self):
+        first = self._book(self.morning)
+        second = self._book(self.noon)
+        plan = scheduling.plan_day(self.day)
+        self.assertEqual(services.apply_bay_plan(self.day, plan), 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.bay, first.scheduled_start), (self.bay, time(9, 0)))
+        self.assertEqual((second.bay, second.scheduled_start), (self.bay, time(12, 0)))
+
+    def test_moving_a_booking_clears_its_bay(self):
+        booking = self._book(self.morning)
+        services.apply_bay_plan(self.day, scheduling.plan_day(self.day))
+        self.client.post(
+            reverse("edit_booking_submit", args=[booking.pk]),
+            booking_data(self.noon, self.day),
+        )
+        booking.refresh_from_db()
+        self.assertIsNone(booking.bay)
+        self.assertIsNone(booking.scheduled_start)
+
+    def test_suggestions_skip_slots_without_bay_time(self):
+        # Bay 1 is busy 12:00-18:00 with a ceramic coating, so only the
+        # morning is left that day, and that slot's seat is taken
+        self._book(self.noon, service_type="Ceramic Coating")
+        self._book(self.morning, service_type="Exterior Detailing")
+        suggestions = scheduling.suggest_slots("Full Detailing", self.day, self.morning)
+        self.assertEqual(
+            [(s.day, s.time_slot) for s in suggestions],
+            [
+                (self.day - timedelta(days=1), self.morning),
+                (self.day + timedelta(days=1), self.morning),
+                (self.day - timedelta(days=1), self.noon),
+            ],
+        )
+        self.assertEqual(suggestions[0].start, time(9, 0))
+
+    def test_full_slot_error_names_the_nearest_free_slots(self):
+        self._book(self.morning)
+        response = self.client.post(
+            reverse("create_booking_submit"), booking_data(self.morning, self.day)
+        )
+        errors = response.context["form"].errors["preferred_time_slot"]
+        self.assertIn("Nearest free:", errors[0])
+        self.assertIn(f"{self.day:%a %d %b} {self.noon}", errors[0])
+
+    def test_command_prints_and_applies_the_plan(self):
+        late = self._book(self.evening)
+        # 16:00 + 3 h is past closing time
+        too_long = self._book(self.evening, service_type="Full Detailing")
+        late.service_type = "Exterior Detailing"
+        late.save()
+        out = StringIO()
+        call_command("schedule_bays", self.day.isoformat(), "--apply", stdout=out)
+        self.assertIn("1 bookings on 1/1 bays", out.getvalue())
+        self.assertIn(f"1 bookings do not fit: {too_long.pk}", out.getvalue())
+        late.refresh_from_db()
+        self.assertEqual(late.bay, self.bay)
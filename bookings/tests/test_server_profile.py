@@ -0,0 +1,48 @@
+# bookings/tests/test_server_profile.py
+from django.test import SimpleTestCase
+
+from cardetailing.server import gunicorn_profile
+
+
+class GunicornProfileTests(SimpleTestCase):
+    def test_gthread_is_default_and_scales_with_cpus(self):
+        profile = gunicorn_profile({}, cpu_count=4)
+        self.assertEqual(profile["worker_class"], "gthread")
+        self.assertEqual((profile["workers"], profile["threads"]), (5, 4))
+        self.assertEqual(profile["wsgi_app"], "cardetailing.wsgi:application")
+        self.assertEqual(profile["bind"], "0.0.0.0:8000")
+
+    def test_sync_profile_uses_more_single_threaded_workers(self):
+        profile = gunicorn_profile({"GUNICORN_PROFILE": "sync"}, cpu_count=2)
+        self.assertEqual((profile["workers"], profile["threads"]), (5, 1))
+
+    def test_uvicorn_profile_is_rejected_with_a_reason(self):
+        with self.assertRaisesMessage(ValueError, "uvicorn is not in requirements.txt"):
+            gunicorn_profile({"GUNICORN_PROFILE": "uvicorn"}, cpu_count=2)
+
+    def test_preload_and_worker_recycling_by_default(self):
+        profile = gunicorn_profile({}, cpu_count=1)
+        self.assertTrue(profile["preload_app"])
+        self.assertGreater(profile["max_requests"], 0)
+        self.assertGreater(profile["max_requests_jitter"], 0)
+
+    def test_environment_overrides(self):
+        profile = gunicorn_profile(
+            {
+                "GUNICORN_WORKERS": "3",
+                "GUNICORN_THREADS": "8",
+                "GUNICORN_PRELOAD": "0",
+                "GUNICORN_TIMEOUT": "60",
+                "GUNICORN_GRACEFUL_TIMEOUT": "10",
+                "PORT": "5000",
+            },
+            cpu_count=8,
+        )
+        self.assertEqual((profile["workers"], profile["threads"]), (3, 8))
+        self.assertFalse(profile["preload_app"])
+        self.assertEqual((profile["timeout"], profile["graceful_timeout"]), (60, 10))
+        self.assertEqual(profile["bind"], "0.0.0.0:5000")
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            gunicorn_profile({"GUNICORN_PROFILE": "eventlet"})
@@ -0,0 +1,108 @@
+# bookings/tests/test_sessions.py
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings import session_backend
+from bookings.cache import LocalLRU
+from bookings.session_backend import SessionStore
+
+
+class CachedSessionTests(TestCase):
+    def setUp(self):
+        session_backend.local.clear()
+        self.user = User.objects.create_user(username="customer", password="secret123")
+
+    def _session_queries(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        return [q["sql"] for q in queries if "django_session" in q["sql"]]
+
+    def _stored(self, **data):
+        store = SessionStore()
+        store.update(data)
+        store.create()
+        return store.session_key
+
+    def test_repeat_requests_do_not_read_the_session_table(self):
+        self.client.force_login(self.user)
+        url = reverse("booking_list")
+        self.assertEqual(len(self._session_queries(lambda: self.client.get(url))), 1)
+        self.assertEqual(self._session_queries(lambda: self.client.get(url)), [])
+
+    def test_unchanged_session_is_not_saved_again(self):
+        key = self._stored(cart="wax")
+        store = SessionStore(key)
+        store["cart"] = "wax"
+        self.assertTrue(store.modified)
+        self.assertEqual(self._session_queries(store.save), [])
+
+    def test_changed_session_is_saved(self):
+        key = self._stored(cart="wax")
+        store = SessionStore(key)
+        store["cart"] = "polish"
+        self.assertTrue(self._session_queries(store.save))
+        session_backend.local.clear()
+        self.assertEqual(SessionStore(key)["cart"], "polish")
+
+    def test_unchanged_session_is_refreshed_to_extend_its_expiry(self):
+        key = self._stored(cart="wax")
+        store = SessionStore(key)
+        store["cart"] = "wax"
+        with mock.patch.dict(session_backend._OPTIONS, {"refresh": 0}):
+            self.assertTrue(self._session_queries(store.save))
+
+    def test_delete_drops_the_cached_copy(self):
+        key = self._stored(cart="wax")
+        SessionStore(key).load()
+        SessionStore(key).delete()
+        self.assertEqual(SessionStore(key).load(), {})
+
+    def test_other_workers_see_saves_and_deletes(self):
+        key = self._stored(cart="wax")
+        self.assertEqual(SessionStore(key)["cart"], "wax")
+
+        # Another worker: its own local cache, the same shared cache
+        with mock.patch.object(session_backend, "local", LocalLRU()):
+            store = SessionStore(key)
+            store["cart"] = "polish"
+            store.save()
+        self.assertEqual(SessionStore(key)["cart"], "polish")
+
+        with mock.patch.object(session_backend, "local", LocalLRU()):
+            SessionStore(key).delete()
+        self.assertEqual(SessionStore(key).load(), {})
+
+    def test_expired_cached_copy_is_not_used(self):
+        key = self._stored(cart="wax")
+        session = Session.objects.get(session_key=key)
+        session_backend.local.set(
+            session_backend._local_key(key), (session.session_data, timezone.now())
+        )
+        Session.objects.filter(session_key=key).update(
+            expire_date=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(SessionStore(key).load(), {})
+
+    def test_logout_ends_the_session(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("booking_list"))
+        key = self.client.session.session_key
+        self.client.post(reverse("logout"))
+        self.assertEqual(SessionStore(key).load(), {})
+        self.assertEqual(self.client.get(reverse("booking_list")).status_code, 302)
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_cookie_sessions_never_touch_the_table(self):
+        def visit():
+            self.client.force_login(self.user)
+            self.assertEqual(self.client.get(reverse("booking_list")).status_code, 200)
+
+        self.assertEqual(self._session_queries(visit), [])
@@ -0,0 +1,58 @@
+# bookings/tests/test_slot_cache.py
+from datetime import time
+
+from django.test import TestCase
+
+from bookings import slot_cache
+from bookings.forms import BookingForm
+from bookings.models import TimeSlot
+
+
+class SlotChoiceCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.late = TimeSlot.objects.create(
+            start_time=time(15, 0), end_time=time(16, 0), slot="LATE"
+        )
+        cls.early = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="EARLY"
+        )
+
+    def setUp(self):
+        # Rolled-back data from earlier tests may still be cached locally
+        slot_cache.invalidate()
+
+    def test_warm_form_render_makes_no_queries(self):
+        BookingForm().as_p()
+        with self.assertNumQueries(0):
+            html = BookingForm().as_p()
+        self.assertIn("09:00 AM - 10:00 AM", html)
+
+    def test_choices_are_ordered_by_start_time(self):
+        self.assertEqual(
+            [pk for pk, _label in slot_cache.slot_choices()],
+            [self.early.pk, self.late.pk],
+        )
+
+    def test_saving_a_slot_invalidates_labels(self):
+        slot_cache.slot_choices()
+        self.early.start_time = time(8, 0)
+        self.early.save()
+        self.assertIn((self.early.pk, "08:00 AM - 10:00 AM"), slot_cache.slot_choices())
+
+    def test_deleting_a_slot_removes_choice(self):
+        slot_cache.slot_choices()
+        pk = self.late.pk
+        self.late.delete()
+        self.assertNotIn(pk, [pk for pk, _label in slot_cache.slot_choices()])
+
+    def test_bumped_version_from_another_worker_is_picked_up(self):
+        """Another process bumping the shared key forces a local rebuild."""
+        slot_cache.slot_choices()
+        TimeSlot.objects.filter(pk=self.late.pk).update(end_time=time(17, 0))
+        slot_cache.tiered.invalidate(slot_cache.NAMESPACE)
+        self.assertIn((self.late.pk, "03:00 PM - 05:00 PM"), slot_cache.slot_choices())
+
+    def test_edit_form_preselects_current_slot(self):
+        form = BookingForm(initial={"preferred_time_slot": self.late.pk})
+        self.assertIn(f'<option value="{self.late.pk}" selected>', str(form["preferred_time_slot"]))
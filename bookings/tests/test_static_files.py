@@ -0,0 +1,124 @@
+# bookings/tests/test_static_files.py
+import gzip
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from bookings.middleware import StaticFilesMiddleware
+from bookings.security import render_nginx_static_conf
+from cardetailing.storage import minify_css
+
+SOURCE_CSS = os.path.join(settings.BASE_DIR, "bookings", "static", "bookings", "style.css")
+
+
+class MinifyCssTests(SimpleTestCase):
+    def test_drops_comments_and_whitespace(self):
+        css = "/* note */\nbody {\n    margin : 0 ;\n    color: red;\n}\n"
+        self.assertEqual(minify_css(css), "body{margin :0;color:red}")
+
+    def test_keeps_meaningful_spaces_and_strings(self):
+        css = (
+            'a :hover , b > c { content: "x , y  z"; margin: 0 auto !important; }\n'
+            "@media screen and (max-width: 600px) { .x { width: calc(1px + 2px); } }"
+        )
+        self.assertEqual(
+            minify_css(css),
+            'a :hover,b>c{content:"x , y  z";margin:0 auto!important}'
+            "@media screen and (max-width:600px){.x{width:calc(1px + 2px)}}",
+        )
+
+    def test_semicolon_brace_inside_strings_is_kept(self):
+        css = 'a::after { content: ";}"; color: red; /* last */ }\nb{x:1;}'
+        self.assertEqual(minify_css(css), 'a::after{content:";}";color:red}b{x:1}')
+
+
+class CollectedStaticTests(SimpleTestCase):
+    """collectstatic into a scratch STATIC_ROOT, then serve it."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        cls.settings = override_settings(STATIC_ROOT=cls.root, SERVE_STATIC=True)
+        cls.settings.enable()
+        call_command("collectstatic", interactive=False, verbosity=0, stdout=StringIO())
+        cls.middleware = StaticFilesMiddleware(lambda request: None)
+        cls.url = static("bookings/style.css")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    def _get(self, url=None, **headers):
+        return self.middleware(RequestFactory().get(url or self.url, **headers))
+
+    def _body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_templates_reference_the_hashed_name(self):
+        self.assertRegex(self.url, r"^/static/bookings/style\.[0-9a-f]{12}\.css$")
+
+    def test_hashed_css_is_minified_with_a_matching_gzip_sibling(self):
+        path = os.path.join(self.root, self.url[len(settings.STATIC_URL) :])
+        with open(path, "rb") as hashed, open(path + ".gz", "rb") as compressed:
+            data = hashed.read()
+            self.assertEqual(gzip.decompress(compressed.read()), data)
+        with open(SOURCE_CSS, "rb") as source:
+            self.assertLess(len(data), len(source.read()))
+
+    def test_transferred_bytes_before_and_after(self):
+        # Before: style.css?v=4 sent as-is. After: hashed, minified, gzip.
+        with open(SOURCE_CSS, "rb") as source:
+            before = len(source.read())
+        response = self._get(HTTP_ACCEPT_ENCODING="gzip, deflate")
+        after = len(self._body(response))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(int(response["Content-Length"]), after)
+        self.assertLess(after, before / 3)
+
+    def test_identity_without_accept_encoding(self):
+        response = self._get()
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertIn(b"body{", self._body(response))
+
+    def test_gzip_refused_with_q_zero(self):
+        response = self._get(HTTP_ACCEPT_ENCODING="gzip;q=0")
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_hashed_names_are_immutable(self):
+        self.assertIn("immutable", self._get()["Cache-Control"])
+        plain = self._get("/static/bookings/style.css")
+        self.assertEqual(plain.status_code, 200)
+        self.assertNotIn("immutable", plain["Cache-Control"])
+
+    def test_revalidation_is_304(self):
+        etag = self._get(HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+        response = self._get(HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_security_headers_match_nginx(self):
+        response = self._get()
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertIn("Content-Security-Policy", response)
+
+    def test_unknown_paths_fall_through(self):
+        self.assertIsNone(self._get("/static/nope.css"))
+        self.assertIsNone(self._get("/bookings/"))
+
+
+class NginxStaticConfTests(SimpleTestCase):
+    def test_serves_precompressed_files(self):
+        self.assertIn("gzip_static on;", render_nginx_static_conf())
+
+    @override_settings(NGINX_BROTLI_STATIC=True)
+    def test_brotli_static_when_the_module_is_available(self):
+        self.assertIn("brotli_static on;", render_nginx_static_conf())
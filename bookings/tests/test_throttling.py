@@ -0,0 +1,214 @@
+# bookings/tests/test_throttling.py
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import (
+    Client,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings import throttling
+from bookings.models import Booking, ThrottleCounter, TimeSlot
+
+RATES = {
+    "signup_submit": {"ip": "5/m"},
+    "login": {"ip": "50/m", "user": "3/m"},
+    "create_booking_submit": {"ip": "50/m", "user": "4/m"},
+}
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def allowed_of_concurrent_hits(window, hits=80, workers=8):
+    # How many of ``hits`` parallel requests ``window`` lets through
+    def hit(_):
+        try:
+            return window.hit("shared")
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(hit, range(hits))).count(None)
+
+
+class SlidingWindowTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate("20/m"), (20, 60))
+        self.assertEqual(throttling.parse_rate("5/10s"), (5, 10))
+        self.assertEqual(throttling.parse_rate("100/hour"), (100, 3600))
+        with self.assertRaises(ImproperlyConfigured):
+            throttling.parse_rate("fast")
+
+    def test_previous_window_slides_out(self):
+        window = throttling.SlidingWindow(limit=4, period=60)
+        start = 6000.0
+        results = [window.hit("k", now=start + i) for i in range(5)]
+        self.assertEqual(results[:4], [None] * 4)
+        # Over the limit: 56 s left in this window, then a full window
+        self.assertEqual(results[4], 56 + 12)
+
+        # Halfway through the next window half of the previous 5 still
+        # counts: 2.5 + 1 allowed, 2.5 + 2 is over
+        self.assertIsNone(window.hit("k", now=start + 90))
+        self.assertIsNotNone(window.hit("k", now=start + 90))
+        # A window later the old hits are gone
+        self.assertIsNone(window.hit("k", now=start + 181))
+
+    def test_counter_fallback_when_add_loses_the_race(self):
+        class RacingCache:
+            # incr() misses, then another worker creates the counter first
+            def __init__(self):
+                self.value = None
+
+            def incr(self, key):
+                if self.value is None:
+                    self.value = 1
+                    raise ValueError(key)
+                self.value += 1
+                return self.value
+
+            def add(self, key, value, timeout):
+                return False
+
+        self.assertEqual(throttling.incr(RacingCache(), "k", 60), 2)
+
+    def test_concurrent_hits_are_counted_once_each(self):
+        window = throttling.SlidingWindow(limit=10, period=60)
+        self.assertEqual(allowed_of_concurrent_hits(window), 10)
+
+    def test_client_ip_behind_proxies(self):
+        request = type("Request", (), {})()
+        request.META = {
+            "REMOTE_ADDR": "10.0.0.2",
+            "HTTP_X_FORWARDED_FOR": "6.6.6.6, 198.51.100.7, 10.0.0.1",
+        }
+        self.assertEqual(throttling.client_ip(request), "10.0.0.2")
+        self.assertEqual(throttling.client_ip(request, proxy_count=2), "198.51.100.7")
+        self.assertEqual(throttling.client_ip(request, proxy_count=5), "10.0.0.2")
+
+
+class SharedCounterTests(TransactionTestCase):
+    # The backends a multi-worker deployment shares counts through
+
+    def test_file_backend_counts_concurrent_hits_once_each(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        backend = "django.core.cache.backends.filebased.FileBasedCache"
+        with override_settings(CACHES={"throttle": {"BACKEND": backend, "LOCATION": location}}):
+            window = throttling.SlidingWindow(limit=10, period=60, cache_alias="throttle")
+            self.assertIsInstance(window.counter, throttling.FileCounter)
+            self.assertEqual(allowed_of_concurrent_hits(window), 10)
+
+    @override_settings(
+        CACHES={
+            "throttle": {
+                "BACKEND": "bookings.cache_backend.DatabaseCache",
+                "LOCATION": "throttle_test_cache",
+            }
+        }
+    )
+    def test_database_backend_counts_concurrent_hits_once_each(self):
+        window = throttling.SlidingWindow(limit=10, period=60, cache_alias="throttle")
+        self.assertIsInstance(window.counter, throttling.DatabaseCounter)
+        self.assertEqual(allowed_of_concurrent_hits(window), 10)
+        self.assertEqual(ThrottleCounter.objects.get().count, 80)
+
+    def test_expired_database_counter_starts_again(self):
+        counter = throttling.DatabaseCounter("default")
+        ThrottleCounter.objects.create(
+            key="k", count=50, expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(counter.get("k"), 0)
+        self.assertEqual(counter.incr("k", 60), 1)
+        self.assertEqual(counter.incr("k", 60), 2)
+        counter.sweep(timezone.now() + timedelta(seconds=61))
+        self.assertFalse(ThrottleCounter.objects.exists())
+
+
+@override_settings(THROTTLE_RATES=RATES, PASSWORD_HASHERS=FAST_HASHERS)
+class ThrottleMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="jane", password="secret123")
+        cls.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING", capacity=100
+        )
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def _signup(self, client, n):
+        return client.post(
+            reverse("signup_submit"),
+            {"username": f"bot{n}", "password1": "Xy7!secret-pw", "password2": "Xy7!secret-pw"},
+        )
+
+    def test_burst_from_many_clients(self):
+        # 20 addresses each sending 8 signups: the first 5 of every client
+        # go through, the rest are refused without touching the database
+        statuses = {}
+        for host in range(20):
+            client = Client(REMOTE_ADDR=f"203.0.113.{host}")
+            statuses[host] = [self._signup(client, host * 10 + n).status_code for n in range(5)]
+            with self.assertNumQueries(0):
+                refused = [self._signup(client, host * 10 + n) for n in range(5, 8)]
+            self.assertEqual({r.status_code for r in refused}, {429})
+            self.assertTrue(int(refused[0]["Retry-After"]) >= 1)
+        self.assertEqual({code for codes in statuses.values() for code in codes}, {302})
+        self.assertEqual(User.objects.filter(username__startswith="bot").count(), 100)
+
+    def test_login_is_limited_per_account_across_addresses(self):
+        statuses = [
+            Client(REMOTE_ADDR=f"198.51.100.{n}")
+            .post(reverse("login"), {"username": "JANE", "password": "wrong"})
+            .status_code
+            for n in range(5)
+        ]
+        self.assertEqual(statuses, [200, 200, 200, 429, 429])
+        # Other accounts and page views are not affected
+        client = Client(REMOTE_ADDR="198.51.100.1")
+        self.assertEqual(
+            client.post(reverse("login"), {"username": "bob", "password": "x"}).status_code, 200
+        )
+        self.assertEqual(client.get(reverse("login")).status_code, 200)
+
+    def test_booking_submissions_are_limited_per_user(self):
+        day = date.today() + timedelta(days=3)
+        data = {
+            "customer_name": "Jane Doe",
+            "email": "jane@example.com",
+            "phone": "0851234567",
+            "car_model": "Golf",
+            "service_type": "Full Detailing",
+            "preferred_date": day.isoformat(),
+            "preferred_time_slot": self.slot.pk,
+            "notes": "",
+        }
+        statuses = []
+        for n in range(6):
+            client = Client(REMOTE_ADDR=f"192.0.2.{n}")
+            client.force_login(self.user)
+            statuses.append(client.post(reverse("create_booking_submit"), data).status_code)
+        self.assertEqual(statuses, [302] * 4 + [429] * 2)
+        self.assertEqual(Booking.objects.count(), 4)
+
+    def test_rejection_carries_the_security_headers(self):
+        client = Client(REMOTE_ADDR="203.0.113.99")
+        for n in range(5):
+            self._signup(client, 900 + n)
+        response = self._signup(client, 999)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
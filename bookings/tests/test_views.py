@@ -1,11 +1,13 @@
 # bookings/tests/test_views.py
-from datetime import date
+from datetime import date, time, timedelta
 
 from django.contrib.auth.models import User
 from django.test import Client, TestCase
 from django.urls import reverse
 
 from bookings.forms import BookingForm
+from bookings.models import Booking, TimeSlot
+from bookings.slot_cache import slot_choices
 
 
 class PublicViewsTests(TestCase):
@@ -78,14 +80,14 @@ class AuthenticatedBookingViewsTests(TestCase):
         self.client.login(username="normal_user", password="secret123")
         response = self.client.get(reverse("booking_list"))
         self.assertEqual(response.status_code, 200)
-        self.assertIn("bookings", response.context)
+        self.assertIn("listing", response.context)
 
     def test_booking_list_for_staff_user(self):
         """Staff user should also see booking_list page."""
         self.client.login(username="staff_user", password="secret123")
         response = self.client.get(reverse("booking_list"))
         self.assertEqual(response.status_code, 200)
-        self.assertIn("bookings", response.context)
+        self.assertIn("listing", response.context)
 
     def test_create_booking_get_renders_form(self):
         """
@@ -111,3 +113,111 @@ class AuthenticatedBookingViewsTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("form", response.context)
         self.assertTrue(response.context["form"].errors)
+
+
+class OwnerScopedBookingViewsTests(TestCase):
+    """Edit / delete views find the booking with one owner-scoped query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username="owner", password="secret123")
+        cls.stranger = User.objects.create_user(username="stranger", password="secret123")
+        cls.staff = User.objects.create_user(
+            username="staff_user", password="secret123", is_staff=True
+        )
+        cls.slot = TimeSlot.objects.create(
+            start_time=time(9, 0), end_time=time(10, 0), slot="MORNING"
+        )
+        cls.later = TimeSlot.objects.create(
+            start_time=time(14, 0), end_time=time(15, 0), slot="AFTERNOON"
+        )
+        cls.booking = Booking.objects.create(
+            user=cls.owner,
+            customer_name="Owner",
+            email="owner@example.com",
+            phone="0851234567",
+            car_model="Golf",
+            service_type="Full Detailing",
+            preferred_date=date.today() + timedelta(days=3),
+            preferred_time_slot=cls.slot,
+        )
+
+    def setUp(self):
+        # Warm the time slot choices the edit form renders from
+        slot_choices()
+        self.client = Client()
+        self.client.force_login(self.owner)
+
+    def _form_data(self, **changes):
+        data = {
+            "customer_name": "Owner",
+            "email": "owner@example.com",
+            "phone": "0851234567",
+            "car_model": "Golf",
+            "service_type": "Full Detailing",
+            "preferred_date": self.booking.preferred_date.isoformat(),
+            "preferred_time_slot": self.slot.pk,
+            "notes": "",
+        }
+        data.update(changes)
+        return data
+
+    def test_owner_query_counts(self):
+        pk = self.booking.pk
+        # Session, user, booking; later requests find the session cached
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get(reverse("edit_booking", args=[pk])).status_code, 200)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(reverse("delete_booking", args=[pk])).status_code, 200)
+        # + slot lookup and FK check, then the write (the transaction is a
+        # savepoint pair inside TestCase)
+        with self.assertNumQueries(8):
+            response = self.client.post(
+                reverse("edit_booking_submit", args=[pk]), self._form_data(notes="Wax")
+            )
+        self.assertEqual(response.status_code, 302)
+        # + seat release, delete and rollup update inside the savepoint pair
+        with self.assertNumQueries(7):
+            response = self.client.post(reverse("delete_booking_confirm", args=[pk]))
+        self.assertEqual(response.status_code, 302)
+
+    def test_strangers_get_404_from_the_lookup_alone(self):
+        self.client.force_login(self.stranger)
+        # Puts the session in the worker's session cache
+        self.client.get(reverse("booking_list"))
+        pk = self.booking.pk
+        for name, method in (
+            ("edit_booking", "get"),
+            ("edit_booking_submit", "post"),
+            ("delete_booking", "get"),
+            ("delete_booking_confirm", "post"),
+        ):
+            # User and the scoped booking lookup
+            with self.subTest(name), self.assertNumQueries(2):
+                response = getattr(self.client, method)(
+                    reverse(name, args=[pk]), self._form_data() if method == "post" else None
+                )
+                self.assertEqual(response.status_code, 404)
+        self.assertTrue(Booking.objects.filter(pk=pk, notes="").exists())
+
+    def test_staff_can_open_any_booking(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("edit_booking", args=[self.booking.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_edit_through_the_partial_instance_saves_every_change(self):
+        self.client.post(
+            reverse("edit_booking_submit", args=[self.booking.pk]),
+            self._form_data(preferred_time_slot=self.later.pk, notes="Moved"),
+        )
+        booking = Booking.objects.get(pk=self.booking.pk)
+        self.assertEqual(booking.notes, "Moved")
+        self.assertEqual(booking.preferred_time_slot, self.later)
+        self.assertEqual(booking.preferred_start_time, time(14, 0))
+        self.assertEqual(booking.created_at, self.booking.created_at)
+        self.assertGreater(booking.updated_at, self.booking.updated_at)
+
+    def test_visible_to(self):
+        self.assertEqual(list(Booking.objects.visible_to(self.owner)), [self.booking])
+        self.assertEqual(list(Booking.objects.visible_to(self.stranger)), [])
+        self.assertEqual(list(Booking.objects.visible_to(self.staff)), [self.booking])
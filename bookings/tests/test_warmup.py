@@ -0,0 +1,68 @@
+# bookings/tests/test_warmup.py
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from bookings import startup_profile, warmup
+
+CACHED_TEMPLATES = [
+    dict(
+        settings.TEMPLATES[0],
+        APP_DIRS=False,
+        OPTIONS=dict(
+            settings.TEMPLATES[0]["OPTIONS"],
+            loaders=[("django.template.loaders.cached.Loader", settings.TEMPLATE_LOADERS)],
+        ),
+    )
+]
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   django.utils.version
+import time:       300 |        420 | django
+import time:      2000 |       2000 |     bookings.views
+"""
+
+
+class WarmupTests(TestCase):
+    def test_lists_project_templates_only(self):
+        names = warmup.template_names(engines.all()[0].engine)
+        self.assertIn("bookings/booking_list.html", names)
+        self.assertIn("bookings/email/booking_confirmation.txt", names)
+        # The project's admin overrides, not Django's own admin templates
+        self.assertIn("admin/bookings/booking/change_list.html", names)
+        self.assertNotIn("admin/base.html", names)
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_fills_the_cached_loader(self):
+        loader = engines.all()[0].engine.template_loaders[0]
+        self.assertEqual(loader.get_template_cache, {})
+        result = warmup.warm_up()
+        self.assertIn("bookings/booking_list.html", loader.get_template_cache)
+        self.assertEqual(result["broken_templates"], [])
+        self.assertGreaterEqual(result["urls"], 20)
+        self.assertEqual(
+            set(result["timings"]), {"templates", "modules", "urls", "connections"}
+        )
+
+
+class StartupProfileTests(TestCase):
+    def test_parses_importtime_output(self):
+        imports = startup_profile.parse_importtime(IMPORTTIME)
+        self.assertEqual(imports[0], ("django.utils.version", 120, 120, 1))
+        self.assertEqual(imports[2], ("bookings.views", 2000, 2000, 2))
+        self.assertEqual(
+            startup_profile.by_package(imports), {"bookings": 2000, "django": 420}
+        )
+
+    def test_command_reports_both_variants(self):
+        out = StringIO()
+        call_command("profile_startup", "/accounts/login/", repeat=1, top=3, stdout=out)
+        output = out.getvalue()
+        self.assertIn("Imports:", output)
+        self.assertIn("warmup: templates", output)
+        self.assertIn("first GET /accounts/login/", output)
+        self.assertNotIn("answered", output)
@@ -0,0 +1,245 @@
+# bookings/throttling.py
+# Request throttling for the endpoints bots go after (settings.THROTTLE_RATES,
+# applied by bookings.middleware.ThrottleMiddleware). Each rule counts POSTs
+# to one URL name per client IP or per user in the THROTTLE_CACHE cache over
+# a sliding window: the current fixed window's count plus the previous
+# window's, weighted by how much of it still overlaps the last ``period``
+# seconds. That is two counters per client and rule, and no burst of twice
+# the limit across a window boundary as with plain fixed windows.
+#
+# Rejected requests are counted too, so a client that keeps hammering stays
+# blocked until it slows down below the rate.
+#
+# Counting has to be atomic across workers. locmem and memcached increment
+# atomically; the file and database backends read and rewrite the value, so
+# counters for those go under a file lock or into the ThrottleCounter table
+# (see counter_for()).
+import hashlib
+import math
+import os
+import random
+import re
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ThrottleCounter
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; file-backed counts are then per worker
+    fcntl = None
+
+KEY_PREFIX = "throttle"
+# Chance that creating a ThrottleCounter row also deletes the expired ones
+SWEEP_CHANCE = 0.01
+
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([smhd])\w*\s*$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(text):
+    # "20/m", "5/10s", "100/h" -> (limit, period in seconds)
+    match = _RATE.match(text)
+    if match is None:
+        raise ImproperlyConfigured(f"Bad throttle rate {text!r}; use e.g. '20/m' or '5/10s'")
+    count, multiple, unit = match.groups()
+    return int(count), int(multiple or 1) * _UNITS[unit]
+
+
+def incr(cache, key, timeout):
+    # Atomic where the backend's incr() is (locmem, memcached). The first hit
+    # of a window creates the counter with add(), which sets its expiry;
+    # losing that race to another worker means the key now exists.
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout):
+            return 1
+        return cache.incr(key)
+
+
+class CacheCounter:
+    # Counters in a cache whose incr() is atomic
+    def __init__(self, cache_alias):
+        self.cache_alias = cache_alias
+
+    def incr(self, key, timeout):
+        return incr(caches[self.cache_alias], key, timeout)
+
+    def get(self, key):
+        return caches[self.cache_alias].get(key, 0)
+
+
+class FileCounter(CacheCounter):
+    # FileBasedCache.incr() reads the file and writes a new one, and resets
+    # the expiry to the cache default. One lock file in the cache directory
+    # makes every worker's read and write a single step.
+    def __init__(self, cache_alias):
+        super().__init__(cache_alias)
+        directory = settings.CACHES[cache_alias]["LOCATION"]
+        os.makedirs(directory, exist_ok=True)
+        self.lock_path = os.path.join(directory, "throttle.lock")
+
+    def incr(self, key, timeout):
+        cache = caches[self.cache_alias]
+        with open(self.lock_path, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            count = cache.get(key, 0) + 1
+            cache.set(key, count, timeout)
+        return count
+
+
+class DatabaseCounter:
+    # ThrottleCounter rows, for a database THROTTLE_CACHE: a hit is one
+    # UPDATE ... SET count = count + 1, which the database serializes
+    def __init__(self, cache_alias):
+        self.using = router.db_for_write(ThrottleCounter)
+
+    def incr(self, key, timeout):
+        now = timezone.now()
+        rows = ThrottleCounter.objects.using(self.using).filter(key=key)
+        with transaction.atomic(using=self.using):
+            if not rows.filter(expires_at__gt=now).update(count=F("count") + 1):
+                # First hit of the window, or a row left over from an
+                # expired one. Another worker may create it first.
+                rows.filter(expires_at__lte=now).delete()
+                try:
+                    with transaction.atomic(using=self.using):
+                        rows.create(
+                            key=key, count=1, expires_at=now + timedelta(seconds=timeout)
+                        )
+                except IntegrityError:
+                    rows.update(count=F("count") + 1)
+                else:
+                    if random.random() < SWEEP_CHANCE:
+                        self.sweep(now)
+                    return 1
+            return rows.values_list("count", flat=True).get()
+
+    def get(self, key):
+        return (
+            ThrottleCounter.objects.using(self.using)
+            .filter(key=key, expires_at__gt=timezone.now())
+            .values_list("count", flat=True)
+            .first()
+            or 0
+        )
+
+    def sweep(self, now=None):
+        ThrottleCounter.objects.using(self.using).filter(
+            expires_at__lte=now or timezone.now()
+        ).delete()
+
+
+def counter_for(cache_alias):
+    # Where SlidingWindow keeps its counts for the cache ``cache_alias``
+    cache = caches[cache_alias]
+    if isinstance(cache, DatabaseCache):
+        return DatabaseCounter(cache_alias)
+    if isinstance(cache, FileBasedCache):
+        return FileCounter(cache_alias)
+    return CacheCounter(cache_alias)
+
+
+class SlidingWindow:
+    def __init__(self, limit, period, cache_alias="default"):
+        self.limit = limit
+        self.period = period
+        self.counter = counter_for(cache_alias)
+
+    def hit(self, key, now=None):
+        # Count one request for ``key``; returns None when it is allowed,
+        # else the seconds until the client is back under the limit
+        now = time.time() if now is None else now
+        window, elapsed = divmod(now, self.period)
+        window = int(window)
+        # Kept for two periods: it is the previous window during the next one
+        count = self.counter.incr(f"{key}:{window}", self.period * 2)
+        previous = self.counter.get(f"{key}:{window - 1}")
+        if previous * (self.period - elapsed) / self.period + count <= self.limit:
+            return None
+        return max(1, math.ceil(self._retry_after(previous, count, elapsed)))
+
+    def _retry_after(self, previous, count, elapsed):
+        if count < self.limit:
+            # Within this window, once enough of the previous one slides out
+            return self.period * (1 - (self.limit - count) / previous) - elapsed
+        # Into the next window, once enough of this one slides out
+        return self.period - elapsed + self.period * (1 - self.limit / count)
+
+
+# ----- who is counted -----
+
+
+def client_ip(request, proxy_count=0):
+    # The address the request came from. Behind ``proxy_count`` proxies that
+    # each append to X-Forwarded-For, the client is that many entries from
+    # the end; anything before it is whatever the client chose to send.
+    if proxy_count:
+        forwarded = [
+            part.strip()
+            for part in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+            if part.strip()
+        ]
+        if len(forwarded) >= proxy_count:
+            return forwarded[-proxy_count]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def user_ident(request):
+    # The signed-in user, else the account a login form names (hashed: it is
+    # whatever the client posted), else None
+    user = request.user
+    if user.is_authenticated:
+        return f"id{user.pk}"
+    username = request.POST.get("username", "").strip().lower()
+    if not username:
+        return None
+    return "name" + hashlib.sha1(username.encode()).hexdigest()[:20]
+
+
+SCOPES = {
+    "ip": lambda request, proxy_count: client_ip(request, proxy_count),
+    "user": lambda request, proxy_count: user_ident(request),
+}
+
+
+def compile_rules(rates, cache_alias="default"):
+    # settings.THROTTLE_RATES -> {url_name: [(scope, SlidingWindow), ...]},
+    # IP rules first so a rejected client never loads its session or user
+    rules = {}
+    for url_name, scopes in rates.items():
+        unknown = set(scopes) - set(SCOPES)
+        if unknown:
+            raise ImproperlyConfigured(
+                f"THROTTLE_RATES[{url_name!r}]: unknown scope(s) {sorted(unknown)}"
+            )
+        rules[url_name] = [
+            (scope, SlidingWindow(*parse_rate(scopes[scope]), cache_alias=cache_alias))
+            for scope in SCOPES
+            if scope in scopes
+        ]
+    return rules
+
+
+def check(request, url_name, rules, proxy_count=0):
+    # Count ``request`` against every rule of ``url_name``; returns None
+    # when it may go ahead, else the Retry-After seconds
+    for scope, window in rules:
+        ident = SCOPES[scope](request, proxy_count)
+        if not ident:
+            continue
+        retry_after = window.hit(f"{KEY_PREFIX}:{url_name}:{scope}:{ident}")
+        if retry_after is not None:
+            return retry_after
+    return None
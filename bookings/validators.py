@@ -0,0 +1,18 @@
+# bookings/validators.py
+# Booking rules shared by BookingForm and the bulk import pipeline.
+from datetime import date
+
+from django.core.exceptions import ValidationError
+
+
+def validate_not_in_past(value):
+    # Do not allow bookings in the past
+    if value < date.today():
+        raise ValidationError("Preferred date cannot be in the past.")
+
+
+def validate_phone(value):
+    # Basic validation for phone number length
+    digits = [c for c in value if c.isdigit()]
+    if len(digits) < 7:
+        raise ValidationError("Phone number seems too short.")
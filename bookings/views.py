@@ -1,18 +1,73 @@
+from datetime import date, timedelta
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
-from django.http import JsonResponse
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
+from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils.crypto import constant_time_compare
 
 from .models import Booking
 from .forms import BookingForm
+from .availability import MAX_RANGE_DAYS, cached_free_capacity
+from .capacity import SlotFullError
+from . import bulk, page_cache, rollups, scheduling, services
+from .metrics import registry
+from .pagination import paginate_bookings
+from .readiness import readiness
+
+SLOT_FULL_MESSAGE = "This time slot is fully booked on that date. Please pick another."
+SUGGESTIONS_MESSAGE = "Nearest free: {}."
+
+# Bulk import responses list at most this many row errors
+MAX_REPORTED_ERRORS = 1000
 
 # ===== Template path constants =====
 BOOKING_FORM_TEMPLATE = "bookings/booking_form.html"
 SIGNUP_TEMPLATE = "bookings/signup.html"
+ANALYTICS_TEMPLATE = "bookings/analytics.html"
+
+# Staff analytics: default window around today and the longest range
+ANALYTICS_DAYS_BACK = 30
+ANALYTICS_DAYS_AHEAD = 60
+ANALYTICS_MAX_DAYS = 731
+
+# Columns rendered by _booking_row.html (updated_at keys the row cache)
+BOOKING_LIST_FIELDS = (
+    "customer_name",
+    "car_model",
+    "service_type",
+    "preferred_date",
+    "preferred_start_time",
+    "notes",
+    "updated_at",
+    "preferred_time_slot",
+    "preferred_time_slot__start_time",
+    "preferred_time_slot__end_time",
+)
+
+# Columns the edit / delete views need: the form's, plus what Booking.save()
+# writes and the page cache and rollups read (an instance loaded with only()
+# saves just these columns)
+BOOKING_DETAIL_FIELDS = (
+    *BookingForm.Meta.fields,
+    "user",
+    "preferred_start_time",
+    "created_at",
+    "updated_at",
+    "preferred_time_slot__start_time",
+    "preferred_time_slot__end_time",
+)
 
 
 def _render_booking_form(request, form, title, post_url):
@@ -28,10 +83,82 @@ def _render_booking_form(request, form, title, post_url):
 
 @require_GET
 def health(request):
-    # health-check endpoint for Elastic Beanstalk
+    # health-check endpoint for Elastic Beanstalk. GET/HEAD probes are normally
+    # answered by HealthCheckMiddleware before reaching this view.
     return JsonResponse({"status": "ok"})
 
 
+@require_GET
+def ready(request):
+    # Deep readiness: database latency, pending migrations, cache reachability
+    result = readiness()
+    return JsonResponse(result, status=200 if result["ready"] else 503)
+
+
+@require_GET
+def availability(request):
+    # Free seats per time slot and day, e.g. ?start=2030-01-01&end=2030-01-31
+    try:
+        start = _parse_date(request.GET.get("start"), date.today())
+        end = _parse_date(request.GET.get("end"), start + timedelta(days=13))
+    except ValueError:
+        return JsonResponse({"error": "Dates must be YYYY-MM-DD."}, status=400)
+
+    if end < start:
+        return JsonResponse({"error": "end must not be before start."}, status=400)
+    if (end - start).days >= MAX_RANGE_DAYS:
+        return JsonResponse(
+            {"error": f"Range is limited to {MAX_RANGE_DAYS} days."}, status=400
+        )
+
+    return JsonResponse(cached_free_capacity(start, end))
+
+
+def _parse_date(value, default):
+    return date.fromisoformat(value) if value else default
+
+
+@require_GET
+def metrics(request):
+    # Prometheus scrape endpoint: bearer token from settings, or a staff user
+    token = settings.PERF_METRICS_TOKEN
+    authorized = token and constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    )
+    if not (authorized or request.user.is_staff):
+        raise PermissionDenied
+
+    return HttpResponse(
+        registry.render_prometheus(), content_type="text/plain; version=0.0.4"
+    )
+
+
+@login_required
+@require_GET
+def analytics(request):
+    # Demand per day, service and time slot from the rollup tables, e.g.
+    # ?start=2030-01-01&end=2030-12-31
+    if not request.user.is_staff:
+        raise PermissionDenied
+
+    today = date.today()
+    try:
+        start = _parse_date(
+            request.GET.get("start"), today - timedelta(days=ANALYTICS_DAYS_BACK)
+        )
+        end = _parse_date(
+            request.GET.get("end"), today + timedelta(days=ANALYTICS_DAYS_AHEAD)
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Dates must be YYYY-MM-DD.")
+    if end < start:
+        return HttpResponseBadRequest("end must not be before start.")
+    if (end - start).days >= ANALYTICS_MAX_DAYS:
+        return HttpResponseBadRequest(f"Range is limited to {ANALYTICS_MAX_DAYS} days.")
+
+    return render(request, ANALYTICS_TEMPLATE, {"report": rollups.report(start, end)})
+
+
 # ---------- AUTH VIEWS ----------
 
 @require_GET
@@ -56,46 +183,96 @@ def signup_submit(request):
 
 # ---------- BOOKING VIEWS ----------
 
-@login_required
-@require_GET
-def booking_list(request):
-    # Get Booking list
-    if request.user.is_staff or request.user.is_superuser:
-        bookings = Booking.objects.all().order_by(
-            "-preferred_date", "-preferred_time_slot__start_time"
-        )
+def _booking_list_queryset(user):
+    # Bookings ``user`` may see, with only the columns the list table shows
+    # and the slot joined in the same query
+    return (
+        Booking.objects.visible_to(user)
+        .select_related("preferred_time_slot")
+        .only(*BOOKING_LIST_FIELDS)
+    )
+
+
+def _booking_page(request):
+    # Keyset page of the bookings ``request.user`` may see
+    return paginate_bookings(
+        _booking_list_queryset(request.user),
+        request.GET.get("cursor"),
+        getattr(settings, "BOOKINGS_PAGE_SIZE", 25),
+    )
+
+
+def _booking_listing(request):
+    # List body markup for this page, from the page cache when possible
+    return page_cache.render_listing(
+        request.user, request.GET.get("cursor"), lambda: _booking_page(request)
+    )
+
+
+def _initial_booking_data(user):
+    initial = {}
+    if user.get_full_name():
+        initial["customer_name"] = user.get_full_name() # pre-fill the customer name in the form
     else:
-        bookings = Booking.objects.filter(user=request.user).order_by(
-            "-preferred_date",
-            "-preferred_time_slot__start_time",
+        initial["customer_name"] = user.username
+
+    if user.email:
+        initial["email"] = user.email
+    return initial
+
+
+def _user_booking(request, pk):
+    # The booking, if ``request.user`` may change it, with its slot, in one
+    # query. Someone else's booking is a 404, like a missing one.
+    return get_object_or_404(
+        Booking.objects.visible_to(request.user)
+        .select_related("preferred_time_slot")
+        .only(*BOOKING_DETAIL_FIELDS),
+        pk=pk,
+    )
+
+
+def _save_booking_form(form, save):
+    # Validate ``form`` and hand it to ``save`` (a services function).
+    # False means the form should be shown again with its errors.
+    if not form.is_valid():
+        return False
+    try:
+        save(form)
+    except SlotFullError as exc:
+        message = SLOT_FULL_MESSAGE
+        suggestions = scheduling.suggest_slots(
+            form.cleaned_data["service_type"], exc.day, exc.time_slot
         )
+        if suggestions:
+            message += " " + SUGGESTIONS_MESSAGE.format("; ".join(map(str, suggestions)))
+        form.add_error("preferred_time_slot", message)
+        return False
+    return True
+
 
-    return render(request, "bookings/booking_list.html", {"bookings": bookings})
+@login_required
+@require_GET
+def booking_list(request):
+    # Get Booking list, one keyset page at a time
+    return render(
+        request,
+        "bookings/booking_list.html",
+        {"listing": _booking_listing(request)},
+    )
 
 
 @login_required
 @require_GET
 def create_booking(request):
     # show booking creation form.
-    initial = {}
-    if request.user.get_full_name():
-        initial["customer_name"] = request.user.get_full_name() # pre-fill the customer name in the form
-    else:
-        initial["customer_name"] = request.user.username
-
-    if request.user.email:
-        initial["email"] = request.user.email
-
-    form = BookingForm(initial=initial)
+    form = BookingForm(initial=_initial_booking_data(request.user))
 
-    return render(
+    return _render_booking_form(
         request,
-        "bookings/booking_form.html",
-        {
-            "form": form,
-            "title": "Create Booking",
-            "post_url": reverse("create_booking_submit"),
-        },
+        form=form,
+        title="Create Booking",
+        post_url=reverse("create_booking_submit"),
     )
 
 
@@ -104,10 +281,7 @@ def create_booking(request):
 def create_booking_submit(request):
     # create a new booking for the logged-in user.
     form = BookingForm(request.POST)
-    if form.is_valid():
-        booking = form.save(commit=False)
-        booking.user = request.user
-        booking.save()
+    if _save_booking_form(form, lambda f: services.create_booking(f, request.user)):
         return redirect("booking_list")
 
     # Invalid form show again
@@ -123,10 +297,7 @@ def create_booking_submit(request):
 @require_GET
 def edit_booking(request, pk):
     # show edit form.
-    booking = get_object_or_404(Booking, pk=pk)# Display booking edit form prefilling data of booking
-
-    if not (request.user.is_staff or booking.user == request.user):
-        raise PermissionDenied
+    booking = _user_booking(request, pk)# Display booking edit form prefilling data of booking
 
     form = BookingForm(instance=booking)
 
@@ -142,14 +313,10 @@ def edit_booking(request, pk):
 @require_POST
 def edit_booking_submit(request, pk):
     # save edits for the booking logged-in user
-    booking = get_object_or_404(Booking, pk=pk)
-
-    if not (request.user.is_staff or booking.user == request.user):
-        raise PermissionDenied
+    booking = _user_booking(request, pk)
 
     form = BookingForm(request.POST, instance=booking)
-    if form.is_valid():
-        form.save()
+    if _save_booking_form(form, services.update_booking):
         return redirect("booking_list")
 
     return _render_booking_form(
@@ -164,10 +331,7 @@ def edit_booking_submit(request, pk):
 @require_GET
 def delete_booking(request, pk):
     # show delete confirmation page.
-    booking = get_object_or_404(Booking, pk=pk)
-
-    if not (request.user.is_staff or booking.user == request.user):
-        raise PermissionDenied
+    booking = _user_booking(request, pk)
 
     return render(
         request,
@@ -183,10 +347,63 @@ def delete_booking(request, pk):
 @require_POST
 def delete_booking_confirm(request, pk):
     # shows actually delete the booking form
-    booking = get_object_or_404(Booking, pk=pk)
+    booking = _user_booking(request, pk)
+
+    services.delete_booking(booking)
+    return redirect("booking_list")
+
 
-    if not (request.user.is_staff or booking.user == request.user):
+# ---------- BULK IMPORT / EXPORT (staff) ----------
+
+@login_required
+@require_POST
+def booking_import(request):
+    # CSV / NDJSON upload in the ``file`` field; rows belong to ``user``
+    # (a username) or to the uploading staff member
+    if not request.user.is_staff:
         raise PermissionDenied
 
-    booking.delete()
-    return redirect("booking_list")
+    upload = request.FILES.get("file")
+    if upload is None:
+        return JsonResponse({"error": "Upload a file in the 'file' field."}, status=400)
+
+    owner = request.user
+    if request.POST.get("user"):
+        owner = User.objects.filter(username=request.POST["user"]).first()
+        if owner is None:
+            return JsonResponse({"error": "Unknown user."}, status=400)
+
+    fmt = request.POST.get("format") or bulk.guess_format(upload.name)
+    if fmt not in bulk.FORMATS:
+        return JsonResponse({"error": f"format must be one of {bulk.FORMATS}."}, status=400)
+
+    result = bulk.import_bookings(
+        bulk.read_rows(bulk.text_stream(upload.file), fmt), owner
+    )
+    return JsonResponse(
+        {
+            "created": result.created,
+            "rejected": result.rejected,
+            "errors": [e.as_dict() for e in result.errors[:MAX_REPORTED_ERRORS]],
+        }
+    )
+
+
+@login_required
+@require_GET
+def booking_export(request):
+    # Streams every booking; ?format=csv (default) or ndjson
+    if not request.user.is_staff:
+        raise PermissionDenied
+
+    fmt = request.GET.get("format", "csv")
+    if fmt not in bulk.FORMATS:
+        return JsonResponse({"error": f"format must be one of {bulk.FORMATS}."}, status=400)
+
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    response = StreamingHttpResponse(
+        bulk.export_rows(Booking.objects.all(), fmt),
+        content_type=f"{content_type}; charset=utf-8",
+    )
+    response["Content-Disposition"] = f'attachment; filename="bookings.{fmt}"'
+    return response
@@ -0,0 +1,153 @@
+# bookings/warmup.py
+# Work a fresh process would otherwise do on its first requests: compiling
+# templates into the cached loader, importing the backends Django loads
+# lazily, populating the URL resolver and opening the database and cache
+# connections.
+#
+# cardetailing/wsgi.py runs warm_up() when WARMUP_ON_START is set (the
+# default with DEBUG off). Under gunicorn's preload_app that happens once in
+# the master and the workers inherit the compiled templates and resolver;
+# post_fork (gunicorn.conf.py) then calls warm_connections(), since sockets
+# cannot be shared across the fork.
+#
+# Measure it with `python manage.py profile_startup`.
+import os
+import time
+
+import django
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.db import connections
+from django.forms.renderers import get_default_renderer
+from django.template import TemplateSyntaxError, engines
+from django.urls import NoReverseMatch, get_resolver, resolve, reverse
+from django.utils.module_loading import import_string
+
+# Only these files in the template folders are compiled
+TEMPLATE_SUFFIXES = (".html", ".txt")
+# Templates shipped with Django itself (admin, ...) are not warmed, except
+# the form widgets every form page renders
+_DJANGO_DIR = os.path.dirname(django.__file__)
+WIDGET_TEMPLATES = "django/forms/widgets/"
+
+
+def _loader_dirs(loader):
+    # Template directories of a loader, looking through the cached loader
+    if hasattr(loader, "loaders"):
+        for inner in loader.loaders:
+            yield from _loader_dirs(inner)
+    elif hasattr(loader, "get_dirs"):
+        yield from loader.get_dirs()
+
+
+def template_names(engine):
+    names = set()
+    directories = (d for loader in engine.template_loaders for d in _loader_dirs(loader))
+    for directory in directories:
+        directory = str(directory)
+        if directory.startswith(_DJANGO_DIR):
+            continue
+        for root, _, filenames in os.walk(directory):
+            for filename in filenames:
+                if filename.endswith(TEMPLATE_SUFFIXES):
+                    path = os.path.join(root, filename)
+                    names.add(os.path.relpath(path, directory).replace(os.sep, "/"))
+    return sorted(names)
+
+
+def _compile(engine, names):
+    compiled, broken = 0, []
+    for name in names:
+        try:
+            engine.get_template(name)
+            compiled += 1
+        except TemplateSyntaxError:
+            broken.append(name)
+    return compiled, broken
+
+
+def warm_templates():
+    # Returns (compiled, broken); a broken template is left for its request
+    # to report instead of failing the whole worker
+    compiled, broken = 0, []
+    for backend in engines.all():
+        engine = getattr(backend, "engine", None)
+        if engine is None:
+            continue
+        # Imports the context processors
+        engine.template_context_processors
+        done, failed = _compile(engine, template_names(engine))
+        compiled, broken = compiled + done, broken + failed
+
+    # Form widgets render through their own engine
+    renderer = getattr(get_default_renderer(), "engine", None)
+    if renderer is not None:
+        widgets = os.path.join(_DJANGO_DIR, "forms", "templates", WIDGET_TEMPLATES)
+        names = [WIDGET_TEMPLATES + name for name in sorted(os.listdir(widgets))]
+        done, failed = _compile(renderer.engine, names)
+        compiled, broken = compiled + done, broken + failed
+    return compiled, broken
+
+
+def warm_modules():
+    # Backends Django imports on first use: messages and session storage,
+    # and the static files manifest behind {% static %}
+    for path in (
+        settings.MESSAGE_STORAGE,
+        settings.SESSION_ENGINE + ".SessionStore",
+        settings.SESSION_SERIALIZER,
+    ):
+        import_string(path)
+    # Instantiating the storage reads staticfiles.json
+    staticfiles_storage.base_url
+
+
+def warm_urls():
+    # Populates the resolver and reverses / resolves every named URL once,
+    # filling path parameters with 1
+    resolver = get_resolver()
+    warmed = 0
+    for name in [name for name in resolver.reverse_dict if isinstance(name, str)]:
+        possibilities = resolver.reverse_dict.getlist(name)[0][0]
+        _, params = possibilities[0]
+        try:
+            resolve(reverse(name, kwargs={param: 1 for param in params}))
+        except NoReverseMatch:
+            continue
+        warmed += 1
+    return warmed
+
+
+def warm_connections():
+    # Opens this thread's database connections (running the connection_created
+    # receivers, e.g. the SQLite pragmas) and touches every configured cache
+    for connection in connections.all():
+        connection.ensure_connection()
+    for cache in caches.all():
+        cache.get("warmup")
+
+
+def warm_up():
+    # Runs every step; returns {step: seconds} plus what was warmed
+    timings, started = {}, time.perf_counter()
+    compiled, broken = warm_templates()
+    timings["templates"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    warm_modules()
+    timings["modules"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    urls = warm_urls()
+    timings["urls"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    warm_connections()
+    timings["connections"] = time.perf_counter() - started
+    return {
+        "timings": timings,
+        "templates": compiled,
+        "broken_templates": broken,
+        "urls": urls,
+    }
@@ -0,0 +1,165 @@
+# cardetailing/db.py
+# Environment-driven database profile.
+#
+#   DJANGO_DB_ENGINE=sqlite   (default) db.sqlite3 tuned for several workers
+#   DJANGO_DB_ENGINE=postgres DJANGO_DB_NAME/USER/PASSWORD/HOST/PORT
+#   DJANGO_DB_POOL=1          postgres behind a transaction-mode pooler
+#                             (PgBouncer; native pool on Django 5.1+)
+#   DJANGO_DB_CONN_MAX_AGE    seconds to keep a connection (0 = per request)
+#   DJANGO_DB_REPLICAS        comma-separated read replicas, added as aliases
+#                             replica_1, replica_2, ...: SQLite files (relative
+#                             to the project) or Postgres hosts (host[:port])
+#                             with the primary's credentials. Routing is in
+#                             bookings/routing.py; `manage.py sync_replica`
+#                             refreshes SQLite replicas.
+import sqlite3
+from pathlib import Path
+
+import django
+
+
+def _int(environ, name, default):
+    return int(environ.get(name, default))
+
+
+def sqlite_timeout(environ):
+    # Seconds a connection waits on a locked SQLite database. The one knob for
+    # both Python's sqlite3 ``timeout`` and PRAGMA busy_timeout, which set
+    # the same busy handler (whichever is set last wins).
+    return float(environ.get("DJANGO_SQLITE_TIMEOUT", 5))
+
+
+def _replica_names(environ):
+    names = environ.get("DJANGO_DB_REPLICAS", "").split(",")
+    return [name.strip() for name in names if name.strip()]
+
+
+def replica_aliases(databases):
+    return [alias for alias in databases if alias != "default"]
+
+
+def _with_replicas(default, environ, replica):
+    # {"default": default, "replica_1": ...}; replica(name) -> what differs
+    databases = {"default": default}
+    for number, name in enumerate(_replica_names(environ), start=1):
+        databases[f"replica_{number}"] = dict(
+            default,
+            **replica(name),
+            OPTIONS=dict(default["OPTIONS"]),
+            # Tests run against the primary's test database only
+            TEST={"MIRROR": "default"},
+        )
+    return databases
+
+
+def database_profile(base_dir, environ):
+    conn_max_age = _int(environ, "DJANGO_DB_CONN_MAX_AGE", 60)
+    engine = environ.get("DJANGO_DB_ENGINE", "sqlite")
+
+    if engine == "postgres":
+        pooled = environ.get("DJANGO_DB_POOL", "0") == "1"
+        default = {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": environ.get("DJANGO_DB_NAME", "cardetailing"),
+            "USER": environ.get("DJANGO_DB_USER", "cardetailing"),
+            "PASSWORD": environ.get("DJANGO_DB_PASSWORD", ""),
+            "HOST": environ.get("DJANGO_DB_HOST", "127.0.0.1"),
+            "PORT": environ.get("DJANGO_DB_PORT", "6432" if pooled else "5432"),
+            "CONN_MAX_AGE": conn_max_age,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {"connect_timeout": 5},
+        }
+        if pooled:
+            # Transaction pooling hands each transaction a different server
+            # connection, so named (server-side) cursors cannot be used
+            default["DISABLE_SERVER_SIDE_CURSORS"] = True
+            if django.VERSION >= (5, 1):
+                default["OPTIONS"]["pool"] = True
+                default["CONN_MAX_AGE"] = 0
+
+        def replica(name):
+            host, _, port = name.partition(":")
+            return {"HOST": host, "PORT": port or default["PORT"]}
+
+        return _with_replicas(default, environ, replica)
+
+    return _with_replicas(
+        {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": environ.get("DJANGO_DB_NAME", base_dir / "db.sqlite3"),
+            "CONN_MAX_AGE": conn_max_age,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {"timeout": sqlite_timeout(environ)},
+            # File-backed test database so concurrency tests see real SQLite
+            # locking (busy waits) rather than in-memory shared-cache errors
+            "TEST": {"NAME": base_dir / "test_db.sqlite3"},
+        },
+        environ,
+        lambda name: {"NAME": base_dir / name},
+    )
+
+
+def sqlite_pragmas(environ):
+    # Applied to every new SQLite connection (see apply_sqlite_pragmas)
+    return {
+        # Readers no longer block on writers (and vice versa); see
+        # uses_wal() for the files that keep their mode
+        "journal_mode": environ.get("DJANGO_SQLITE_JOURNAL_MODE", "WAL"),
+        # Safe with WAL: only a power loss can drop the last commits
+        "synchronous": environ.get("DJANGO_SQLITE_SYNCHRONOUS", "NORMAL"),
+        # Same wait as OPTIONS["timeout"], re-applied here in milliseconds
+        "busy_timeout": round(sqlite_timeout(environ) * 1000),
+        "mmap_size": _int(environ, "DJANGO_SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+        # Negative values are KiB: 20 MB page cache per connection
+        "cache_size": _int(environ, "DJANGO_SQLITE_CACHE_SIZE", -20000),
+        "temp_store": "MEMORY",
+    }
+
+
+def uses_wal(name, base_dir, debug):
+    # Switching to WAL rewrites the file header and leaves -wal / -shm files
+    # next to it. In development the database files inside the project
+    # (db.sqlite3 is committed) keep their journal mode; tests, benchmarks
+    # and deployments run with DEBUG off.
+    if not debug:
+        return True
+    return Path(base_dir).resolve() not in Path(name).resolve().parents
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    # connection_created receiver
+    from django.conf import settings
+
+    if connection.vendor != "sqlite":
+        return
+    pragmas = dict(getattr(settings, "SQLITE_PRAGMAS", {}))
+    if connection.is_in_memory_db() or not uses_wal(
+        connection.settings_dict["NAME"], settings.BASE_DIR, settings.DEBUG
+    ):
+        # WAL needs a real file
+        pragmas.pop("journal_mode", None)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def copy_sqlite(source, target):
+    # Consistent snapshot of the SQLite file ``source`` written over
+    # ``target`` with the online backup API; readers of ``target`` see the
+    # old or the new copy, never a mix
+    Path(target).parent.mkdir(parents=True, exist_ok=True)
+    with sqlite3.connect(str(source)) as src, sqlite3.connect(str(target)) as dst:
+        src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def close_unusable_connections(**kwargs):
+    # request_started receiver. Django 4.1+ does this itself when
+    # CONN_HEALTH_CHECKS is set; on older versions a persistent connection
+    # the server dropped would otherwise fail the first query of a request.
+    from django.db import connections
+
+    for conn in connections.all():
+        if conn.connection is not None and not conn.is_usable():
+            conn.close()
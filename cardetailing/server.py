@@ -0,0 +1,92 @@
+# cardetailing/server.py
+# Environment-driven gunicorn profile, read by gunicorn.conf.py.
+#
+#   GUNICORN_PROFILE=gthread  (default) a few workers x 4 threads; requests
+#                             mostly wait on SQLite / the cache, so threads
+#                             add concurrency for little memory
+#   GUNICORN_PROFILE=sync     one request per worker, 2 x CPUs + 1 workers
+#
+# There is no ASGI profile: every view is sync, and on Django 3.2 serving
+# them over ASGI was slower than either profile above.
+#
+# Overrides: GUNICORN_WORKERS, GUNICORN_THREADS, GUNICORN_PRELOAD (1/0),
+# GUNICORN_MAX_REQUESTS, GUNICORN_MAX_REQUESTS_JITTER, GUNICORN_KEEPALIVE,
+# GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, PORT / GUNICORN_BIND.
+#
+# Compare profiles on the target machine with `python -m benchmarks.loadgen`.
+import os
+
+from cardetailing.db import _int
+
+PROFILES = ("gthread", "sync")
+
+
+def gunicorn_profile(environ, cpu_count=None):
+    # Dict of gunicorn settings (names as in gunicorn.conf.py)
+    cpus = cpu_count or os.cpu_count() or 1
+    name = environ.get("GUNICORN_PROFILE", "gthread")
+    if name == "uvicorn":
+        raise ValueError(
+            "GUNICORN_PROFILE=uvicorn is not supported: the booking views are "
+            "sync and uvicorn is not in requirements.txt; use gthread or sync"
+        )
+    if name not in PROFILES:
+        raise ValueError(f"GUNICORN_PROFILE must be one of {PROFILES}, not {name!r}")
+
+    if name == "sync":
+        workers, threads = 2 * cpus + 1, 1
+        worker_class = "sync"
+    else:
+        workers, threads = cpus + 1, 4
+        worker_class = "gthread"
+
+    return {
+        "profile": name,
+        "wsgi_app": "cardetailing.wsgi:application",
+        "bind": environ.get(
+            "GUNICORN_BIND", f"0.0.0.0:{environ.get('PORT', '8000')}"
+        ),
+        "worker_class": worker_class,
+        "workers": _int(environ, "GUNICORN_WORKERS", workers),
+        "threads": _int(environ, "GUNICORN_THREADS", threads),
+        # Import Django, the URLconf and the templates once in the master;
+        # workers share those pages copy-on-write instead of each loading
+        # its own copy
+        "preload_app": environ.get("GUNICORN_PRELOAD", "1") == "1",
+        # Recycle workers now and then so slow leaks cannot build up; the
+        # jitter keeps them from all restarting at once
+        "max_requests": _int(environ, "GUNICORN_MAX_REQUESTS", 2000),
+        "max_requests_jitter": _int(environ, "GUNICORN_MAX_REQUESTS_JITTER", 200),
+        # nginx / the load balancer reuse upstream connections; sync workers
+        # ignore this
+        "keepalive": _int(environ, "GUNICORN_KEEPALIVE", 5),
+        "timeout": _int(environ, "GUNICORN_TIMEOUT", 30),
+        # How long a worker gets to finish its requests on restart / shutdown
+        "graceful_timeout": _int(environ, "GUNICORN_GRACEFUL_TIMEOUT", 30),
+    }
+
+
+def close_inherited_connections():
+    # pre_fork hook, in the master: with preload_app it may have opened
+    # database or cache connections while importing, and a socket must never
+    # be shared between processes. Closing them before each fork leaves the
+    # workers nothing to close (a no-op once they are closed).
+    from django.core.cache import caches
+    from django.db import connections
+
+    connections.close_all()
+    for cache in caches.all():
+        cache.close()
+
+
+def warm_worker():
+    # post_fork hook: the preloaded master already compiled templates and
+    # populated the URL resolver, and closed its connections before the
+    # fork, so only the connections are left to open. They are per thread, so this
+    # helps the sync profile; gthread request threads open their own.
+    from django.conf import settings
+
+    if settings.WARMUP_ON_START:
+        from bookings.warmup import warm_connections
+
+        warm_connections()
@@ -2,6 +2,11 @@ from pathlib import Path
 import os
 import sys
 
+import django
+from django.core.exceptions import ImproperlyConfigured
+
+from cardetailing.db import database_profile, replica_aliases, sqlite_pragmas
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "dev-secret-key-change-in-production")
@@ -26,6 +31,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Liveness probes are answered here, before the rest of the stack
+    "bookings.middleware.HealthCheckMiddleware",
+    # Hashed, precompressed /static/ files when nginx is not in front
+    "bookings.middleware.StaticFilesMiddleware",
+    # Per-view latency / SQL / template metrics, scraped from /metrics/
+    "bookings.middleware.PerformanceMetricsMiddleware",
+    # Reads to replicas, clients that just wrote pinned to the primary
+    # (only active when DATABASE_REPLICAS is set)
+    "bookings.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -34,14 +48,97 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "bookings.middleware.SecurityHeadersMiddleware",
+    # 429 for POSTs over THROTTLE_RATES, before the view runs
+    "bookings.middleware.ThrottleMiddleware",
 ]
 
+# ---------- SECURITY HEADERS ----------
+# Single source for bookings.middleware.SecurityHeadersMiddleware and the
+# nginx static.conf (`python manage.py render_nginx_conf`).
+SECURITY_HEADERS = {
+    # Prevents clickjacking by blocking the page from being embedded in iframes on other sites.
+    "X-Frame-Options": "DENY",
+    # Limits referrer information sent to same-origin requests only, reducing data leakage risks.
+    "Referrer-Policy": "same-origin",
+    "X-Content-Type-Options": "nosniff",
+    # Site isolation to prevent cross-origin attacks like Spectre – helps with ZAP 90004
+    "Cross-Origin-Opener-Policy": "same-origin",
+    "Cross-Origin-Embedder-Policy": "require-corp",
+    "Cross-Origin-Resource-Policy": "same-origin",
+    # Permissions Policy – fixes ZAP 10063
+    "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+}
+
+# Content Security Policy (CSP). A source of "'nonce-{nonce}'" turns on
+# per-response nonces, exposed to templates as {{ request.csp_nonce }}.
+CONTENT_SECURITY_POLICY = {
+    "default-src": ["'self'"],
+    "script-src": ["'self'"],
+    "style-src": ["'self'", "https://cdn.jsdelivr.net"],
+    "img-src": ["'self'", "https://images.unsplash.com", "data:"],
+    "font-src": ["'self'", "data:"],
+    "frame-ancestors": ["'none'"],
+    "base-uri": ["'self'"],
+    "form-action": ["'self'"],
+}
+
+SECURITY_HEADER_POLICIES = {
+    # HTML pages and static files
+    "default": {"headers": SECURITY_HEADERS, "csp": CONTENT_SECURITY_POLICY},
+    # JSON responses: nothing to embed or execute
+    "api": {
+        "headers": {
+            "X-Content-Type-Options": "nosniff",
+            "Referrer-Policy": "same-origin",
+            "Cross-Origin-Resource-Policy": "same-origin",
+        },
+        "csp": {"default-src": ["'none'"], "frame-ancestors": ["'none'"]},
+    },
+    # Load balancer probes
+    "minimal": {"headers": {"X-Content-Type-Options": "nosniff"}},
+}
+
+# URL name -> policy, checked before the content type
+SECURITY_HEADER_ROUTES = {"health": "minimal", "ready": "minimal"}
+SECURITY_HEADER_CONTENT_TYPES = {"application/json": "api"}
+
+# ---------- THROTTLING ----------
+# bookings.middleware.ThrottleMiddleware: POSTs to these URL names are
+# counted over a sliding window per client "ip" and per "user" (the
+# signed-in user, or the username a login form names) and answered 429
+# past the rate, before the view validates or hashes anything. Rates are
+# "<count>/<period>" with periods like s, m, h, d or 10s / 5m.
+# DJANGO_THROTTLE=off turns it off.
+THROTTLE_RATES = {
+    "login": {"ip": "20/m", "user": "5/m"},
+    "signup_submit": {"ip": "5/m"},
+    "create_booking_submit": {"ip": "30/m", "user": "10/m"},
+}
+if os.environ.get("DJANGO_THROTTLE", "on") == "off":
+    THROTTLE_RATES = {}
+# Counters must be shared by every worker: pick a shared CACHE_BACKEND in
+# production, as for the cache tier (check bookings.W001 warns on locmem).
+# The file and db backends count through bookings.throttling's file lock
+# and ThrottleCounter table.
+THROTTLE_CACHE = "default"
+# Proxies in front of Django that append to X-Forwarded-For (1 behind the
+# EB load balancer, 2 with nginx too); 0 counts REMOTE_ADDR
+THROTTLE_PROXY_COUNT = int(os.environ.get("DJANGO_THROTTLE_PROXY_COUNT", "0"))
+
+# `manage.py test` without throttling (see bookings.testing.TestRunner)
+TEST_RUNNER = "bookings.testing.TestRunner"
 
 ROOT_URLCONF = "cardetailing.urls"
 
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates plus render timing for bookings.metrics
+        "BACKEND": "bookings.template_backend.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -55,14 +152,90 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    # Production compiles each template once per process (bookings/warmup.py
+    # does it before the first request). Explicit rather than left to
+    # Django's default, which depends on the engine's debug flag. With DEBUG
+    # on, edits show up without a restart (tests and benchmarks turn DEBUG
+    # off at runtime and still get the cached loader by default).
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        ("django.template.loaders.cached.Loader", TEMPLATE_LOADERS)
+    ]
+
 WSGI_APPLICATION = "cardetailing.wsgi.application"
 
-DATABASES = {
+# Database profile comes from the environment, see cardetailing/db.py
+DATABASES = database_profile(BASE_DIR, os.environ)
+SQLITE_PRAGMAS = sqlite_pragmas(os.environ)
+
+# Read replicas (DJANGO_DB_REPLICAS). GET requests read from one of them
+# unless the client wrote in the last REPLICA_PIN_SECONDS; keep that above
+# the replicas' lag (SQLite replicas: the `sync_replica --interval`).
+DATABASE_REPLICAS = replica_aliases(DATABASES)
+DATABASE_ROUTERS = ["bookings.routing.ReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.environ.get("DJANGO_REPLICA_PIN_SECONDS", "5"))
+
+# Shared cache tier. Each gunicorn worker keeps a small in-process LRU in
+# front of this (bookings.cache.TieredCache); pick a backend every worker on
+# every instance can reach:
+#   locmem    - per-process only (default, fine for dev/tests; check
+#               bookings.W001 warns about it when DEBUG is off)
+#   file      - FileBasedCache in DJANGO_CACHE_LOCATION (shared on one host)
+#   db        - DatabaseCache table in the default database
+#               (run `manage.py createcachetable` once; see
+#               bookings.cache_backend)
+#   memcached - PyMemcacheCache at DJANGO_CACHE_LOCATION (host:port; needs
+#               pymemcache installed)
+#   redis     - RedisCache at DJANGO_CACHE_LOCATION (redis://...; Django 4+
+#               only, not offered on the pinned Django 3.2)
+CACHE_BACKEND = os.environ.get("DJANGO_CACHE_BACKEND", "locmem")
+CACHE_LOCATION = os.environ.get("DJANGO_CACHE_LOCATION", "")
+
+_CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "cardetailing"),
+    "file": (
+        "django.core.cache.backends.filebased.FileBasedCache",
+        str(BASE_DIR / ".cache"),
+    ),
+    "db": ("bookings.cache_backend.DatabaseCache", "django_cache"),
+    "memcached": (
+        "django.core.cache.backends.memcached.PyMemcacheCache",
+        "127.0.0.1:11211",
+    ),
+}
+if django.VERSION >= (4, 0):
+    _CACHE_BACKENDS["redis"] = (
+        "django.core.cache.backends.redis.RedisCache",
+        "redis://127.0.0.1:6379",
+    )
+if CACHE_BACKEND not in _CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"DJANGO_CACHE_BACKEND={CACHE_BACKEND!r}: choose one of {sorted(_CACHE_BACKENDS)}"
+    )
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": _CACHE_BACKENDS[CACHE_BACKEND][0],
+        "LOCATION": CACHE_LOCATION or _CACHE_BACKENDS[CACHE_BACKEND][1],
+        "TIMEOUT": 300,
+        "KEY_PREFIX": "cardetailing",
     }
 }
+if CACHE_BACKEND in ("locmem", "file", "db"):
+    # These cull a third of their entries once they hold MAX_ENTRIES (300 by
+    # default), which with an entry per booking row would keep evicting
+    # namespace versions and fresh pages
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.environ.get("DJANGO_CACHE_MAX_ENTRIES", "50000")),
+    }
+
+# In-process layer of the tier (entries per worker, seconds before re-reading
+# the shared cache)
+TIERED_CACHE_OPTIONS = {
+    "local_size": int(os.environ.get("DJANGO_LOCAL_CACHE_SIZE", "512")),
+    "local_ttl": float(os.environ.get("DJANGO_LOCAL_CACHE_TTL", "30")),
+}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -88,6 +261,14 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [BASE_DIR / "bookings" / "static"]
+# collectstatic writes content-hashed names, minified CSS and .gz / .br
+# siblings (cardetailing/storage.py)
+STATICFILES_STORAGE = "cardetailing.storage.CompressedManifestStaticFilesStorage"
+# Serve STATIC_ROOT from Django (bookings.middleware.StaticFilesMiddleware).
+# Harmless behind nginx, which answers /static/ itself.
+SERVE_STATIC = os.environ.get("DJANGO_SERVE_STATIC", "True") == "True"
+# nginx needs the ngx_brotli module for brotli_static; gzip_static is built in
+NGINX_BROTLI_STATIC = os.environ.get("NGINX_BROTLI_STATIC", "False") == "True"
 
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -111,6 +292,71 @@ CSRF_COOKIE_SAMESITE = "Lax"
 # Drop session when browser closes
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
+# Session storage:
+#   cached - django_session behind a per-worker read-through cache, unchanged
+#            sessions never re-saved (bookings/session_backend.py; default)
+#   db     - Django's database backend, one SELECT per authenticated request
+#   cookie - signed cookies, no server-side state; a session stays valid
+#            until it expires, even after logout on another device
+SESSION_BACKEND = os.environ.get("DJANGO_SESSION_BACKEND", "cached")
+SESSION_ENGINE = {
+    "cached": "bookings.session_backend",
+    "db": "django.contrib.sessions.backends.db",
+    "cookie": "django.contrib.sessions.backends.signed_cookies",
+}[SESSION_BACKEND]
+# Per-worker entries, seconds before re-reading the database (saves and
+# logouts on other workers are seen at once, through the shared cache), and
+# how often an unchanged session is re-saved to extend its expiry
+SESSION_LOCAL_CACHE = {
+    "size": int(os.environ.get("DJANGO_SESSION_CACHE_SIZE", "2048")),
+    "ttl": float(os.environ.get("DJANGO_SESSION_CACHE_TTL", "5")),
+    "refresh": int(os.environ.get("DJANGO_SESSION_REFRESH", "60")),
+}
+
+# Compile templates, populate the URL resolver and open connections when the
+# WSGI application loads, see bookings/warmup.py
+WARMUP_ON_START = os.environ.get("DJANGO_WARMUP", str(not DEBUG)) == "True"
+
+# Liveness path short-circuited by HealthCheckMiddleware, and how long a
+# /ready/ result is reused between probes (seconds)
+HEALTH_CHECK_PATH = "/health/"
+READINESS_CACHE_TTL = float(os.environ.get("READINESS_CACHE_TTL", "5"))
+
+# Request metrics: samples kept per view for p50/p95/p99, Server-Timing
+# header, and the bearer token Prometheus uses on /metrics/ (staff users can
+# always read it)
+PERF_METRICS_WINDOW = int(os.environ.get("PERF_METRICS_WINDOW", "1024"))
+PERF_SERVER_TIMING = os.environ.get("PERF_SERVER_TIMING", "False") == "True"
+PERF_METRICS_TOKEN = os.environ.get("PERF_METRICS_TOKEN", "")
+
+# Rows per page on the booking list (keyset paginated)
+BOOKINGS_PAGE_SIZE = int(os.environ.get("BOOKINGS_PAGE_SIZE", "25"))
+
+# Email. Confirmations are queued in the outbox and delivered by
+# `manage.py run_outbox`. The default file backend is the local stand-in;
+# set DJANGO_EMAIL_BACKEND (e.g. django.core.mail.backends.smtp.EmailBackend
+# with EMAIL_HOST...) for real delivery.
+EMAIL_BACKEND = os.environ.get(
+    "DJANGO_EMAIL_BACKEND", "django.core.mail.backends.filebased.EmailBackend"
+)
+EMAIL_FILE_PATH = os.environ.get("DJANGO_EMAIL_FILE_PATH", str(BASE_DIR / ".mail"))
+EMAIL_HOST = os.environ.get("DJANGO_EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("DJANGO_EMAIL_PORT", "25"))
+EMAIL_HOST_USER = os.environ.get("DJANGO_EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.environ.get("DJANGO_EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.environ.get("DJANGO_EMAIL_USE_TLS", "False") == "True"
+EMAIL_TIMEOUT = 10
+DEFAULT_FROM_EMAIL = os.environ.get(
+    "DJANGO_DEFAULT_FROM_EMAIL", "bookings@cardetailing.local"
+)
+
+# OutboxDispatcher options (see bookings/dispatcher.py)
+OUTBOX_DISPATCHER = {
+    "batch_size": int(os.environ.get("OUTBOX_BATCH_SIZE", "50")),
+    "concurrency": int(os.environ.get("OUTBOX_CONCURRENCY", "4")),
+    "max_attempts": int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "8")),
+}
+
 LOGIN_URL = "/accounts/login/"
 LOGIN_REDIRECT_URL = "/bookings/"
 LOGOUT_REDIRECT_URL =  "/accounts/login/"
\ No newline at end of file
@@ -0,0 +1,136 @@
+# cardetailing/storage.py
+# Static files storage used by collectstatic.
+#
+# On top of Django's ManifestStaticFilesStorage (content-hashed names, so
+# templates reference e.g. style.3f2a9c1d04be.css and the files can be
+# cached forever):
+#   - CSS is minified before it is hashed, so the hash covers the bytes
+#     actually served
+#   - every text asset gets precompressed .gz and (with the optional
+#     ``brotli`` package) .br siblings, for nginx gzip_static /
+#     brotli_static and bookings.middleware.StaticFilesMiddleware
+import gzip
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # .br files are skipped without it
+    brotli = None
+
+# Extensions worth compressing (images and fonts are already compressed)
+COMPRESSIBLE = (".css", ".js", ".svg", ".txt", ".html", ".json", ".map", ".xml", ".ico")
+# Keep a compressed sibling only if it saves at least this fraction
+MIN_SAVING = 0.05
+
+_CSS_TOKENS = re.compile(
+    r"""
+    (?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')
+    | (?P<comment>/\*.*?\*/)
+    | (?P<space>\s+)
+    """,
+    re.S | re.X,
+)
+# A space next to these characters never matters. "(" and ":" are not in
+# the second set: "and (max-width: ...)" needs its space, and "a :hover"
+# and "a:hover" are different selectors.
+_NO_SPACE_AFTER = set("{};,>:( ")
+_NO_SPACE_BEFORE = set("{};,>)!")
+
+
+def minify_css(css):
+    # Drop comments and redundant whitespace; strings are left untouched
+    tokens, position = [], 0
+    for match in _CSS_TOKENS.finditer(css):
+        if match.start() > position:
+            tokens.append(("code", css[position : match.start()]))
+        tokens.append((match.lastgroup, match.group()))
+        position = match.end()
+    if position < len(css):
+        tokens.append(("code", css[position:]))
+
+    out = []
+    for index, (kind, text) in enumerate(tokens):
+        if kind == "comment":
+            continue
+        if kind == "space":
+            previous = out[-1][-1] if out else ""
+            following = next(
+                (t for k, t in tokens[index + 1 :] if k not in ("space", "comment")),
+                "",
+            )
+            if (
+                not previous
+                or not following
+                or previous in _NO_SPACE_AFTER
+                or following[0] in _NO_SPACE_BEFORE
+            ):
+                continue
+            text = " "
+        elif kind == "code":
+            # The last declaration needs no ";". Only code is touched: a
+            # string may contain ";}", and a string token never ends in ";"
+            text = text.replace(";}", "}")
+            if text.startswith("}") and out and out[-1].endswith(";"):
+                out[-1] = out[-1][:-1]
+                if not out[-1]:
+                    out.pop()
+        out.append(text)
+    return "".join(out)
+
+
+def compress(data):
+    # {".gz": bytes, ".br": bytes} for the encodings that pay off
+    encoded = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded[".br"] = brotli.compress(data, quality=11)
+    limit = len(data) * (1 - MIN_SAVING)
+    return {suffix: body for suffix, body in encoded.items() if len(body) <= limit}
+
+
+class _MinifiedSource:
+    # Wraps a finder's storage so collectstatic hashes and copies minified CSS
+    def __init__(self, storage):
+        self.storage = storage
+
+    def open(self, path, mode="rb"):
+        source = self.storage.open(path, mode)
+        if not path.endswith(".css"):
+            return source
+        with source:
+            css = source.read().decode("utf-8")
+        return ContentFile(minify_css(css).encode("utf-8"), name=path)
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        # Until collectstatic has written the manifest (development, tests)
+        # files are referenced by their plain names
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        paths = {
+            name: (_MinifiedSource(storage), path)
+            for name, (storage, path) in paths.items()
+        }
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+
+        for name in sorted(set(paths) | set(self.hashed_files.values())):
+            if not name.endswith(COMPRESSIBLE) or not self.exists(name):
+                continue
+            with self.open(name) as original:
+                data = original.read()
+            for suffix, body in compress(data).items():
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(body))
+                yield name, name + suffix, True
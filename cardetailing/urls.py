@@ -5,6 +5,7 @@ from django.shortcuts import redirect
 from django.views.decorators.http import require_GET
 from django.contrib.auth import views as auth_views
 
+from bookings import api as booking_api
 from bookings import views as booking_views
 
 
@@ -37,6 +38,24 @@ urlpatterns = [
     path("bookings/<int:pk>/delete/", booking_views.delete_booking, name="delete_booking"),
     path("bookings/<int:pk>/delete/confirm/",booking_views.delete_booking_confirm,name="delete_booking_confirm",),
 
+    # Staff bulk import / export (CSV or NDJSON)
+    path("bookings/import/", booking_views.booking_import, name="booking_import"),
+    path("bookings/export/", booking_views.booking_export, name="booking_export"),
+
+    # Staff analytics from the rollup tables
+    path("staff/analytics/", booking_views.analytics, name="analytics"),
+
+    # ---------- JSON API ----------
+    path("api/bookings/", booking_api.bookings, name="api_bookings"),
+    path("api/timeslots/", booking_api.timeslots, name="api_timeslots"),
+
     # Health-check for EB
     path("health/", booking_views.health, name="health"),
+    path("ready/", booking_views.ready, name="ready"),
+
+    # Prometheus scrape endpoint
+    path("metrics/", booking_views.metrics, name="metrics"),
+
+    # Free capacity per slot/day for the booking form
+    path("availability/", booking_views.availability, name="availability"),
 ]
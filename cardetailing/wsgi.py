@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cardetailing.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_START:
+    # Templates, URL resolver and connections ready before the first request
+    # (bookings/warmup.py)
+    from bookings.warmup import warm_up
+
+    warm_up()
@@ -0,0 +1,48 @@
+# gunicorn.conf.py
+# Picked up by `gunicorn --config gunicorn.conf.py` (see Procfile). The
+# worker class and counts come from GUNICORN_PROFILE and friends, see
+# cardetailing/server.py; compare profiles with `python -m benchmarks.loadgen`.
+import os
+
+from cardetailing.server import (
+    close_inherited_connections,
+    gunicorn_profile,
+    warm_worker,
+)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cardetailing.settings")
+
+_profile = gunicorn_profile(os.environ)
+
+wsgi_app = _profile["wsgi_app"]
+bind = _profile["bind"]
+worker_class = _profile["worker_class"]
+workers = _profile["workers"]
+threads = _profile["threads"]
+preload_app = _profile["preload_app"]
+max_requests = _profile["max_requests"]
+max_requests_jitter = _profile["max_requests_jitter"]
+keepalive = _profile["keepalive"]
+timeout = _profile["timeout"]
+graceful_timeout = _profile["graceful_timeout"]
+
+# Worker heartbeat files on tmpfs; a disk-backed /tmp can stall them long
+# enough for the master to kill healthy workers
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def pre_fork(server, worker):
+    # In the master, before each worker (and each replacement) is forked
+    if preload_app:
+        close_inherited_connections()
+
+
+def post_fork(server, worker):
+    # Without preload_app Django is set up (and warmed, see
+    # cardetailing/wsgi.py) in the worker itself, after this hook
+    if preload_app:
+        warm_worker()